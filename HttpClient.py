@@ -1,5 +1,4 @@
 import os
-import time
 import logging
 import requests
 from requests.adapters import HTTPAdapter
@@ -7,11 +6,21 @@ from requests.exceptions import RequestException
 from urllib3.util import Retry
 
 import common
+import rate_limit
 
 common.setup_logging()
 logger = logging.getLogger(__name__)
 
 
+# Resending these POSTs can buy twice: only connection failures (nothing was
+# sent) are retried by urllib3, reads time out sooner, and any further retry
+# goes through purchase_journal.
+PURCHASE_URLS = (
+    "https://ol.dhlottery.co.kr/olotto/game/execBuy.do",
+    "https://el.dhlottery.co.kr/connPro.do",
+)
+
+
 class HttpClient:
     def __init__(
         self,
@@ -25,12 +34,15 @@ class HttpClient:
         connect = connect_timeout or int(os.getenv("CONNECT_TIMEOUT", "6"))
         read = read_timeout or int(os.getenv("READ_TIMEOUT", "10"))
         self.timeout = (connect, read)
+        self.purchase_timeout = (connect, float(os.getenv("PURCHASE_READ_TIMEOUT", "5")))
         self.request_delay = request_delay if request_delay is not None else float(
             os.getenv("REQUEST_DELAY", "0.2")
         )
         self.max_retries = max_retries if max_retries is not None else int(
             os.getenv("HTTP_MAX_RETRIES", "4")
         )
+        self.max_concurrency = int(os.getenv("HTTP_MAX_CONCURRENCY_PER_HOST", "4"))
+        self.rate_limiter = rate_limit.HostRateLimiter(self.request_delay, self.max_concurrency)
         self._mount_retry_adapters()
 
     def _mount_retry_adapters(self) -> None:
@@ -54,6 +66,18 @@ class HttpClient:
         self.session.mount("https://", adapter)
         self.session.mount("http://", adapter)
 
+        purchase_retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=0,
+            other=0,
+            allowed_methods=None,
+            raise_on_status=False,
+        )
+        for url in PURCHASE_URLS:
+            self.session.mount(url, HTTPAdapter(max_retries=purchase_retry, pool_connections=1, pool_maxsize=2))
+
     def reset_connection_pool(self) -> None:
         """Drop stale keep-alive connections while preserving login cookies."""
         logger.info("[http] Resetting connection pool")
@@ -69,16 +93,16 @@ class HttpClient:
         if headers:
             session_headers.update(headers)
         try:
-            if self.request_delay > 0:
-                time.sleep(self.request_delay)
-            logger.info("[http] POST url=%s timeout=%s", url, self.timeout)
-            res = self.session.post(
-                url,
-                headers=session_headers,
-                data=data,
-                timeout=self.timeout,
-                allow_redirects=True,
-            )
+            timeout = self.purchase_timeout if url in PURCHASE_URLS else self.timeout
+            with self.rate_limiter.limit(url):
+                logger.info("[http] POST url=%s timeout=%s", url, timeout)
+                res = self.session.post(
+                    url,
+                    headers=session_headers,
+                    data=data,
+                    timeout=timeout,
+                    allow_redirects=True,
+                )
             res.raise_for_status()
             logger.info("[http] POST success url=%s status=%s", url, res.status_code)
             return res
@@ -91,15 +115,14 @@ class HttpClient:
         if headers:
             session_headers.update(headers)
         try:
-            if self.request_delay > 0:
-                time.sleep(self.request_delay)
-            logger.info("[http] GET url=%s timeout=%s", url, self.timeout)
-            res = self.session.get(
-                url,
-                headers=session_headers,
-                params=params,
-                timeout=self.timeout,
-            )
+            with self.rate_limiter.limit(url):
+                logger.info("[http] GET url=%s timeout=%s", url, self.timeout)
+                res = self.session.get(
+                    url,
+                    headers=session_headers,
+                    params=params,
+                    timeout=self.timeout,
+                )
             res.raise_for_status()
             logger.info("[http] GET success url=%s status=%s", url, res.status_code)
             return res
@@ -107,6 +130,10 @@ class HttpClient:
             logger.error("[http] GET failed url=%s error=%s", url, exc)
             raise
 
+    def map_concurrent(self, func, items) -> list:
+        """Run ``func`` over ``items`` concurrently; returns ``(result, error)`` pairs in order."""
+        return rate_limit.map_ordered(func, items, max_workers=self.max_concurrency)
+
 
 class HttpClientSingleton:
     _instance = None
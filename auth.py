@@ -7,10 +7,13 @@ import requests
 import json
 import base64
 import binascii
-import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from Crypto.PublicKey import RSA
 from Crypto.Cipher import PKCS1_v1_5
 from HttpClient import HttpClientSingleton
+import page_classifier
+import redaction
 
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 logger = logging.getLogger(__name__)
@@ -49,22 +52,29 @@ class AuthController:
 
     _AUTH_CRED = ""
 
-    def __init__(self):
-        self.http_client = HttpClientSingleton.get_instance()
+    def __init__(self, http_client=None):
+        self.http_client = http_client or HttpClientSingleton.get_instance()
         self._last_balance = None
 
-    def login(self, user_id: str, password: str):
+    def login(self, user_id: str, password: str, fast_path: Optional[bool] = None):
         assert isinstance(user_id, str)
         assert isinstance(password, str)
 
+        if fast_path is None:
+            fast_path = os.getenv("LOGIN_FAST_PATH", "0") == "1"
+
         login_headers = copy.deepcopy(self._REQ_HEADERS)
         login_headers.update({
             "Origin": "https://www.dhlottery.co.kr",
             "Referer": "https://www.dhlottery.co.kr/",
         })
-        self.http_client.get("https://www.dhlottery.co.kr/user.do?method=login", headers=login_headers)
 
-        modulus, exponent = self._get_rsa_key()
+        if fast_path and self._has_warm_cookies():
+            logger.info("[auth] Login fast path: reusing warm cookies, skipping login page")
+            modulus, exponent = self._get_rsa_key_with_warm_up()
+        else:
+            self.http_client.get("https://www.dhlottery.co.kr/user.do?method=login", headers=login_headers)
+            modulus, exponent = self._get_rsa_key()
 
         enc_user_id = self._rsa_encrypt(user_id, modulus, exponent)
         enc_password = self._rsa_encrypt(password, modulus, exponent)
@@ -82,8 +92,33 @@ class AuthController:
             "inpUserId": user_id
         }
 
-        self._try_login(headers, data)
-        
+        self._try_login(headers, data, trust_login_response=fast_path)
+
+    def _has_warm_cookies(self) -> bool:
+        names = {cookie.name for cookie in self.http_client.session.cookies}
+        return "JSESSIONID" in names or "DHJSESSIONID" in names
+
+    def _get_rsa_key_with_warm_up(self):
+        # The POST goes to the same host right after the key fetch; open a
+        # second pooled connection while the key request is in flight.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            warm_up = executor.submit(self._warm_up_connection)
+            try:
+                return self._get_rsa_key()
+            finally:
+                warm_up.result()
+
+    def _warm_up_connection(self) -> None:
+        try:
+            self.http_client.session.head(
+                "https://www.dhlottery.co.kr/",
+                headers={"User-Agent": USER_AGENT},
+                timeout=self.http_client.timeout,
+                allow_redirects=False,
+            )
+        except requests.RequestException as exc:
+            logger.info("[auth] Login connection warm-up failed: %s", exc)
+
     def add_auth_cred_to_headers(self, headers: dict) -> str:
         assert isinstance(headers, dict)
 
@@ -143,7 +178,7 @@ class AuthController:
     def _generate_req_headers(self):
         return copy.deepcopy(self._REQ_HEADERS)
 
-    def _try_login(self, headers: dict, data: dict):
+    def _try_login(self, headers: dict, data: dict, trust_login_response: bool = False):
         assert isinstance(headers, dict)
         assert isinstance(data, dict)
 
@@ -172,6 +207,10 @@ class AuthController:
                  self._get_safe_cookie_names(),
              )
 
+        if trust_login_response and self._login_response_proves_session(res):
+            logger.info("[auth] Login response is an authenticated page; skipping session validation")
+            return res
+
         if not self.validate_session():
             raise LoginValidationError(
                 "Login HTTP request completed, but authenticated session validation failed."
@@ -179,6 +218,14 @@ class AuthController:
 
         return res
 
+    def _login_response_proves_session(self, res: requests.Response) -> bool:
+        if res.status_code >= 400 or self._is_login_url(res.url):
+            return False
+        if self._parse_json_safely(res) is not None:
+            return False
+        classification = page_classifier.classify_page(res.url, res.text)
+        return classification.has_logout and classification.kind == page_classifier.PageClass.AUTHENTICATED
+
     def _log_login_response_summary(self, res: requests.Response) -> None:
         content_type = res.headers.get("Content-Type", "")
         logger.info(
@@ -194,13 +241,13 @@ class AuthController:
         if isinstance(parsed, dict):
             logger.info(
                 "[auth] Login response json_summary=%s",
-                self._summarize_json(parsed),
+                redaction.Deferred(self._summarize_json, parsed),
             )
             return
 
         logger.info(
             "[auth] Login response body_preview=%s",
-            self._safe_text_preview(res.text),
+            redaction.RedactedText(res.text, limit=500),
         )
 
     def _validate_login_response(self, res: requests.Response) -> None:
@@ -243,43 +290,9 @@ class AuthController:
             )
 
     def _is_action_required_response(self, res: requests.Response) -> bool:
-        url = (res.url or "").lower()
-        text = res.text or ""
-        lowered_text = text.lower()
-
-        url_markers = (
-            "exprypswdnoti",
-            "agreement",
-            "certification",
-            "sleep",
-        )
-        if any(marker in url for marker in url_markers):
-            return True
-
-        # Keep these checks intentionally specific. Authenticated pages commonly
-        # contain generic footer/menu words such as "약관" or "본인확인"; treating
-        # those as action-required markers makes a successful login look failed.
-        # If the page already exposes a logout affordance, it is an authenticated
-        # page and should not be classified as an additional-login-action page
-        # based on body text alone. URL markers above still take precedence for
-        # explicit password/terms/certification flows.
-        if "로그아웃" in text or "logout" in lowered_text:
-            return False
-
-        text_markers = (
-            "exprypswdnoti",
-            "비밀번호 변경 안내",
-            "비밀번호를 변경해",
-            "비밀번호를 변경 하",
-            "다음에 변경",
-            "약관에 동의",
-            "약관 동의",
-            "본인확인이 필요",
-            "본인 확인이 필요",
-            "휴면계정",
-            "휴면 계정",
-        )
-        return any(marker in lowered_text for marker in text_markers)
+        # URL markers take precedence for explicit password/terms/certification
+        # flows; otherwise a page exposing a logout affordance is authenticated.
+        return page_classifier.classify_page(res.url, res.text).action_required
 
     def _is_login_url(self, url: str) -> bool:
         lowered = (url or "").lower()
@@ -325,42 +338,14 @@ class AuthController:
         return None
 
     def _contains_login_failure_keyword(self, text: str) -> bool:
-        lowered = text.lower()
-        failure_keywords = (
-            "로그인 실패",
-            "비밀번호",
-            "아이디",
-            "인증",
-            "본인확인",
-            "휴면",
-            "차단",
-            "captcha",
-            "login failed",
-            "unauthorized",
-            "error",
-        )
-        success_keywords = ("로그아웃", "logout")
-        return any(keyword in lowered for keyword in failure_keywords) and not any(
-            keyword in lowered for keyword in success_keywords
-        )
+        return page_classifier.classify_page("", text).login_failure
 
     def _safe_text_preview(self, text: str, limit: int = 500) -> str:
         sanitized = self._sanitize_log_text(text)
         return sanitized[:limit]
 
     def _sanitize_log_text(self, value) -> str:
-        if value is None:
-            return ""
-        text = str(value)
-        text = re.sub(r"[0-9a-fA-F]{64,}", "[REDACTED_HEX]", text)
-        text = re.sub(r"(?i)(password|passwd|pswd|userPswdEncn|userId|inpUserId)=[^&\s]+", r"\1=[REDACTED]", text)
-        text = re.sub(
-            r"(?i)(['\"]?(?:password|passwd|pswd|userPswdEncn|userId|inpUserId)['\"]?\s*:\s*)['\"]?[^,'\"}]+['\"]?",
-            r"\1[REDACTED]",
-            text,
-        )
-        text = re.sub(r"\s+", " ", text).strip()
-        return text
+        return redaction.redact_text(value)
 
     def _get_safe_cookie_names(self) -> list:
         return sorted({cookie.name for cookie in self.http_client.session.cookies})
@@ -392,7 +377,7 @@ class AuthController:
 
         return ""
             
-    def get_user_balance(self) -> str:
+    def get_user_balance(self, allow_cached: bool = True) -> str:
         try:
              connect_timeout = int(os.getenv("BALANCE_CONNECT_TIMEOUT", "4"))
              read_timeout = int(os.getenv("BALANCE_READ_TIMEOUT", "8"))
@@ -441,20 +426,7 @@ class AuthController:
 
              _refresh_mypage()
 
-             headers = copy.deepcopy(self._REQ_HEADERS)
-             headers.update({
-                "Referer": "https://dhlottery.co.kr/mypage/home",
-                "X-Requested-With": "XMLHttpRequest",
-                "Content-Type": "application/json;charset=UTF-8",
-                "Accept": "application/json, text/javascript, */*; q=0.01",
-                "requestMenuUri": "/mypage/home",
-                "AJAX": "true",
-                "Sec-Fetch-Mode": "cors",
-                "Sec-Fetch-Site": "same-origin",
-                "Sec-Fetch-Dest": "empty"
-             })
-             
-             res = _get_with_retry(headers=headers)
+             res = _get_with_retry(headers=self._balance_headers())
              
              txt = res.text.strip()
              if txt.startswith("<"):
@@ -477,12 +449,44 @@ class AuthController:
              return "0원"
 
         except Exception as e:
-             if self._last_balance:
+             if allow_cached and self._last_balance:
                  logger.warning("[auth] Balance fallback to cached value due to error: %s", e)
                  return self._last_balance
              logger.error("[auth] Balance request ultimately failed: %s", e)
              return "확인 불가"
 
+    def _balance_headers(self) -> dict:
+        headers = copy.deepcopy(self._REQ_HEADERS)
+        headers.update({
+            "Referer": "https://dhlottery.co.kr/mypage/home",
+            "X-Requested-With": "XMLHttpRequest",
+            "Content-Type": "application/json;charset=UTF-8",
+            "Accept": "application/json, text/javascript, */*; q=0.01",
+            "requestMenuUri": "/mypage/home",
+            "AJAX": "true",
+            "Sec-Fetch-Mode": "cors",
+            "Sec-Fetch-Site": "same-origin",
+            "Sec-Fetch-Dest": "empty"
+        })
+        return headers
+
+    def keepalive(self) -> bool:
+        """Touch the session with one small JSON request.
+
+        Returns False when the server no longer treats the session as logged
+        in. Network errors are raised so callers can tell them apart.
+        """
+        timestamp = int(datetime.datetime.now().timestamp() * 1000)
+        url = f"https://dhlottery.co.kr/mypage/selectUserMndp.do?_={timestamp}"
+        res = self.http_client.session.get(
+            url,
+            headers=self._balance_headers(),
+            timeout=self.http_client.timeout,
+        )
+        if res.status_code in (401, 403) or self._is_login_url(res.url):
+            return False
+        return not (res.text or "").lstrip().startswith("<")
+
     def validate_session(self) -> bool:
         url = "https://www.dhlottery.co.kr/mypage/home"
         headers = copy.deepcopy(self._REQ_HEADERS)
@@ -511,7 +515,7 @@ class AuthController:
             logger.warning(
                 "[auth] Session validation unauthorized status=%s body_preview=%s",
                 res.status_code,
-                self._safe_text_preview(res.text),
+                redaction.RedactedText(res.text, limit=500),
             )
             return False
 
@@ -519,7 +523,7 @@ class AuthController:
             logger.warning(
                 "[auth] Session validation failed status=%s body_preview=%s",
                 res.status_code,
-                self._safe_text_preview(res.text),
+                redaction.RedactedText(res.text, limit=500),
             )
             return False
 
@@ -531,15 +535,10 @@ class AuthController:
             logger.info("[auth] Session validation detected login action required url=%s", res.url)
             return False
 
-        text = res.text.lower()
-        if "로그인" in res.text and "로그아웃" not in res.text:
+        if page_classifier.classify_page(res.url, res.text).login_page:
             logger.info("[auth] Session validation detected login page content.")
             return False
 
-        if "login" in text and "logout" not in text and "securitylogincheck" not in text:
-            logger.info("[auth] Session validation detected login page keywords.")
-            return False
-
         return True
 
     def ensure_session(self) -> None:
@@ -0,0 +1,275 @@
+import logging
+import re
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+import common
+import ledger
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+LOTTO645_GAME_PRICE = 1000
+WIN720_TICKET_PRICE = 1000
+# connPro.do always buys one set of five tickets.
+WIN720_ORDER_TICKETS = 5
+
+_WON_AMOUNT_RE = re.compile(r"^\s*([\d,]+)\s*원")
+
+
+def parse_won_amount(balance) -> Optional[int]:
+    if not isinstance(balance, str):
+        return None
+    match = _WON_AMOUNT_RE.match(balance)
+    if not match:
+        return None
+    return int(match.group(1).replace(",", ""))
+
+
+def format_won_amount(amount: int) -> str:
+    return f"{amount:,}원"
+
+
+def lotto645_purchase_cost(response: dict) -> int:
+    """Amount debited by a successful ``execBuy.do`` response, else 0."""
+    if isinstance(response, dict) and isinstance(response.get("orders"), list):
+        # Aggregated batch result: each order is charged on its own.
+        return sum(lotto645_purchase_cost(order) for order in response["orders"])
+
+    result = response.get("result") if isinstance(response, dict) else None
+    if not isinstance(result, dict) or str(result.get("resultMsg", "")).upper() != "SUCCESS":
+        return 0
+
+    try:
+        amount = int(str(result.get("nBuyAmount") or "").replace(",", ""))
+    except ValueError:
+        amount = 0
+    if amount > 0:
+        return amount
+
+    games = result.get("arrGameChoiceNum")
+    return len(games) * LOTTO645_GAME_PRICE if isinstance(games, list) else 0
+
+
+def win720_purchase_cost(response: dict) -> int:
+    """Amount debited by a successful ``connPro.do`` response, else 0."""
+    if isinstance(response, dict) and isinstance(response.get("orders"), list):
+        # Aggregated batch result: each set is charged on its own.
+        return sum(win720_purchase_cost(order) for order in response["orders"])
+    if not isinstance(response, dict) or response.get("resultCode") != "100":
+        return 0
+    try:
+        sale_count = int(response.get("saleCnt") or 0)
+    except (TypeError, ValueError):
+        return 0
+    return max(sale_count, 0) * WIN720_TICKET_PRICE
+
+
+def confirm_with_ledger(purchases: list, entries: Iterable, opening_entries: Optional[Iterable]) -> bool:
+    """Match successful purchase results with today's ledger rows.
+
+    Only rows whose order id was not in ``opening_entries`` (the ledger read
+    before the run) count, so earlier orders of the same round never confirm
+    this run's purchases. Each successful response gets ``ledger`` set to the
+    number of new rows found for its product and round (orders of one round
+    are consumed in result order). Returns ``True`` when every successful
+    order is in the ledger; without an opening snapshot nothing is confirmed.
+    """
+    if opening_entries is None:
+        return False
+    opening = {ledger.entry_id(entry) for entry in opening_entries}
+    rows = Counter(
+        (entry.product_code, entry.round)
+        for entry in entries
+        if entry.round is not None and ledger.entry_id(entry) not in opening
+    )
+    confirmed = True
+    for purchase in purchases:
+        response = purchase.get("response")
+        if not isinstance(response, dict):
+            continue
+        if purchase.get("lottery_type") == "lotto":
+            orders = response.get("orders") if isinstance(response.get("orders"), list) else [response]
+            expected = sum(1 for order in orders if lotto645_purchase_cost(order) > 0)
+            key = (ledger.LOTTO645_CODE, _round_of(response.get("result", {}).get("buyRound")))
+        else:
+            orders = response.get("orders") if isinstance(response.get("orders"), list) else [response]
+            expected = sum(1 for order in orders if win720_purchase_cost(order) > 0)
+            key = (ledger.WIN720_CODE, _round_of(response.get("round")))
+        if not expected:
+            continue
+
+        found = min(rows[key], expected)
+        rows[key] -= found
+        if found < expected:
+            confirmed = False
+            response["ledger"] = f"원장 미확인 ({found}/{expected}건)"
+            logger.warning("[balance] %s round=%s not in ledger (%s/%s)", key[0], key[1], found, expected)
+        else:
+            response["ledger"] = f"원장 확인 {found}건"
+    return confirmed
+
+
+def _round_of(value) -> Optional[int]:
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+class PurchasePlan:
+    """What one account buys this run, decided up front from its opening balance.
+
+    ``skipped`` lists ``(lottery_type, reason)`` for purchases left out.
+    """
+
+    __slots__ = ("balance", "auto_count", "manual_count", "win720_orders", "skipped")
+
+    def __init__(
+        self,
+        balance: Optional[int],
+        auto_count: int,
+        manual_count: int,
+        win720_orders: int,
+        skipped: List[Tuple[str, str]],
+    ):
+        self.balance = balance
+        self.auto_count = auto_count
+        self.manual_count = manual_count
+        self.win720_orders = win720_orders
+        self.skipped = skipped
+
+    @property
+    def lotto_count(self) -> int:
+        return self.auto_count + self.manual_count
+
+    @property
+    def cost(self) -> int:
+        return self.lotto_count * LOTTO645_GAME_PRICE + self.win720_orders * WIN720_ORDER_TICKETS * WIN720_TICKET_PRICE
+
+    @property
+    def nothing(self) -> bool:
+        return self.lotto_count == 0 and self.win720_orders == 0
+
+    def __repr__(self) -> str:
+        return (
+            f"PurchasePlan(balance={self.balance}, auto={self.auto_count}, manual={self.manual_count}, "
+            f"win720={self.win720_orders}, skipped={self.skipped})"
+        )
+
+
+def plan_purchases(balance_amount: Optional[int], auto_count: int, manual_count: int, win720_orders: int = 1) -> PurchasePlan:
+    """Cut the configured purchases down to what ``balance_amount`` can pay for.
+
+    Lotto games are funded first, manual ones before auto ones, then Win720
+    orders from what is left. An unknown balance (``None``) plans everything
+    and leaves the decision to the server.
+    """
+    if balance_amount is None:
+        return PurchasePlan(None, auto_count, manual_count, win720_orders, [])
+
+    remaining = balance_amount
+    manual = min(manual_count, remaining // LOTTO645_GAME_PRICE)
+    remaining -= manual * LOTTO645_GAME_PRICE
+    auto = min(auto_count, remaining // LOTTO645_GAME_PRICE)
+    remaining -= auto * LOTTO645_GAME_PRICE
+    win720_price = WIN720_ORDER_TICKETS * WIN720_TICKET_PRICE
+    win720 = min(win720_orders, remaining // win720_price)
+
+    skipped = []
+    missing_games = auto_count + manual_count - auto - manual
+    if missing_games:
+        skipped.append(("lotto", f"로또 {missing_games}게임 (잔액 {format_won_amount(balance_amount)})"))
+    if win720 < win720_orders:
+        skipped.append(("win720", f"연금복권 {(win720_orders - win720) * WIN720_ORDER_TICKETS}매 (잔액 {format_won_amount(balance_amount)})"))
+    plan = PurchasePlan(balance_amount, auto, manual, win720, skipped)
+    if skipped:
+        logger.warning("[balance] purchase plan reduced: %s", plan)
+    return plan
+
+
+class BalanceTracker:
+    """Keeps an account's balance locally across one purchase run.
+
+    The opening balance is read once after login, purchases are debited as
+    they succeed, and ``reconcile`` compares the result with one closing
+    fetch. Each recorded response gets its ``balance`` filled in there.
+    """
+
+    def __init__(self, username: str = ""):
+        self.username = username
+        self.opening: Optional[int] = None
+        self.closing: Optional[int] = None
+        self.discrepancy: Optional[int] = None
+        self._steps: List[tuple] = []
+
+    def open(self, balance_text: str) -> Optional[int]:
+        self.opening = parse_won_amount(balance_text)
+        return self.opening
+
+    @property
+    def spent(self) -> int:
+        return sum(cost for _, cost in self._steps)
+
+    @property
+    def expected(self) -> Optional[int]:
+        if self.opening is None:
+            return None
+        return max(self.opening - self.spent, 0)
+
+    def record(self, response: dict, cost: int) -> None:
+        self._steps.append((response, cost))
+        logger.info(
+            "[balance] user=%s debit=%s spent=%s expected=%s",
+            self.username,
+            cost,
+            self.spent,
+            self.expected,
+        )
+
+    def reconcile(self, closing_text: Optional[str], confirmed: bool = False) -> Optional[int]:
+        """Fill in per-step balances and return the discrepancy, if any.
+
+        ``closing_text`` may be ``None`` when the ledger has ``confirmed``
+        every purchase; the balances are then exact, not estimates.
+        """
+        self.closing = parse_won_amount(closing_text)
+        self.discrepancy = None
+        expected = self.expected
+        if expected is not None and self.closing is not None and expected != self.closing:
+            self.discrepancy = self.closing - expected
+            logger.warning(
+                "[balance] user=%s balance mismatch opening=%s spent=%s expected=%s actual=%s",
+                self.username,
+                self.opening,
+                self.spent,
+                expected,
+                self.closing,
+            )
+
+        if self.opening is not None:
+            running = self.opening
+            balances = []
+            for _, cost in self._steps:
+                running = max(running - cost, 0)
+                balances.append(format_won_amount(running))
+        elif self.closing is not None:
+            # No opening value: walk backwards from the closing balance.
+            running = self.closing
+            balances = []
+            for _, cost in reversed(self._steps):
+                balances.append(format_won_amount(running))
+                running += cost
+            balances.reverse()
+        else:
+            balances = [closing_text or "조회 안함"] * len(self._steps)
+
+        if self.opening is not None and self.closing is None and not confirmed:
+            balances = [f"{balance_text} (추정)" for balance_text in balances]
+        elif self.discrepancy is not None and balances:
+            balances[-1] = f"{format_won_amount(self.closing)} (예상 {format_won_amount(expected)}, 불일치)"
+
+        for (response, _), balance_text in zip(self._steps, balances):
+            if isinstance(response, dict):
+                response["balance"] = balance_text
+        return self.discrepancy
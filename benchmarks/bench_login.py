@@ -0,0 +1,87 @@
+"""Login latency: regular four-request login vs. ``LOGIN_FAST_PATH``.
+
+Usage: python benchmarks/bench_login.py [iterations] [latency_seconds]
+"""
+import json
+import statistics
+import sys
+import time
+
+from Crypto.PublicKey import RSA
+
+from standin import StandInServer, mount_stand_in
+
+import auth
+from HttpClient import HttpClient, HttpClientSingleton
+
+AUTHENTICATED_PAGE = "<html><body><a href='/user.do?method=logout'>로그아웃</a></body></html>"
+
+
+def build_routes():
+    key = RSA.generate(1024)
+    rsa_body = json.dumps({
+        "data": {"rsaModulus": format(key.n, "x"), "publicExponent": format(key.e, "x")}
+    })
+
+    def login_page(_):
+        return 200, {"Set-Cookie": "JSESSIONID=standin; Path=/", "Content-Type": "text/html"}, "<html>login</html>"
+
+    def rsa_modulus(_):
+        return 200, {"Content-Type": "application/json"}, rsa_body
+
+    def login_check(_):
+        return 302, {"Location": "/common.do?method=main"}, ""
+
+    def authenticated_page(_):
+        return 200, {"Content-Type": "text/html;charset=UTF-8"}, AUTHENTICATED_PAGE
+
+    def root(_):
+        return 200, {}, ""
+
+    return {
+        ("GET", "/user.do"): login_page,
+        ("GET", "/login/selectRsaModulus.do"): rsa_modulus,
+        ("POST", "/login/securityLoginCheck.do"): login_check,
+        ("GET", "/common.do"): authenticated_page,
+        ("GET", "/mypage/home"): authenticated_page,
+        ("HEAD", "/"): root,
+    }
+
+
+def measure(ctrl: auth.AuthController, fast_path: bool, warm: bool, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        ctrl.http_client.session.cookies.clear()
+        if warm:
+            ctrl.http_client.session.cookies.set("JSESSIONID", "warm", domain=".dhlottery.co.kr")
+        started = time.perf_counter()
+        ctrl.login("bench-user", "bench-password", fast_path=fast_path)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+
+    with StandInServer(build_routes(), latency=latency) as server:
+        client = HttpClient(request_delay=0)
+        mount_stand_in(client, server)
+        HttpClientSingleton._instance = client
+        ctrl = auth.AuthController()
+
+        print(f"login latency over {iterations} runs, stand-in latency {latency * 1000:.0f} ms")
+        for label, fast_path, warm in (
+            ("regular", False, False),
+            ("fast path, cold cookies", True, False),
+            ("fast path, warm cookies", True, True),
+        ):
+            samples = measure(ctrl, fast_path, warm, iterations)
+            print(
+                f"  {label:<26} median={statistics.median(samples):7.1f} ms "
+                f"p90={sorted(samples)[int(len(samples) * 0.9) - 1]:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
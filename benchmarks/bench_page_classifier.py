@@ -0,0 +1,76 @@
+"""Page classification: legacy per-call keyword scans vs. page_classifier.
+
+Replays the checks one login performs on the login response and the
+/mypage/home validation page.
+
+Usage: python benchmarks/bench_page_classifier.py [repeat] [page_kb]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import page_classifier
+
+
+def legacy_action_required(url, text):
+    lowered_url = url.lower()
+    lowered_text = text.lower()
+    if any(marker in lowered_url for marker in page_classifier.ACTION_REQUIRED_URL_MARKERS):
+        return True
+    if "로그아웃" in text or "logout" in lowered_text:
+        return False
+    return any(marker in lowered_text for marker in page_classifier.ACTION_REQUIRED_TEXT_MARKERS)
+
+
+def legacy_login_failure(text):
+    lowered = text.lower()
+    return any(keyword in lowered for keyword in page_classifier.LOGIN_FAILURE_MARKERS) and not any(
+        keyword in lowered for keyword in page_classifier.LOGOUT_MARKERS
+    )
+
+
+def legacy_login_page(text):
+    lowered = text.lower()
+    if "로그인" in text and "로그아웃" not in text:
+        return True
+    return "login" in lowered and "logout" not in lowered and "securitylogincheck" not in lowered
+
+
+def legacy_login(url, text):
+    legacy_action_required(url, text)
+    legacy_login_failure(text)
+    legacy_action_required(url, text)
+    legacy_login_page(text)
+
+
+def classifier_login(url, text):
+    # Start from a cold cache so every round pays for one scan.
+    page_classifier._last_classification = (None, None, None)
+    classification = page_classifier.classify_page(url, text)
+    classification.action_required
+    classification.login_failure
+    page_classifier.classify_page(url, text).action_required
+    page_classifier.classify_page(url, text).login_page
+
+
+def build_page(size_kb: int) -> str:
+    row = "<li class='menu-item'><a href='/gameResult.do?method=byWin'>당첨결과 조회 Result</a></li>\n"
+    body = row * max(1, (size_kb * 1024) // len(row.encode("utf-8")))
+    return f"<html><body>{body}<a href='/user.do?method=logout'>로그아웃</a></body></html>"
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    page_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    url = "https://www.dhlottery.co.kr/mypage/home"
+    text = build_page(page_kb)
+
+    for label, func in (("legacy scans", legacy_login), ("page_classifier", classifier_login)):
+        seconds = timeit.timeit(lambda: func(url, text), number=repeat)
+        print(f"{label:<16} {seconds / repeat * 1000:8.3f} ms per login ({page_kb} KB page)")
+
+
+if __name__ == "__main__":
+    main()
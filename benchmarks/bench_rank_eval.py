@@ -0,0 +1,70 @@
+"""Lotto 6/45 rank evaluation: per-game set intersection vs. 45-bit masks.
+
+Evaluates ``tickets x draws`` pairs (1M by default) with the legacy set-based
+check, the pure-Python bitmask path and, when installed, the NumPy batches.
+
+Usage: python benchmarks/bench_rank_eval.py [tickets] [draws]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rank_eval
+
+
+def legacy_rank(nums, main_win_nums, bonus_num):
+    selected = {f"{int(num):02d}" for num in nums}
+    matches = len(selected.intersection(main_win_nums))
+    if matches == 6:
+        return 1
+    if matches == 5:
+        return 2 if bonus_num in selected else 3
+    return {4: 4, 3: 5}.get(matches, 0)
+
+
+def timed(label, pairs, func):
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    print(f"{label:<16} {seconds * 1000:10.1f} ms  {pairs / seconds / 1e6:8.2f} M pairs/s")
+    return result
+
+
+def main():
+    ticket_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    draw_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    pairs = ticket_count * draw_count
+    rng = random.Random(645)
+    tickets = [rng.sample(range(1, 46), 6) for _ in range(ticket_count)]
+    draws = [rng.sample(range(1, 46), 7) for _ in range(draw_count)]
+    print(f"{ticket_count} tickets x {draw_count} draws = {pairs:,} pairs")
+
+    legacy_draws = [([f"{num:02d}" for num in draw[:6]], f"{draw[6]:02d}") for draw in draws]
+    legacy = timed(
+        "legacy sets",
+        pairs,
+        lambda: [[legacy_rank(ticket, main, bonus) for main, bonus in legacy_draws] for ticket in tickets],
+    )
+
+    encoded_tickets = timed("encode", ticket_count, lambda: [rank_eval.encode(ticket) for ticket in tickets])
+    encoded_draws = [rank_eval.encode_draw(draw[:6], draw[6]) for draw in draws]
+
+    python_ranks = timed(
+        "bitmask (py)",
+        pairs,
+        lambda: [[rank_eval.rank(ticket, draw) for draw in encoded_draws] for ticket in encoded_tickets],
+    )
+    assert python_ranks == legacy
+
+    if rank_eval.np is None:
+        print("numpy not installed; skipping vectorized run")
+        return
+    matrix = timed("bitmask (numpy)", pairs, lambda: rank_eval.rank_matrix(encoded_tickets, encoded_draws))
+    assert matrix.tolist() == legacy
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Log redaction cost: eager sanitizing vs. the lazy redaction layer.
+
+Usage: python benchmarks/bench_redaction.py [repeat]
+"""
+import logging
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redaction
+
+
+def build_purchases(count: int = 3) -> list:
+    result = {
+        "oltInetUserId": "002353497",
+        "buyRound": "1150",
+        "arrGameChoiceNum": [f"{slot}|01|05|09|23|29|413" for slot in "ABCDE"],
+        **{f"barCode{index}": "65395" for index in range(1, 7)},
+    }
+    return [
+        {"lottery_type": "lotto", "title": f"purchase {index}", "response": {"result": dict(result), "balance": "37,000원"}}
+        for index in range(count)
+    ]
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    purchases = build_purchases()
+    body = ("<div>userId=alice&amp;menu=1</div> " * 2000) + "a" * 128
+    logger = logging.getLogger("bench_redaction")
+    logger.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+    logger.propagate = False
+
+    for level_name, level in (("enabled", logging.INFO), ("disabled", logging.WARNING)):
+        logger.setLevel(level)
+        eager = timeit.timeit(
+            lambda: logger.info("%s %s", redaction.redact_structure(purchases), redaction.redact_text(body)[:500]),
+            number=repeat,
+        )
+        lazy = timeit.timeit(
+            lambda: logger.info("%s %s", redaction.Redacted(purchases), redaction.RedactedText(body, limit=500)),
+            number=repeat,
+        )
+        print(
+            f"level {level_name:<8} eager={eager / repeat * 1e6:9.1f} us "
+            f"lazy={lazy / repeat * 1e6:9.1f} us per log call"
+        )
+
+
+if __name__ == "__main__":
+    main()
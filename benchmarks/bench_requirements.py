@@ -0,0 +1,75 @@
+"""game645.do requirement extraction: full html5lib parse vs. the tiered extractor.
+
+Builds a synthetic corpus of game pages (small/medium/large) and reports time
+and peak allocation for each extraction tier.
+
+Usage: python benchmarks/bench_requirements.py [repeat]
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup as BS, SoupStrainer
+
+import lotto645
+
+KEYS = ("ROUND_DRAW_DATE", "WAMT_PAY_TLMT_END_DT", "curRound")
+
+
+def build_page(rows: int) -> str:
+    row = (
+        "<tr><td class='num'><label><input type='checkbox' name='check645num' value='{n}'>"
+        "<span>{n}</span></label></td><td>자동/수동 선택</td></tr>\n"
+    )
+    table = "".join(row.format(n=index % 45 + 1) for index in range(rows))
+    script = "<script>var lottoGame = {{ price: 1000, max: 5 }}; function init() {{ return {rows}; }}</script>\n"
+    return (
+        "<html><head><title>로또6/45</title>" + script.format(rows=rows) * (rows // 20 + 1) + "</head><body>"
+        "<form id='frmGame'>"
+        "<input type='hidden' id='curRound' value='1150'>"
+        "<input type='hidden' id='ROUND_DRAW_DATE' value='2024-12-28'>"
+        "<input type='hidden' id='WAMT_PAY_TLMT_END_DT' value='2025-12-29'>"
+        f"<table>{table}</table></form></body></html>"
+    )
+
+
+def full_parse(html: str) -> dict:
+    soup = BS(html, "html5lib")
+    return {key: soup.find("input", id=key).get("value") for key in KEYS}
+
+
+def strained_parse(html: str) -> dict:
+    soup = BS(html, "html.parser", parse_only=SoupStrainer("input"))
+    return {key: soup.find("input", id=key).get("value") for key in KEYS}
+
+
+def fast_extract(html: str) -> dict:
+    return lotto645._extract_fields_fast(html, KEYS)
+
+
+def peak_bytes(func, html: str) -> int:
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    corpus = {"small": build_page(50), "medium": build_page(500), "large": build_page(3000)}
+
+    for name, html in corpus.items():
+        expected = full_parse(html)
+        print(f"{name} page ({len(html.encode('utf-8')) // 1024} KB)")
+        for label, func in (("html5lib", full_parse), ("strained", strained_parse), ("regex", fast_extract)):
+            assert func(html) == expected, label
+            seconds = timeit.timeit(lambda: func(html), number=repeat) / repeat
+            print(f"  {label:<9} {seconds * 1000:9.3f} ms  peak {peak_bytes(func, html) / 1024:9.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Win720 payload crypto: PBKDF2 per payload vs. the cached session key.
+
+Needs pycryptodome (and the other win720 imports).
+
+Usage: python benchmarks/bench_win720_crypto.py [repeat]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import PBKDF2
+
+import win720
+
+
+def make_client() -> win720.Win720:
+    client = win720.Win720.__new__(win720.Win720)
+    client._salt_key_code = None
+    client._salt = b""
+    client._prepared = {}
+    client.keyCode = "0123456789ABCDEF0123456789ABCDEF.worker1"
+    return client
+
+
+def chain(client: win720.Win720) -> None:
+    # makeAutoNo, makeOrderNo and connPro each encrypt a request and decrypt
+    # the response; responses echo the request salt here.
+    for payload in ("ROUND=300&SEL_NO=", "ROUND=300&SEL_NO=123456", "ROUND=300&BUY_CNT=5"):
+        client._decText(client._encText(payload))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    client = make_client()
+
+    def uncached():
+        win720._derive_key.cache_clear()
+        client._salt_key_code = None
+        chain(client)
+
+    derive = timeit.timeit(
+        lambda: PBKDF2(client.keyCode[:32], os.urandom(32), client.BlockSize, count=client.iterationCount, hmac_hash_module=SHA256),
+        number=repeat,
+    )
+    cold = timeit.timeit(uncached, number=repeat)
+    client.prepare(client.keyCode, "300")
+    warm = timeit.timeit(lambda: chain(client), number=repeat)
+    print(f"pbkdf2 {derive / repeat * 1e3:8.3f} ms per derivation")
+    print(f"chain  cold={cold / repeat * 1e3:8.3f} ms warm={warm / repeat * 1e3:8.3f} ms per purchase chain")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Local stand-in for the dhlottery hosts used by the benchmarks.
+
+``StandInServer`` serves canned responses for a handful of paths with an
+artificial per-request latency, and ``mount_stand_in`` routes an HttpClient's
+requests for the real hosts to it.
+"""
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STAND_IN_HOSTS = (
+    "https://www.dhlottery.co.kr",
+    "https://dhlottery.co.kr",
+    "https://ol.dhlottery.co.kr",
+    "https://el.dhlottery.co.kr",
+)
+
+
+class StandInServer:
+    """Threaded HTTP server answering ``routes[(method, path)]``.
+
+    A route value is a callable ``handler(request) -> (status, headers, body)``.
+    """
+
+    def __init__(self, routes: dict, latency: float = 0.03):
+        self.routes = routes
+        self.latency = latency
+        self.hits = {}
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _serve(self, method):
+                path = self.path.split("?", 1)[0]
+                server.hits[(method, path)] = server.hits.get((method, path), 0) + 1
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                time.sleep(server.latency)
+                route = server.routes.get((method, path))
+                if route is None:
+                    status, headers, body = 404, {}, b""
+                else:
+                    status, headers, body = route(self)
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if method != "HEAD":
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def do_HEAD(self):
+                self._serve("HEAD")
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self.base_url = "http://127.0.0.1:{}".format(self._httpd.server_address[1])
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class _StandInAdapter(HTTPAdapter):
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self._base = urlsplit(base_url)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = urlunsplit((self._base.scheme, self._base.netloc, parts.path, parts.query, ""))
+        return super().send(request, **kwargs)
+
+
+def mount_stand_in(http_client, server: StandInServer) -> None:
+    adapter = _StandInAdapter(server.base_url)
+    for host in STAND_IN_HOSTS:
+        http_client.session.mount(host, adapter)
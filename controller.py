@@ -1,12 +1,26 @@
+import datetime
 import os
 import sys
 import logging
 from dotenv import load_dotenv
 
 import auth
+import balance
+import draw_calendar
+import draw_store
+import ledger
 import lotto645
+import lotto_ticket
 import win720
 import notification
+import number_generator
+import purchase_journal
+import rank_eval
+import redaction
+import round_cache
+import session_manager
+import session_pool
+import winning_store
 import time
 import requests
 from HttpClient import HttpClientSingleton
@@ -16,25 +30,49 @@ common.setup_logging()
 logger = logging.getLogger(__name__)
 
 
-def buy_lotto645(authCtrl: auth.AuthController, cnt: int, mode: str, manual_numbers: list = None):
-    lotto = lotto645.Lotto645()
+def buy_lotto645(
+    authCtrl: auth.AuthController,
+    cnt: int,
+    mode: str,
+    manual_numbers: list = None,
+    metadata_cache: round_cache.RoundMetadataCache = None,
+    journal: purchase_journal.PurchaseJournal = None,
+    account: str = "",
+):
+    lotto = lotto645.Lotto645(authCtrl.http_client, metadata_cache=metadata_cache)
     _mode = lotto645.Lotto645Mode[mode.upper()]
-    return lotto.buy_lotto645(authCtrl, cnt, _mode, manual_numbers=manual_numbers)
+    return lotto.buy_lotto645(authCtrl, cnt, _mode, manual_numbers=manual_numbers, journal=journal, account=account)
+
+
+def buy_lotto645_batch(
+    authCtrl: auth.AuthController,
+    games: list,
+    metadata_cache: round_cache.RoundMetadataCache = None,
+    journal: purchase_journal.PurchaseJournal = None,
+    account: str = "",
+):
+    lotto = lotto645.Lotto645(authCtrl.http_client, metadata_cache=metadata_cache)
+    return lotto.buy_lotto645_batch(authCtrl, games, journal=journal, account=account)
 
 
 def check_winning_lotto645(authCtrl: auth.AuthController) -> dict:
-    lotto = lotto645.Lotto645()
+    lotto = lotto645.Lotto645(authCtrl.http_client)
     item = lotto.check_winning(authCtrl)
     return item
 
 
-def buy_win720(authCtrl: auth.AuthController, username: str):
-    pension = win720.Win720()
-    return pension.buy_Win720(authCtrl, username)
+def buy_win720(authCtrl: auth.AuthController, username: str, journal: purchase_journal.PurchaseJournal = None):
+    pension = win720.Win720(authCtrl.http_client)
+    return pension.buy_Win720(authCtrl, username, journal=journal)
+
+
+def buy_win720_batch(authCtrl: auth.AuthController, username: str, orders: int, journal: purchase_journal.PurchaseJournal = None):
+    pension = win720.Win720(authCtrl.http_client)
+    return pension.buy_Win720_batch(authCtrl, username, orders, journal=journal)
 
 
 def check_winning_win720(authCtrl: auth.AuthController) -> dict:
-    pension = win720.Win720()
+    pension = win720.Win720(authCtrl.http_client)
     item = pension.check_winning(authCtrl)
     return item
 
@@ -46,7 +84,7 @@ def send_message(mode: int, lottery_type: int, response: dict, token: str, chat_
         userid,
         mode,
         lottery_type,
-        response,
+        redaction.Redacted(response),
     )
 
     if mode == 0:
@@ -172,58 +210,42 @@ def _send_login_failure_summary(username: str, reason: str, telegram_bot_token:
 
 
 def _sanitize_purchase_results_for_log(purchases):
-    sensitive_keys = {
-        "oltInetUserId",
-        "barCode1",
-        "barCode2",
-        "barCode3",
-        "barCode4",
-        "barCode5",
-        "barCode6",
-        "saleTicket",
-        "failTicket",
-        "prchsLtNoInfoLstCn",
-    }
+    return redaction.redact_structure(purchases)
 
-    def _sanitize(value, key=None):
-        if key in sensitive_keys:
-            return "***" if value else value
-        if key == "arrGameChoiceNum" and isinstance(value, list):
-            return [str(item)[:2] + "***" for item in value]
-        if isinstance(value, dict):
-            return {child_key: _sanitize(child_value, child_key) for child_key, child_value in value.items()}
-        if isinstance(value, list):
-            return [_sanitize(item) for item in value]
-        return value
 
-    return _sanitize(purchases)
+def _todays_ledger_entries(authCtrl: auth.AuthController) -> list:
+    """Today's (KST) lotto645 and Win720 ledger rows in one pass."""
+    headers = lotto645.Lotto645(authCtrl.http_client).ledger_headers()
+    today = datetime.datetime.now(draw_calendar.KST).date()
+    reader = ledger.LedgerReader(authCtrl.http_client, headers)
+    return list(reader.iter_entries(today, today, (ledger.LOTTO645_CODE, ledger.WIN720_CODE)))
 
 
-def _parse_won_amount(balance: str):
-    if not isinstance(balance, str):
-        return None
-    digits = "".join(ch for ch in balance if ch.isdigit())
-    return int(digits) if digits else None
+def _lotto_title_and_mode(auto_count: int, manual_count: int):
+    # AUTO and MANUAL slots go out in one execBuy.do request.
+    if auto_count > 0 and manual_count > 0:
+        return "로또 자동/수동 구매", "MIXED"
+    if manual_count > 0:
+        return "로또 수동 구매", "MANUAL"
+    return "로또 자동 구매", "AUTO"
 
 
-def _format_won_amount(amount: int) -> str:
-    return f"{amount:,}원"
-
-
-def _estimate_win720_balance(response: dict, previous_balance: str):
-    previous_amount = _parse_won_amount(previous_balance)
-    if previous_amount is None or not isinstance(response, dict):
-        return None
-
-    try:
-        sale_count = int(response.get("saleCnt") or 0)
-    except (TypeError, ValueError):
-        sale_count = 0
+def _past_winning_masks() -> set:
+    """Masks of every known lotto645 winning set, so generated sets never repeat one."""
+    masks = set()
+    store = winning_store.get_store()
+    for round_no in store.rounds(lotto645.WINNING_STORE_PRODUCT):
+        masks.add(rank_eval.encode(store.get(lotto645.WINNING_STORE_PRODUCT, round_no).numbers))
 
-    if sale_count <= 0 or response.get("resultCode") != "100":
-        return None
+    archive_path = os.path.join(os.getenv("DRAW_STORE_DIR", ".cache"), "draws_lotto645.bin")
+    if os.path.exists(archive_path):
+        archive = draw_store.DrawArchive(draw_store.LOTTO645.name, archive_path)
+        try:
+            masks.update(rank_eval.encode(draw.numbers) for draw in draw_store.iter_draws(archive))
+        finally:
+            archive.close()
+    return masks
 
-    return _format_won_amount(max(previous_amount - (sale_count * 1000), 0)) + " (추정)"
 
 def buy():
     load_dotenv()
@@ -232,6 +254,7 @@ def buy():
     passwords = os.environ.get('PASSWORD', '').splitlines()
     auto_count = int(os.environ.get('AUTO_COUNT') or '3')
     manual_count = int(os.environ.get('MANUAL_COUNT') or '2')
+    win720_orders = int(os.environ.get('WIN720_ORDERS') or '1')
     manual_numbers_raw = os.environ.get('MANUAL_NUMBERS_RAW', '').splitlines()
     telegram_bot_token = os.environ.get('TELEGRAM_BOT_TOKEN')
     telegram_chat_id = os.environ.get('TELEGRAM_CHAT_ID')
@@ -240,31 +263,22 @@ def buy():
         logger.warning("Telegram 환경 변수가 설정되지 않았습니다.")
         return
 
-    total_count = auto_count + manual_count
-    if total_count > 5:
-        logger.warning("AUTO_COUNT와 MANUAL_COUNT의 합은 최대 5개여야 합니다.")
-        return
-
     manual_numbers = []
     for line in manual_numbers_raw:
         try:
-            raw_numbers = [part.strip() for part in line.split(',') if part.strip()]
-            if len(raw_numbers) != 6:
-                raise ValueError("번호는 6개여야 합니다.")
-
-            formatted_numbers = []
-            for raw in raw_numbers:
-                num = int(raw)
-                if not 1 <= num <= 45:
-                    raise ValueError("각 번호는 1~45 사이여야 합니다.")
-                formatted_numbers.append(f"{num:02d}")
-
-            manual_numbers.append(formatted_numbers)
+            manual_numbers.append(lotto_ticket.LottoTicket.parse(line))
         except ValueError as e:
             logger.error("수동 번호 처리 중 오류 발생: %s", e)
             return
 
-    if len(manual_numbers) != manual_count:
+    manual_generator = None
+    if manual_count > 0 and not manual_numbers and os.environ.get('MANUAL_GENERATE') == '1':
+        try:
+            manual_generator = number_generator.from_env(past_draws=_past_winning_masks())
+        except ValueError as e:
+            logger.error("수동 번호 생성 설정 오류: %s", e)
+            return
+    elif len(manual_numbers) != manual_count:
         logger.warning("MANUAL_COUNT와 제공된 수동 번호의 개수가 일치하지 않습니다.")
         return
 
@@ -272,10 +286,24 @@ def buy():
         logger.error("[controller] 네트워크 연결 실패로 구매를 중단합니다.")
         return
 
-    def _retry_purchase(label, func, attempts=6, delay=1, reauth=None, reauth_attempts=2):
+    def _retry_purchase(label, func, attempts=6, delay=1, session=None, reauth_attempts=2):
         last_exc = None
         reauth_used = 0
+
+        def _reauth(generation, verify, reason):
+            nonlocal reauth_used
+            if session is None or reauth_used >= reauth_attempts:
+                return
+            logger.info("[controller] %s %s", label, reason)
+            try:
+                if session.reauthenticate(generation, verify=verify):
+                    reauth_used += 1
+            except Exception as login_exc:
+                reauth_used += 1
+                logger.error("[controller] %s 재로그인 실패: %s", label, login_exc)
+
         for attempt in range(1, attempts + 1):
+            generation = session.generation if session else None
             try:
                 return func()
             except auth.SessionValidationError as exc:
@@ -287,13 +315,8 @@ def buy():
                     attempts,
                     exc,
                 )
-                if reauth and reauth_used < reauth_attempts:
-                    reauth_used += 1
-                    logger.info("[controller] %s 로그인 재시도 후 재구매합니다.", label)
-                    try:
-                        reauth()
-                    except Exception as login_exc:
-                        logger.error("[controller] %s 재로그인 실패: %s", label, login_exc)
+                # ensure_session has just rejected the session; no need to validate again.
+                _reauth(generation, False, "로그인 재시도 후 재구매합니다.")
                 if attempt < attempts:
                     time.sleep(delay * attempt)
                     continue
@@ -304,13 +327,7 @@ def buy():
                     f"(시도 {attempt}/{attempts}, status={exc.status_code}, "
                     f"content_type={exc.content_type})."
                 )
-                if reauth and reauth_used < reauth_attempts:
-                    reauth_used += 1
-                    logger.info("[controller] %s 로그인 재시도 후 재구매합니다.", label)
-                    try:
-                        reauth()
-                    except Exception as login_exc:
-                        logger.error("[controller] %s 재로그인 실패: %s", label, login_exc)
+                _reauth(generation, True, "세션 확인 후 필요하면 재로그인합니다.")
                 if attempt < attempts:
                     time.sleep(delay * attempt)
                     continue
@@ -323,95 +340,137 @@ def buy():
                     attempts,
                     exc,
                 )
-                http_client = HttpClientSingleton.get_instance()
+                # A pooled session has its own client; the purchase ran on that one.
+                http_client = session.auth_ctrl.http_client if session else HttpClientSingleton.get_instance()
                 if hasattr(http_client, "reset_connection_pool"):
                     http_client.reset_connection_pool()
-                if reauth and reauth_used < reauth_attempts and attempt % 2 == 0:
-                    reauth_used += 1
-                    logger.info("[controller] %s 네트워크 오류 후 재로그인합니다.", label)
-                    try:
-                        reauth()
-                    except Exception as login_exc:
-                        logger.error("[controller] %s 재로그인 실패: %s", label, login_exc)
+                if attempt % 2 == 0:
+                    _reauth(generation, True, "네트워크 오류 후 세션을 확인합니다.")
                 if attempt < attempts:
                     time.sleep(delay * attempt)
         raise last_exc
 
+    pool = None
+    pool_size = int(os.environ.get("SESSION_POOL_SIZE") or "0")
+    if pool_size > 0:
+        pool = session_pool.SessionPool(capacity=pool_size)
+        pool.start_heartbeat()
+        # Later accounts log in while earlier ones are buying.
+        pool.warm(zip(usernames, passwords))
+    sessions = session_manager.SessionManager(pool=pool)
+    lotto_round_cache = round_cache.RoundMetadataCache()
+    # Every retry below checks the ledger through the journal before resending.
+    journal = purchase_journal.get_journal()
+    retry_delay = float(os.environ.get("PURCHASE_RETRY_DELAY", "0.3"))
+
     for username, password in zip(usernames, passwords):
         logger.info("Processing for user: %s", username)
 
-        globalAuthCtrl = auth.AuthController()
         try:
-            if hasattr(globalAuthCtrl, 'http_client') and hasattr(globalAuthCtrl.http_client, 'session'):
-                try:
-                    globalAuthCtrl.http_client.session.cookies.clear()
-                except Exception:
-                    pass
-
-            try:
-                globalAuthCtrl.login(username, password)
-            except Exception as e:
-                logger.error("[controller] 로그인 실패 for user %s: %s", username, e)
-                _send_login_failure_summary(username, str(e), telegram_bot_token, telegram_chat_id)
-                continue
-        except Exception:
-            try:
-                globalAuthCtrl.login(username, password)
-            except Exception as e:
-                logger.error("[controller] 로그인 실패 for user %s: %s", username, e)
-                _send_login_failure_summary(username, str(e), telegram_bot_token, telegram_chat_id)
-                continue
+            session = sessions.session(username, password)
+            session.ensure_logged_in()
+        except Exception as e:
+            logger.error("[controller] 로그인 실패 for user %s: %s", username, e)
+            _send_login_failure_summary(username, str(e), telegram_bot_token, telegram_chat_id)
+            continue
+        globalAuthCtrl = session.auth_ctrl
 
-        def _safe_balance() -> str:
+        def _safe_balance(allow_cached: bool = True) -> str:
             try:
-                return globalAuthCtrl.get_user_balance()
+                return globalAuthCtrl.get_user_balance(allow_cached=allow_cached)
             except Exception as exc:
                 return f"조회 실패: {exc}"
 
+        tracker = balance.BalanceTracker(username)
+        opening_text = _safe_balance()
+        tracker.open(opening_text)
+
         purchase_results = []
 
-        if auto_count > 0:
-            try:
-                response = _retry_purchase(
-                    "로또 자동 구매",
-                    lambda: buy_lotto645(globalAuthCtrl, auto_count, "AUTO"),
-                    reauth=lambda: globalAuthCtrl.login(username, password),
-                )
-            except requests.RequestException as exc:
-                response = {"result": {"resultMsg": f"NETWORK_ERROR: {exc}"}}
-            except lotto645.NonJsonResponseError as exc:
-                response = {"result": {"resultMsg": f"NON_JSON_RESPONSE: {exc}"}}
-            except Exception as exc:
-                logger.error("[controller] 로또 자동 구매 실패 for user %s: %s", username, exc)
-                response = {"result": {"resultMsg": f"ERROR: {exc}"}}
-            response['balance'] = _safe_balance()
-            purchase_results.append({"lottery_type": "lotto", "title": "로또 자동 구매", "response": response})
+        # One balance reading decides what can be bought before any purchase request.
+        plan = balance.plan_purchases(tracker.opening, auto_count, manual_count, win720_orders)
+        lotto_title, lotto_mode = _lotto_title_and_mode(plan.auto_count, plan.manual_count)
+        for lottery_type, reason in plan.skipped:
+            message = f"SKIPPED: 잔액 부족 - {reason}"
+            if lottery_type == "lotto":
+                title, response = "로또 구매", {"result": {"resultMsg": message}}
+            else:
+                title, response = "연금복권 구매", {"resultCode": "SKIPPED", "resultMsg": message}
+            tracker.record(response, 0)
+            purchase_results.append({"lottery_type": lottery_type, "title": title, "response": response})
+
+        if plan.nothing:
+            logger.warning("[controller] 잔액 부족으로 구매를 건너뜁니다 user=%s balance=%s", username, opening_text)
+            tracker.reconcile(opening_text)
+            notification.Notification().send_buying_summary_message(
+                username, purchase_results, telegram_bot_token, telegram_chat_id
+            )
+            continue
 
-        time.sleep(3)
+        # Today's rows before any purchase, so earlier orders of the round are not taken for this run's.
+        try:
+            opening_entries = _todays_ledger_entries(globalAuthCtrl)
+        except Exception as exc:
+            logger.warning("[controller] 구매 전 원장 조회 실패 for user %s: %s", username, exc)
+            opening_entries = None
+
+        total_count = plan.lotto_count
+        # Generated sets differ per account; retries reuse the same sets.
+        try:
+            user_manual_numbers = (
+                manual_generator.generate(plan.manual_count) if manual_generator else manual_numbers[:plan.manual_count]
+            )
+        except number_generator.GeneratorExhausted as exc:
+            # The constraints left no set for this account; the others still buy.
+            logger.error("[controller] %s 번호 생성 실패 for user %s: %s", lotto_title, username, exc)
+            response = {"result": {"resultMsg": f"ERROR: 수동 번호 생성 실패 - {exc}"}}
+            tracker.record(response, 0)
+            purchase_results.append({"lottery_type": "lotto", "title": lotto_title, "response": response})
+            user_manual_numbers = []
+            total_count = 0
+
+        if total_count > lotto645.SLOTS_PER_ORDER:
+            buy_lotto = lambda: buy_lotto645_batch(
+                globalAuthCtrl,
+                [None] * plan.auto_count + list(user_manual_numbers),
+                metadata_cache=lotto_round_cache,
+                journal=journal,
+                account=username,
+            )
+        else:
+            buy_lotto = lambda: buy_lotto645(
+                globalAuthCtrl,
+                total_count,
+                lotto_mode,
+                manual_numbers=user_manual_numbers,
+                metadata_cache=lotto_round_cache,
+                journal=journal,
+                account=username,
+            )
 
-        if manual_count > 0:
+        if total_count > 0:
             try:
                 response = _retry_purchase(
-                    "로또 수동 구매",
-                    lambda: buy_lotto645(globalAuthCtrl, manual_count, "MANUAL", manual_numbers=manual_numbers),
-                    reauth=lambda: globalAuthCtrl.login(username, password),
+                    lotto_title,
+                    buy_lotto,
+                    delay=retry_delay,
+                    session=session,
                 )
             except requests.RequestException as exc:
                 response = {"result": {"resultMsg": f"NETWORK_ERROR: {exc}"}}
             except lotto645.NonJsonResponseError as exc:
                 response = {"result": {"resultMsg": f"NON_JSON_RESPONSE: {exc}"}}
             except Exception as exc:
-                logger.error("[controller] 로또 수동 구매 실패 for user %s: %s", username, exc)
+                logger.error("[controller] %s 실패 for user %s: %s", lotto_title, username, exc)
                 response = {"result": {"resultMsg": f"ERROR: {exc}"}}
-            response['balance'] = _safe_balance()
-            purchase_results.append({"lottery_type": "lotto", "title": "로또 수동 구매", "response": response})
+            tracker.record(response, balance.lotto645_purchase_cost(response))
+            purchase_results.append({"lottery_type": "lotto", "title": lotto_title, "response": response})
 
-        time.sleep(3)
-
-        can_buy_win720 = True
+        can_buy_win720 = plan.win720_orders > 0
         try:
-            globalAuthCtrl.http_client.session.cookies.clear()
-            globalAuthCtrl.login(username, password)
+            if can_buy_win720:
+                time.sleep(3)
+                session.reauthenticate(verify=True)
         except Exception as e:
             logger.error("[controller] 연금복권 구매 전 재로그인 실패 for user %s: %s", username, e)
             can_buy_win720 = False
@@ -420,47 +479,71 @@ def buy():
             purchase_results.append({"lottery_type": "win720", "title": "연금복권 구매", "response": response})
 
         if can_buy_win720:
-            win720_previous_balance = getattr(globalAuthCtrl, "_last_balance", None)
+            if plan.win720_orders > 1:
+                buy_pension = lambda: buy_win720_batch(globalAuthCtrl, username, plan.win720_orders, journal=journal)
+            else:
+                buy_pension = lambda: buy_win720(globalAuthCtrl, username, journal=journal)
             try:
                 response = _retry_purchase(
                     "연금복권 구매",
-                    lambda: buy_win720(globalAuthCtrl, username),
+                    buy_pension,
                     attempts=int(os.environ.get("WIN720_PURCHASE_MAX_ATTEMPTS", "8")),
-                    delay=float(os.environ.get("WIN720_PURCHASE_RETRY_DELAY", "2")),
-                    reauth=lambda: globalAuthCtrl.login(username, password),
+                    delay=float(os.environ.get("WIN720_PURCHASE_RETRY_DELAY", str(retry_delay))),
+                    session=session,
                     reauth_attempts=int(os.environ.get("WIN720_REAUTH_ATTEMPTS", "3")),
                 )
             except requests.RequestException as e:
                 logger.error("[controller] 연금복권 구매 실패 for user %s: %s", username, e)
                 response = {"resultCode": "NETWORK_ERROR", "resultMsg": f"NETWORK_ERROR: {e}"}
-                response["balance"] = _safe_balance()
             except Exception as e:
                 logger.error("[controller] 연금복권 구매 실패 for user %s: %s", username, e)
                 response = {"resultCode": "ERROR", "resultMsg": f"ERROR: {e}"}
-                response["balance"] = _safe_balance()
-            else:
-                fetched_balance = _safe_balance()
-                estimated_balance = _estimate_win720_balance(response, win720_previous_balance)
-                if estimated_balance and fetched_balance == win720_previous_balance:
-                    logger.warning(
-                        "[controller] 연금복권 구매 후 잔액 조회가 이전 캐시값과 같아 차감 예상 잔액을 사용합니다. previous=%s estimated=%s",
-                        win720_previous_balance,
-                        estimated_balance,
-                    )
-                    response["balance"] = estimated_balance
-                else:
-                    response["balance"] = fetched_balance
+            tracker.record(response, balance.win720_purchase_cost(response))
             purchase_results.append({"lottery_type": "win720", "title": "연금복권 구매", "response": response})
 
+        # One ledger read confirms the run; the balance endpoint is only asked when it cannot.
+        try:
+            confirmed = balance.confirm_with_ledger(
+                purchase_results, _todays_ledger_entries(globalAuthCtrl), opening_entries
+            )
+        except Exception as exc:
+            logger.warning("[controller] 원장 확인 실패 for user %s: %s", username, exc)
+            confirmed = False
+        if confirmed:
+            tracker.reconcile(None, confirmed=True)
+        else:
+            tracker.reconcile(_safe_balance(allow_cached=False))
+
         if purchase_results:
             notify = notification.Notification()
             logger.info(
                 "[controller] sending buying summary for user=%s: %s",
                 username,
-                _sanitize_purchase_results_for_log(purchase_results),
+                redaction.Redacted(purchase_results),
             )
             notify.send_buying_summary_message(username, purchase_results, telegram_bot_token, telegram_chat_id)
 
+    sessions.log_summary()
+    sessions.close()
+
+
+def backfill_draws():
+    load_dotenv()
+
+    http_client = HttpClientSingleton.get_instance()
+    last_round = draw_calendar.get_calendar().current_round(draw_calendar.LOTTO645.name).round - 1
+    archive = draw_store.DrawArchive(draw_store.LOTTO645.name)
+    try:
+        added = draw_store.backfill(
+            archive,
+            draw_store.lotto645_fetcher(http_client),
+            last_round,
+            map_concurrent=http_client.map_concurrent,
+        )
+    finally:
+        archive.close()
+    logger.info("[controller] 로또 당첨번호 %s회차 저장 완료 (마지막 회차: %s)", added, last_round)
+
 
 def run():
     if len(sys.argv) < 2:
@@ -473,6 +556,8 @@ def run():
         check()
     elif sys.argv[1] == "check_win":
         check_win()
+    elif sys.argv[1] == "backfill":
+        backfill_draws()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+import common
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+KST = datetime.timezone(datetime.timedelta(hours=9))
+SATURDAY = 5
+THURSDAY = 3
+
+
+class ProductSchedule:
+    __slots__ = ("name", "anchor_round", "anchor_date", "draw_weekday", "sales_close")
+
+    def __init__(self, name: str, anchor_round: int, anchor_date: datetime.date, draw_weekday: int, sales_close: datetime.time):
+        self.name = name
+        self.anchor_round = anchor_round
+        self.anchor_date = anchor_date
+        self.draw_weekday = draw_weekday
+        self.sales_close = sales_close
+
+
+# Round 1 of each product and the weekly rule that has held since.
+LOTTO645 = ProductSchedule("lotto645", 1, datetime.date(2002, 12, 7), SATURDAY, datetime.time(20, 0))
+WIN720 = ProductSchedule("win720", 1, datetime.date(2020, 5, 7), THURSDAY, datetime.time(19, 0))
+PRODUCTS = {schedule.name: schedule for schedule in (LOTTO645, WIN720)}
+
+
+class RoundInfo:
+    __slots__ = ("product", "round", "draw_date", "sales_close", "payout_deadline")
+
+    def __init__(self, product: str, round_no: int, draw_date: datetime.date, sales_close: datetime.datetime, payout_deadline: datetime.date):
+        self.product = product
+        self.round = round_no
+        self.draw_date = draw_date
+        self.sales_close = sales_close
+        self.payout_deadline = payout_deadline
+
+    def __repr__(self) -> str:
+        return (
+            f"RoundInfo(product={self.product!r}, round={self.round}, draw_date={self.draw_date}, "
+            f"payout_deadline={self.payout_deadline})"
+        )
+
+
+class DrawCalendar:
+    """Computes rounds, draw dates, sales cutoffs and payout deadlines offline.
+
+    Rounds follow from each product's anchor and weekly draw day. Overrides
+    cover the exceptions: ``skipped_draws`` (dates with no draw, which shift
+    later round numbers), ``draw_date_overrides`` (a round drawn on another
+    day) and ``holidays`` (payout deadlines on a holiday move to the next
+    business day). ``cross_check`` compares the result with the site in the
+    background and adopts the site's round if the two disagree.
+    """
+
+    def __init__(
+        self,
+        holidays: Iterable[datetime.date] = (),
+        skipped_draws: Optional[Dict[str, Iterable[datetime.date]]] = None,
+        draw_date_overrides: Optional[Dict[str, Dict[int, datetime.date]]] = None,
+        cross_check_interval: Optional[float] = None,
+    ):
+        self.holidays = frozenset(holidays)
+        self.skipped_draws = {name: sorted(dates) for name, dates in (skipped_draws or {}).items()}
+        self.draw_date_overrides = {name: dict(rounds) for name, rounds in (draw_date_overrides or {}).items()}
+        self.cross_check_interval = cross_check_interval or float(os.getenv("DRAW_CALENDAR_CROSS_CHECK_INTERVAL", "86400"))
+        self._corrections: Dict[str, int] = {}
+        self._last_cross_check: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "DrawCalendar":
+        """Load overrides from JSON::
+
+            {"holidays": ["2025-01-28"],
+             "skipped_draws": {"win720": ["2025-01-30"]},
+             "draw_date_overrides": {"lotto645": {"1160": "2025-02-23"}}}
+        """
+        with open(path, encoding="utf-8") as handle:
+            config = json.load(handle)
+        return cls(
+            holidays=[_parse_date(text) for text in config.get("holidays", [])],
+            skipped_draws={
+                name: [_parse_date(text) for text in dates]
+                for name, dates in config.get("skipped_draws", {}).items()
+            },
+            draw_date_overrides={
+                name: {int(round_no): _parse_date(text) for round_no, text in rounds.items()}
+                for name, rounds in config.get("draw_date_overrides", {}).items()
+            },
+        )
+
+    def current_round(self, product: str, now: Optional[datetime.datetime] = None) -> RoundInfo:
+        """Return the round on sale at ``now`` (KST)."""
+        schedule = PRODUCTS[product]
+        now = _to_kst(now)
+        today = now.date()
+        draw_date = today + datetime.timedelta(days=(schedule.draw_weekday - today.weekday()) % 7)
+        if draw_date == today and now.time() >= schedule.sales_close:
+            draw_date += datetime.timedelta(days=7)
+        while draw_date in self.skipped_draws.get(product, ()):
+            draw_date += datetime.timedelta(days=7)
+
+        info = self.round_info(product, self._round_for_slot(schedule, draw_date))
+        if info.sales_close <= now:
+            info = self.round_info(product, info.round + 1)
+        return info
+
+    def round_info(self, product: str, round_no: int) -> RoundInfo:
+        schedule = PRODUCTS[product]
+        calendar_round = round_no - self._corrections.get(product, 0)
+        draw_date = self.draw_date_overrides.get(product, {}).get(round_no)
+        if draw_date is None:
+            draw_date = schedule.anchor_date + datetime.timedelta(weeks=calendar_round - schedule.anchor_round)
+            for skipped in self.skipped_draws.get(product, ()):
+                if skipped <= draw_date:
+                    draw_date += datetime.timedelta(days=7)
+        sales_close = datetime.datetime.combine(draw_date, schedule.sales_close, tzinfo=KST)
+        return RoundInfo(product, round_no, draw_date, sales_close, self.payout_deadline(draw_date))
+
+    def payout_deadline(self, draw_date: datetime.date) -> datetime.date:
+        """Payout opens the day after the draw and stays open for one year."""
+        try:
+            deadline = draw_date.replace(year=draw_date.year + 1)
+        except ValueError:  # 29 February
+            deadline = draw_date.replace(year=draw_date.year + 1, day=28)
+        deadline += datetime.timedelta(days=1)
+        while deadline.weekday() >= SATURDAY or deadline in self.holidays:
+            deadline += datetime.timedelta(days=1)
+        return deadline
+
+    def cross_check(self, product: str, fetch_round: Callable[[], int], now: Optional[datetime.datetime] = None) -> bool:
+        """Compare with ``fetch_round()`` in a daemon thread at most once per interval.
+
+        Returns ``True`` if a check was started. Purchases never wait for it.
+        """
+        started = time.monotonic()
+        with self._lock:
+            last = self._last_cross_check.get(product)
+            if last is not None and started - last < self.cross_check_interval:
+                return False
+            self._last_cross_check[product] = started
+        expected = self.current_round(product, now).round
+
+        def _run():
+            try:
+                observed = int(fetch_round())
+            except Exception as exc:
+                logger.warning("[draw_calendar] %s cross-check failed: %s", product, exc)
+                return
+            if observed == expected:
+                logger.info("[draw_calendar] %s round %s confirmed", product, expected)
+                return
+            with self._lock:
+                self._corrections[product] = self._corrections.get(product, 0) + observed - expected
+            logger.warning(
+                "[draw_calendar] %s round mismatch computed=%s site=%s; using site offset",
+                product,
+                expected,
+                observed,
+            )
+
+        threading.Thread(target=_run, name=f"draw-calendar-{product}", daemon=True).start()
+        return True
+
+    def _round_for_slot(self, schedule: ProductSchedule, draw_date: datetime.date) -> int:
+        weeks = (draw_date - schedule.anchor_date).days // 7
+        skipped = sum(1 for date in self.skipped_draws.get(schedule.name, ()) if date <= draw_date)
+        return schedule.anchor_round + weeks - skipped + self._corrections.get(schedule.name, 0)
+
+
+_default_calendar: Optional[DrawCalendar] = None
+_default_lock = threading.Lock()
+
+
+def get_calendar() -> DrawCalendar:
+    """Process-wide calendar, loaded from ``DRAW_CALENDAR_FILE`` when set."""
+    global _default_calendar
+    with _default_lock:
+        if _default_calendar is None:
+            path = os.getenv("DRAW_CALENDAR_FILE")
+            if path:
+                try:
+                    _default_calendar = DrawCalendar.from_file(path)
+                except (OSError, ValueError) as exc:
+                    logger.error("[draw_calendar] failed to load %s: %s", path, exc)
+            if _default_calendar is None:
+                _default_calendar = DrawCalendar()
+        return _default_calendar
+
+
+def _parse_date(text: str) -> datetime.date:
+    return datetime.datetime.strptime(text, "%Y-%m-%d").date()
+
+
+def _to_kst(now: Optional[datetime.datetime]) -> datetime.datetime:
+    if now is None:
+        return datetime.datetime.now(KST)
+    if now.tzinfo is None:
+        return now.replace(tzinfo=KST)
+    return now.astimezone(KST)
@@ -0,0 +1,241 @@
+import datetime
+import logging
+import mmap
+import os
+import struct
+import threading
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+import common
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DRAW"
+VERSION = 1
+_HEADER = struct.Struct("<4sHH8s")
+# Rounds are added in blocks so the file is not resized for every draw.
+_GROW_ROUNDS = 64
+
+PRESENT = 1
+
+
+class LottoDraw(NamedTuple):
+    round: int
+    draw_date: datetime.date
+    numbers: Tuple[int, ...]
+    bonus: int
+    # Per-winner prize and winner count for ranks 1..5; 0 when unknown.
+    prizes: Tuple[int, ...] = (0, 0, 0, 0, 0)
+    winners: Tuple[int, ...] = (0, 0, 0, 0, 0)
+
+
+class Win720Draw(NamedTuple):
+    round: int
+    draw_date: datetime.date
+    group: int
+    number: str
+    bonus: str
+
+
+class _Layout:
+    __slots__ = ("name", "record")
+
+    def __init__(self, name: str, record: struct.Struct):
+        self.name = name
+        self.record = record
+
+
+# flags, numbers[6], bonus, round, yyyymmdd, prizes[5], winners[5]
+LOTTO645 = _Layout("lotto645", struct.Struct("<B6sBII5Q5I"))
+# flags, group, pad, round, yyyymmdd, number, bonus
+WIN720 = _Layout("win720", struct.Struct("<BBxxIIII"))
+LAYOUTS = {layout.name: layout for layout in (LOTTO645, WIN720)}
+
+
+class DrawArchive:
+    """Fixed-width draw records in a memory-mapped file, indexed by round.
+
+    Round ``n`` lives at ``header + (n - 1) * record_size``; a zero flag byte
+    marks a round that has not been stored yet, which is also what makes
+    ``backfill`` resumable. ``raw`` and ``as_numpy`` expose records without
+    copying them; release those views before storing a round past
+    ``capacity``, since growing the file remaps it.
+    """
+
+    def __init__(self, product: str, path: Optional[str] = None):
+        self.layout = LAYOUTS[product]
+        directory = os.getenv("DRAW_STORE_DIR", ".cache")
+        self.path = path or os.path.join(directory, f"draws_{product}.bin")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "r+b" if os.path.exists(self.path) else "w+b")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.write(_HEADER.pack(MAGIC, VERSION, self.layout.record.size, product.encode("ascii")))
+            self._file.truncate(_HEADER.size + _GROW_ROUNDS * self.layout.record.size)
+            self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, record_size, name = _HEADER.unpack_from(self._map, 0)
+        if (magic, version, record_size, name.rstrip(b"\0")) != (MAGIC, VERSION, self.layout.record.size, product.encode("ascii")):
+            self.close()
+            raise ValueError(f"{self.path} is not a {product} draw archive")
+
+    @property
+    def capacity(self) -> int:
+        return (len(self._map) - _HEADER.size) // self.layout.record.size
+
+    def __contains__(self, round_no: int) -> bool:
+        # Readers take the lock too: ``put`` may remap the file while growing it.
+        with self._lock:
+            return self._present(round_no)
+
+    def get(self, round_no: int):
+        with self._lock:
+            if not self._present(round_no):
+                return None
+            fields = self.layout.record.unpack_from(self._map, self._offset(round_no))
+        return self._decode(fields)
+
+    def put(self, draw) -> None:
+        with self._lock:
+            self._ensure_capacity(draw.round)
+            self.layout.record.pack_into(self._map, self._offset(draw.round), *self._encode(draw))
+
+    def raw(self, round_no: int) -> memoryview:
+        with self._lock:
+            if not 1 <= round_no <= self.capacity:
+                raise IndexError(f"round {round_no} is outside the archive (1..{self.capacity})")
+            offset = self._offset(round_no)
+            return memoryview(self._map)[offset:offset + self.layout.record.size]
+
+    def as_numpy(self):
+        """Structured NumPy view over every record slot (requires NumPy)."""
+        import numpy as np
+
+        if self.layout is LOTTO645:
+            dtype = np.dtype([
+                ("flags", "u1"), ("numbers", "u1", 6), ("bonus", "u1"), ("round", "<u4"),
+                ("draw_date", "<u4"), ("prizes", "<u8", 5), ("winners", "<u4", 5),
+            ])
+        else:
+            dtype = np.dtype([
+                ("flags", "u1"), ("group", "u1"), ("pad", "V2"), ("round", "<u4"),
+                ("draw_date", "<u4"), ("number", "<u4"), ("bonus", "<u4"),
+            ])
+        return np.frombuffer(self._map, dtype=dtype, count=self.capacity, offset=_HEADER.size)
+
+    def missing_rounds(self, last_round: int) -> List[int]:
+        with self._lock:
+            return [round_no for round_no in range(1, last_round + 1) if not self._present(round_no)]
+
+    def flush(self) -> None:
+        self._map.flush()
+
+    def close(self) -> None:
+        if getattr(self, "_map", None) is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _present(self, round_no: int) -> bool:
+        return 1 <= round_no <= self.capacity and self._map[self._offset(round_no)] == PRESENT
+
+    def _offset(self, round_no: int) -> int:
+        return _HEADER.size + (round_no - 1) * self.layout.record.size
+
+    def _ensure_capacity(self, round_no: int) -> None:
+        if round_no <= self.capacity:
+            return
+        rounds = -(-round_no // _GROW_ROUNDS) * _GROW_ROUNDS
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(_HEADER.size + rounds * self.layout.record.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _encode(self, draw) -> tuple:
+        date_value = int(draw.draw_date.strftime("%Y%m%d"))
+        if self.layout is LOTTO645:
+            return (PRESENT, bytes(draw.numbers), draw.bonus, draw.round, date_value, *draw.prizes, *draw.winners)
+        return (PRESENT, draw.group, draw.round, date_value, int(draw.number), int(draw.bonus))
+
+    def _decode(self, fields: tuple):
+        if self.layout is LOTTO645:
+            _, numbers, bonus, round_no, date_value, *rest = fields
+            return LottoDraw(round_no, _date(date_value), tuple(numbers), bonus, tuple(rest[:5]), tuple(rest[5:]))
+        _, group, round_no, date_value, number, bonus = fields
+        return Win720Draw(round_no, _date(date_value), group, f"{number:06d}", f"{bonus:06d}")
+
+
+def backfill(
+    archive: DrawArchive,
+    fetch_draw: Callable[[int], Optional[tuple]],
+    last_round: int,
+    map_concurrent: Optional[Callable] = None,
+    batch_size: int = 16,
+) -> int:
+    """Store every missing round up to ``last_round``; returns how many were added.
+
+    Rounds are fetched ``batch_size`` at a time through ``map_concurrent``
+    (``HttpClient.map_concurrent``) and flushed after each batch, so an
+    interrupted run resumes from the rounds still missing.
+    """
+    missing = archive.missing_rounds(last_round)
+    logger.info("[draw_store] %s backfill missing=%s last_round=%s", archive.layout.name, len(missing), last_round)
+    added = 0
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        if map_concurrent is not None:
+            results = map_concurrent(fetch_draw, batch)
+        else:
+            results = [_call(fetch_draw, round_no) for round_no in batch]
+        for round_no, (draw, error) in zip(batch, results):
+            if error is not None:
+                logger.warning("[draw_store] round %s fetch failed: %s", round_no, error)
+            elif draw is not None:
+                archive.put(draw)
+                added += 1
+        archive.flush()
+        logger.info("[draw_store] %s backfill progress %s/%s", archive.layout.name, start + len(batch), len(missing))
+    return added
+
+
+def lotto645_fetcher(http_client) -> Callable[[int], Optional[LottoDraw]]:
+    """Reads one round from the public ``getLottoNumber`` JSON endpoint."""
+
+    def _fetch(round_no: int) -> Optional[LottoDraw]:
+        res = http_client.get(
+            "https://www.dhlottery.co.kr/common.do",
+            params={"method": "getLottoNumber", "drwNo": round_no},
+        )
+        data = res.json()
+        if data.get("returnValue") != "success":
+            return None
+        return LottoDraw(
+            round=int(data["drwNo"]),
+            draw_date=datetime.datetime.strptime(data["drwNoDate"], "%Y-%m-%d").date(),
+            numbers=tuple(int(data[f"drwtNo{index}"]) for index in range(1, 7)),
+            bonus=int(data["bnusNo"]),
+            prizes=(int(data.get("firstWinamnt") or 0), 0, 0, 0, 0),
+            winners=(int(data.get("firstPrzwnerCo") or 0), 0, 0, 0, 0),
+        )
+
+    return _fetch
+
+
+def iter_draws(archive: DrawArchive, first_round: int = 1) -> Iterator:
+    for round_no in range(first_round, archive.capacity + 1):
+        draw = archive.get(round_no)
+        if draw is not None:
+            yield draw
+
+
+def _call(func, item):
+    try:
+        return func(item), None
+    except Exception as exc:
+        return None, exc
+
+
+def _date(value: int) -> datetime.date:
+    return datetime.date(value // 10000, value // 100 % 100, value % 100)
@@ -0,0 +1,208 @@
+import datetime
+import json
+import logging
+import os
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import common
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+LEDGER_URL = "https://www.dhlottery.co.kr/mypage/selectMyLotteryledger.do"
+LOTTO645_CODE = "LO40"
+WIN720_CODE = "LP72"
+
+_TOTAL_COUNT_KEYS = ("totalCnt", "totalCount", "total", "totCnt")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+class LedgerUnreadable(RuntimeError):
+    """A ledger page came back as something other than JSON (e.g. a login page)."""
+
+
+class LedgerEntry:
+    """One row of ``selectMyLotteryledger.do``; ``raw`` keeps the original dict."""
+
+    __slots__ = ("product_code", "round", "order_date", "draw_date", "prize", "order_no", "barcode", "raw")
+
+    def __init__(self, raw: dict):
+        self.raw = raw
+        self.product_code = raw.get("ltGdsCd")
+        self.round = _parse_round(raw)
+        self.order_date = raw.get("eltOrdrDt")
+        self.draw_date = raw.get("epsdRflDt")
+        self.prize = _parse_amount(raw.get("ltWnAmt"))
+        self.order_no = raw.get("ntslOrdrNo")
+        self.barcode = raw.get("gmInfo")
+
+    def __repr__(self) -> str:
+        return f"LedgerEntry(product_code={self.product_code!r}, round={self.round}, order_date={self.order_date!r})"
+
+
+class LedgerReader:
+    """Streams ledger entries across pages and date windows.
+
+    Page 1 of each window is read on its own; when more pages exist they are
+    fetched ``http_client.max_concurrency`` at a time and yielded in order, so
+    at most one batch of pages is held in memory. With several product codes
+    the ledger is read once for all products and filtered locally.
+    """
+
+    def __init__(
+        self,
+        http_client,
+        headers: dict,
+        page_size: Optional[int] = None,
+        window_days: Optional[int] = None,
+    ):
+        self.http_client = http_client
+        self.headers = headers
+        self.page_size = page_size or int(os.getenv("LEDGER_PAGE_SIZE", "10"))
+        self.window_days = window_days or int(os.getenv("LEDGER_WINDOW_DAYS", "90"))
+        self.pages_fetched = 0
+
+    def iter_entries(
+        self,
+        start: datetime.date,
+        end: datetime.date,
+        product_codes: Optional[Iterable[str]] = None,
+    ) -> Iterator[LedgerEntry]:
+        """Yield entries between ``start`` and ``end`` (inclusive), newest window first."""
+        codes = tuple(product_codes or ())
+        query_code = codes[0] if len(codes) == 1 else ""
+        # A single code is filtered by the server; several are filtered here.
+        wanted = frozenset(codes) if len(codes) > 1 else frozenset()
+
+        for window_start, window_end in self._windows(start, end):
+            for raw in self._iter_window(window_start, window_end, query_code):
+                entry = LedgerEntry(raw)
+                if not wanted or entry.product_code in wanted:
+                    yield entry
+
+    def _windows(self, start: datetime.date, end: datetime.date) -> Iterator[Tuple[datetime.date, datetime.date]]:
+        window_end = end
+        while window_end >= start:
+            window_start = max(start, window_end - datetime.timedelta(days=self.window_days - 1))
+            yield window_start, window_end
+            window_end = window_start - datetime.timedelta(days=1)
+
+    def _iter_window(self, start: datetime.date, end: datetime.date, product_code: str) -> Iterator[dict]:
+        params = {
+            "srchStrDt": start.strftime("%Y%m%d"),
+            "srchEndDt": end.strftime("%Y%m%d"),
+            "ltGdsCd": product_code,
+            "recordCountPerPage": self.page_size,
+        }
+
+        rows, total = self._fetch_page(params, 1)
+        yield from rows
+        if len(rows) < self.page_size:
+            return
+
+        last_page = -(-total // self.page_size) if total is not None else None
+        batch_size = max(getattr(self.http_client, "max_concurrency", 1), 1)
+        next_page = 2
+        while last_page is None or next_page <= last_page:
+            stop = next_page + batch_size
+            if last_page is not None:
+                stop = min(stop, last_page + 1)
+            pages = list(range(next_page, stop))
+            results = self._map(lambda page: self._fetch_page(params, page), pages)
+            for result, error in results:
+                if error is not None:
+                    raise error
+                rows, _ = result
+                yield from rows
+                if len(rows) < self.page_size:
+                    return
+            next_page = stop
+
+    def _map(self, func, items: List[int]) -> list:
+        map_concurrent = getattr(self.http_client, "map_concurrent", None)
+        if map_concurrent is None or len(items) == 1:
+            results = []
+            for item in items:
+                try:
+                    results.append((func(item), None))
+                except Exception as exc:
+                    results.append((None, exc))
+            return results
+        return map_concurrent(func, items)
+
+    def _fetch_page(self, params: dict, page: int) -> Tuple[List[dict], Optional[int]]:
+        res = self.http_client.get(LEDGER_URL, params=dict(params, pageNum=page), headers=self.headers)
+        self.pages_fetched += 1
+        try:
+            data = res.json().get("data", {}) or {}
+        except (json.JSONDecodeError, ValueError, AttributeError) as e:
+            # Ending the pages here would pass a truncated ledger off as complete.
+            logger.error("[ledger] page %s JSON parse failed: %s", page, e)
+            raise LedgerUnreadable(f"ledger page {page} is not JSON: {e}") from e
+
+        rows = data.get("list") or []
+        total = None
+        for key in _TOTAL_COUNT_KEYS:
+            try:
+                total = int(data[key])
+                break
+            except (KeyError, TypeError, ValueError):
+                continue
+        logger.info("[ledger] page=%s rows=%s total=%s range=%s~%s", page, len(rows), total, params["srchStrDt"], params["srchEndDt"])
+        return rows, total
+
+
+def latest_round(entries: Iterable[LedgerEntry]) -> Tuple[Optional[int], List[LedgerEntry]]:
+    """Return the highest round and its entries, keeping nothing else in memory."""
+    best = None
+    items: List[LedgerEntry] = []
+    for entry in entries:
+        if entry.round is None:
+            continue
+        if best is None or entry.round > best:
+            best = entry.round
+            items = [entry]
+        elif entry.round == best:
+            items.append(entry)
+    return best, items
+
+
+def entry_id(entry: LedgerEntry) -> str:
+    """Order number of a ledger row, falling back to its barcode or the whole row."""
+    return entry.order_no or entry.barcode or json.dumps(entry.raw, sort_keys=True)
+
+
+def order_ids(http_client, headers: dict, product_code: str, round_no, start: datetime.date, end: datetime.date) -> List[str]:
+    """Identifiers of the ``round_no`` orders of one product between ``start`` and ``end``."""
+    round_no = int(round_no)
+    reader = LedgerReader(http_client, headers)
+    return [
+        entry_id(entry)
+        for entry in reader.iter_entries(start, end, (product_code,))
+        if entry.round == round_no
+    ]
+
+
+def default_search_range() -> Tuple[datetime.date, datetime.date]:
+    """``common.get_search_date_range`` as dates."""
+    parameters = common.get_search_date_range()
+    return (
+        datetime.datetime.strptime(parameters["searchStartDate"], "%Y%m%d").date(),
+        datetime.datetime.strptime(parameters["searchEndDate"], "%Y%m%d").date(),
+    )
+
+
+def _parse_round(raw: dict) -> Optional[int]:
+    for key in ("ltEpsd", "ltEpsdView"):
+        match = _DIGITS_RE.search(str(raw.get(key) or ""))
+        if match:
+            return int(match.group(0))
+    return None
+
+
+def _parse_amount(value) -> int:
+    try:
+        return int(str(value or 0).replace(",", ""))
+    except ValueError:
+        return 0
@@ -1,5 +1,5 @@
-import datetime
 import json
+import os
 import re
 import time
 import requests
@@ -7,12 +7,21 @@ import requests
 from datetime import timedelta
 from enum import Enum
 
-from bs4 import BeautifulSoup as BS
-from typing import List, Optional, Tuple
+from bs4 import BeautifulSoup as BS, SoupStrainer
+from html import unescape
+from typing import Callable, List, Optional, Tuple
 
 import auth
 import common
+import draw_calendar
+import ledger
+import lotto_ticket
+import purchase_journal
+import rank_eval
 import logging
+import redaction
+import round_cache
+import winning_store
 from HttpClient import HttpClientSingleton
 
 common.setup_logging()
@@ -25,9 +34,157 @@ class NonJsonResponseError(Exception):
         self.content_type = content_type
         self.body_preview = body_preview
 
+WINNING_STORE_PRODUCT = "lotto645"
+
+# Games one execBuy.do order can hold (slots A-E).
+SLOTS_PER_ORDER = 5
+
+
+def _is_success(body: dict) -> bool:
+    result = body.get("result") if isinstance(body, dict) else None
+    return isinstance(result, dict) and str(result.get("resultMsg", "")).upper() == "SUCCESS"
+
+
+def _aggregate_results(buy_round, responses: List[dict]) -> dict:
+    """One execBuy.do-shaped result for several orders; ``orders`` keeps each response."""
+    succeeded = [body for body in responses if _is_success(body)]
+    games = []
+    amount = 0
+    for body in succeeded:
+        result = body["result"]
+        games.extend(result.get("arrGameChoiceNum") or [])
+        try:
+            amount += int(str(result.get("nBuyAmount") or 0).replace(",", ""))
+        except ValueError:
+            pass
+
+    if len(succeeded) == len(responses):
+        result_msg = "SUCCESS"
+    else:
+        failures = [str(body.get("result", {}).get("resultMsg", "FAILURE")) for body in responses if not _is_success(body)]
+        result_msg = f"{len(succeeded)}/{len(responses)}건 주문 완료, 실패 사유: {failures[0]}"
+    return {
+        "loginYn": "Y",
+        "result": {
+            "resultMsg": result_msg,
+            "buyRound": buy_round,
+            "nBuyAmount": str(amount),
+            "arrGameChoiceNum": games,
+        },
+        "orders": responses,
+    }
+
+_REQUIREMENT_KEYS = ("ROUND_DRAW_DATE", "WAMT_PAY_TLMT_END_DT", "curRound")
+
+_REQUIREMENT_INPUT_RE = re.compile(
+    r"<input\b[^>]*?[\s\"'](?:id|name)\s*=\s*[\"']?(" + "|".join(_REQUIREMENT_KEYS) + r")\b[^>]*>",
+    re.IGNORECASE,
+)
+_INPUT_VALUE_RE = re.compile(r"""[\s"']value\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+_SCRIPT_VALUE_RES = {}
+
+
+def _script_value_re(key: str):
+    pattern = _SCRIPT_VALUE_RES.get(key)
+    if pattern is None:
+        pattern = re.compile(rf"{re.escape(key)}\s*[:=]\s*['\"]([^'\"]+)['\"]")
+        _SCRIPT_VALUE_RES[key] = pattern
+    return pattern
+
+
+def _extract_fields_fast(html: str, keys: tuple) -> dict:
+    fields = {}
+    for match in _REQUIREMENT_INPUT_RE.finditer(html):
+        key = match.group(1)
+        if key in fields or key not in keys:
+            continue
+        value_match = _INPUT_VALUE_RE.search(match.group(0))
+        if value_match:
+            value = next(group for group in value_match.groups() if group is not None)
+            if value:
+                fields[key] = unescape(value)
+    for key in keys:
+        if key not in fields:
+            match = _script_value_re(key).search(html)
+            if match:
+                fields[key] = match.group(1)
+    return fields
+
+
+_METHOD_CANDIDATE_KEYS = (
+    "genType",
+    "gen_type",
+    "gen_type_cd",
+    "genTypeCd",
+    "genTypeCD",
+    "genTyCd",
+    "gnType",
+    "status",
+    "autoYn",
+    "auto_yn",
+    "auto",
+    "autoType",
+    "auto_type",
+    "buyType",
+    "buy_type",
+    "buyTypeCd",
+    "buy_type_cd",
+    "selType",
+    "sel_type",
+)
+
+_GAME_SOURCES = (
+    "game",
+    "games",
+    "gameList",
+    "game_list",
+    "gameParam",
+    "game_param",
+    "param",
+)
+
+
+class MethodPathCache:
+    """Remembers where the purchase method sits for each detail response shape.
+
+    A shape is the key set of the game and of the ticket. The first game of
+    a shape pays for the full search; later games resolve with one lookup.
+    """
+
+    def __init__(self):
+        self._paths = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, shape: tuple) -> Optional[tuple]:
+        return self._paths.get(shape)
+
+    def store(self, shape: tuple, path: tuple) -> None:
+        self._paths[shape] = path
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {"shapes": len(self._paths), "hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 3)}
+
+
+_METHOD_PATHS = MethodPathCache()
+
+
+def _response_shape(game: dict, ticket: dict) -> tuple:
+    return (
+        tuple(game) if isinstance(game, dict) else type(game).__name__,
+        tuple(ticket) if isinstance(ticket, dict) else type(ticket).__name__,
+    )
+
+
 class Lotto645Mode(Enum):
     AUTO = 1
     MANUAL = 2
+    MIXED = 3
     BUY = 10 
     CHECK = 20
 
@@ -52,15 +209,18 @@ class Lotto645:
         "Accept-Language": "ko,en-US;q=0.9,en;q=0.8,ko-KR;q=0.7",
     }
 
-    def __init__(self):
-        self.http_client = HttpClientSingleton.get_instance()
+    def __init__(self, http_client=None, metadata_cache: Optional[round_cache.RoundMetadataCache] = None):
+        self.http_client = http_client or HttpClientSingleton.get_instance()
+        self.metadata_cache = metadata_cache
 
     def buy_lotto645(
         self,
         auth_ctrl: auth.AuthController, 
         cnt: int, 
         mode: Lotto645Mode,
-        manual_numbers: Optional[List[List[str]]] = None,
+        manual_numbers: Optional[List[lotto_ticket.LottoTicket]] = None,
+        journal: Optional[purchase_journal.PurchaseJournal] = None,
+        account: str = "",
     ) -> dict:
         assert isinstance(auth_ctrl, auth.AuthController)
         assert isinstance(cnt, int) and 1 <= cnt <= 5
@@ -70,22 +230,86 @@ class Lotto645:
         
         requirements = self._getRequirements(headers)
         
-        data = (
-            self._generate_body_for_auto_mode(cnt, requirements)
-            if mode == Lotto645Mode.AUTO
-            else self._generate_body_for_manual(cnt, requirements, manual_numbers)
-        )
+        if mode == Lotto645Mode.AUTO:
+            data = self._generate_body_for_auto_mode(cnt, requirements)
+        elif mode == Lotto645Mode.MIXED:
+            data = self._generate_body_for_mixed(cnt, requirements, manual_numbers)
+        else:
+            data = self._generate_body_for_manual(cnt, requirements, manual_numbers)
 
         logger.info(
             "[lotto645] Purchase payload mode=%s data=%s",
-            "AUTO" if mode == Lotto645Mode.AUTO else "MANUAL",
+            mode.name,
             data,
         )
 
         auth_ctrl.ensure_session()
 
-        body = self._try_buying(headers, data)
+        if journal is None:
+            body = self._try_buying(headers, data)
+        else:
+            body = self._buy_through_journal(journal, account, headers, data)
+
+        self._show_result(body)
+        return body
+
+    def buy_lotto645_batch(
+        self,
+        auth_ctrl: auth.AuthController,
+        games: List[Optional[lotto_ticket.LottoTicket]],
+        journal: Optional[purchase_journal.PurchaseJournal] = None,
+        account: str = "",
+    ) -> dict:
+        """Buy any number of games as several five-slot ``execBuy.do`` orders.
+
+        ``games`` holds ``None`` for an AUTO slot and a ticket for a MANUAL
+        one. The round requirements, headers and session check are shared by
+        every order, and the orders go out ``http_client.map_concurrent`` at a
+        time under the per-host rate limit. Returns one aggregated result;
+        orders the ledger could not confirm are listed as ``UNCONFIRMED``
+        next to the ones that were bought.
+        """
+        assert isinstance(auth_ctrl, auth.AuthController)
+        assert games
+
+        journal = journal or purchase_journal.get_journal()
+        headers = self._generate_req_headers(auth_ctrl)
+        requirements = self._getRequirements(headers)
+        games = [None if game is None else lotto_ticket.LottoTicket.from_numbers(game) for game in games]
+        orders = [self._generate_body(requirements, games[start:start + SLOTS_PER_ORDER]) for start in range(0, len(games), SLOTS_PER_ORDER)]
+        logger.info("[lotto645] Batch purchase games=%s orders=%s round=%s", len(games), len(orders), requirements[3])
+
+        auth_ctrl.ensure_session()
+
+        # Identical orders (e.g. two all-AUTO orders) are told apart by their position.
+        entries = [
+            journal.begin(
+                account,
+                ledger.LOTTO645_CODE,
+                requirements[3],
+                [f"{index}/{game['alpabet']}:{game['arrGameChoiceNum'] or 'auto'}" for game in json.loads(data["param"])],
+            )
+            for index, data in enumerate(orders)
+        ]
 
+        def _recovered(found: List[str]) -> dict:
+            return {"result": {"resultMsg": "SUCCESS", "buyRound": requirements[3], "arrGameChoiceNum": [], "recoveredOrders": len(found)}}
+
+        responses = journal.run_batch(
+            entries,
+            # No resend inside one order: run_batch settles unanswered orders together.
+            lambda index: self._try_buying(dict(headers), orders[index], attempts=1),
+            purchase_journal.ledger_finder(self.http_client, self.ledger_headers(), ledger.LOTTO645_CODE, requirements[3]),
+            _recovered,
+            _is_success,
+            lambda error: {"result": {"resultMsg": f"UNCONFIRMED: {error}", "buyRound": requirements[3]}},
+            map_concurrent=getattr(self.http_client, "map_concurrent", None),
+        )
+        for data, body in zip(orders, responses):
+            result = body.get("result", {})
+            if _is_success(body) and not result.get("nBuyAmount"):
+                result["nBuyAmount"] = data["nBuyAmount"]
+        body = _aggregate_results(requirements[3], responses)
         self._show_result(body)
         return body
 
@@ -96,23 +320,9 @@ class Lotto645:
     def _generate_body_for_auto_mode(self, cnt: int, requirements: list) -> dict:
         assert isinstance(cnt, int) and 1 <= cnt <= 5
 
-        return {
-            "round": requirements[3],
-            "direct": requirements[0], 
-            "nBuyAmount": str(1000 * cnt),
-            "param": json.dumps(
-                [
-                    {"genType": "0", "arrGameChoiceNum": None, "alpabet": slot}
-                    for slot in common.SLOTS[:cnt]
-                ]
-            ),
-            'ROUND_DRAW_DATE' : requirements[1],
-            'WAMT_PAY_TLMT_END_DT' : requirements[2],
-            "gameCnt": cnt,
-            "saleMdaDcd": "10"
-        }
+        return self._generate_body(requirements, [None] * cnt)
 
-    def _generate_body_for_manual(self, cnt: int, requirements: list, manual_numbers: Optional[List[List[str]]]) -> dict:
+    def _generate_body_for_manual(self, cnt: int, requirements: list, manual_numbers: Optional[list]) -> dict:
         assert isinstance(cnt, int) and 1 <= cnt <= 5
         if not manual_numbers:
             raise ValueError("manual_numbers are required for manual mode.")
@@ -120,30 +330,35 @@ class Lotto645:
         if len(manual_numbers) != cnt:
             raise ValueError("manual_numbers count must match cnt.")
 
-        normalized_numbers = []
-        for entry in manual_numbers:
-            if len(entry) != 6:
-                raise ValueError("Each manual entry must contain 6 numbers.")
-            parsed_numbers = [int(num) for num in entry]
-            if any(num < 1 or num > 45 for num in parsed_numbers):
-                raise ValueError("Each manual entry must be between 1 and 45.")
-            if len(set(parsed_numbers)) != 6:
-                raise ValueError("Each manual entry must be unique.")
-            normalized_entry = [f"{num:02d}" for num in parsed_numbers]
-            normalized_numbers.append(normalized_entry)
+        return self._generate_body(requirements, self._normalize_manual_numbers(manual_numbers))
+
+    def _generate_body_for_mixed(self, cnt: int, requirements: list, manual_numbers: Optional[list]) -> dict:
+        """Build one payload whose first slots are AUTO and the rest MANUAL."""
+        assert isinstance(cnt, int) and 1 <= cnt <= 5
+        manual_numbers = manual_numbers or []
+        if len(manual_numbers) > cnt:
+            raise ValueError("manual_numbers count must not exceed cnt.")
+
+        games = [None] * (cnt - len(manual_numbers)) + self._normalize_manual_numbers(manual_numbers)
+        return self._generate_body(requirements, games)
+
+    def _normalize_manual_numbers(self, manual_numbers: list) -> List[lotto_ticket.LottoTicket]:
+        """Tickets pass through as-is; plain number lists are validated here."""
+        return [lotto_ticket.LottoTicket.from_numbers(entry) for entry in manual_numbers]
 
+    def _generate_body(self, requirements: list, games: List[Optional[lotto_ticket.LottoTicket]]) -> dict:
+        """``games`` holds one entry per slot: ``None`` for AUTO, a ticket for MANUAL."""
+        cnt = len(games)
         return {
             "round": requirements[3],
             "direct": requirements[0],
             "nBuyAmount": str(1000 * cnt),
             "param": json.dumps(
                 [
-                    {
-                        "genType": "1",
-                        "arrGameChoiceNum": ",".join(numbers),
-                        "alpabet": slot,
-                    }
-                    for slot, numbers in zip(common.SLOTS[:cnt], normalized_numbers)
+                    {"genType": "0", "arrGameChoiceNum": None, "alpabet": slot}
+                    if line is None
+                    else {"genType": "1", "arrGameChoiceNum": line.choice, "alpabet": slot}
+                    for slot, line in zip(common.SLOTS[:cnt], games)
                 ]
             ),
             "ROUND_DRAW_DATE": requirements[1],
@@ -152,6 +367,33 @@ class Lotto645:
             "saleMdaDcd": "10",
         }
 
+    def _buy_through_journal(self, journal: purchase_journal.PurchaseJournal, account: str, headers: dict, data: dict) -> dict:
+        games = json.loads(data["param"])
+        slots = [f"{game['alpabet']}:{game['arrGameChoiceNum'] or 'auto'}" for game in games]
+        entry = journal.begin(account, ledger.LOTTO645_CODE, data["round"], slots)
+        find_orders = purchase_journal.ledger_finder(self.http_client, self.ledger_headers(), ledger.LOTTO645_CODE, data["round"])
+
+        def _recovered(orders: List[str]) -> dict:
+            # The ledger has no slot numbers; the notification shows the header only.
+            return {
+                "loginYn": "Y",
+                "result": {
+                    "resultMsg": "SUCCESS",
+                    "buyRound": data["round"],
+                    "nBuyAmount": data["nBuyAmount"],
+                    "arrGameChoiceNum": [],
+                    "recoveredOrders": len(orders),
+                },
+            }
+
+        return journal.run(
+            entry,
+            lambda before_retry: self._try_buying(headers, data, before_retry=before_retry),
+            find_orders,
+            _recovered,
+            _is_success,
+        )
+
     def _getRequirements(self, headers: dict) -> list:
         headers["Referer"] = "https://ol.dhlottery.co.kr/olotto/game/game645.do"
         headers["Origin"] = "https://ol.dhlottery.co.kr"
@@ -160,6 +402,11 @@ class Lotto645:
         headers["Sec-Fetch-Mode"] = "cors"
         headers["Sec-Fetch-Dest"] = "empty"
 
+        cached = self.metadata_cache.current() if self.metadata_cache is not None else None
+        if cached is not None and cached.ready_ip is not None:
+            logger.info("[lotto645] Using cached purchase requirements round=%s", cached.round)
+            return [cached.ready_ip, cached.draw_date, cached.tlmt_date, cached.round]
+
         logger.info("[lotto645] Fetching purchase requirements (ready socket)")
         res = self.http_client.post(
             url="https://ol.dhlottery.co.kr/olotto/game/egovUserReadySocket.json",
@@ -168,7 +415,11 @@ class Lotto645:
 
         logger.info("[lotto645] Ready socket response received")
         direct = json.loads(res.text)["ready_ip"]
-        
+
+        if cached is not None:
+            logger.info("[lotto645] Using cached draw dates round=%s", cached.round)
+            return [direct, cached.draw_date, cached.tlmt_date, cached.round]
+
         html_headers = self._REQ_HEADERS.copy()
         html_headers.pop("Origin", None)
         html_headers.pop("Content-Type", None)
@@ -183,39 +434,53 @@ class Lotto645:
             headers=html_headers
         )
         logger.info("[lotto645] Game page response received")
-        html = res.text
-        soup = BS(html, "html5lib")
-        
-        try:
-            draw_date = self._extract_date_value(
-                soup,
-                html,
-                key="ROUND_DRAW_DATE",
-            )
-            tlmt_date = self._extract_date_value(
-                soup,
-                html,
-                key="WAMT_PAY_TLMT_END_DT",
-            )
-        except (ValueError, AttributeError, TypeError) as e:
-            logger.error(f"[Error] Date extraction failed: {e}")
-            today = datetime.datetime.today()
-            days_ahead = (5 - today.weekday()) % 7
-            next_saturday = today + datetime.timedelta(days=days_ahead)
-            draw_date = next_saturday.strftime("%Y-%m-%d")
+        fields = self._extract_requirement_fields(res.text)
 
-            limit_date = next_saturday + datetime.timedelta(days=366)
-            tlmt_date = limit_date.strftime("%Y-%m-%d")
+        draw_date = fields.get("ROUND_DRAW_DATE")
+        tlmt_date = fields.get("WAMT_PAY_TLMT_END_DT")
+        extracted = bool(draw_date and tlmt_date and fields.get("curRound"))
+        if not draw_date or not tlmt_date:
+            logger.error("[Error] Date extraction failed: fields=%s", fields)
+            info = draw_calendar.get_calendar().current_round(draw_calendar.LOTTO645.name)
+            draw_date = info.draw_date.strftime("%Y-%m-%d")
+            tlmt_date = info.payout_deadline.strftime("%Y-%m-%d")
 
-        
-        cur_round_input = soup.find("input", id="curRound")
-        if cur_round_input:
-            current_round = cur_round_input.get('value')
-        else:
-            current_round = self._get_round()
+        current_round = fields.get("curRound") or self._get_round()
+
+        # Guessed values are not cached; the next purchase retries the page.
+        if extracted and self.metadata_cache is not None:
+            self.metadata_cache.store(current_round, draw_date, tlmt_date, ready_ip=direct)
 
         return [direct, draw_date, tlmt_date, current_round]
 
+    def _extract_requirement_fields(self, html: str) -> dict:
+        """Read the purchase requirement fields from game645.do.
+
+        Tries the precompiled regexes first, then a parse restricted to
+        <input> tags, and builds the full html5lib tree only if both miss.
+        """
+        fields = _extract_fields_fast(html, _REQUIREMENT_KEYS)
+        if len(fields) == len(_REQUIREMENT_KEYS):
+            return fields
+
+        for tier, soup_factory in (
+            ("strained", lambda: BS(html, "html.parser", parse_only=SoupStrainer("input"))),
+            ("html5lib", lambda: BS(html, "html5lib")),
+        ):
+            logger.info("[lotto645] Requirement fields missing=%s; trying %s parse",
+                        [key for key in _REQUIREMENT_KEYS if key not in fields], tier)
+            soup = soup_factory()
+            for key in _REQUIREMENT_KEYS:
+                if key in fields:
+                    continue
+                try:
+                    fields[key] = self._extract_date_value(soup, html, key=key)
+                except (ValueError, AttributeError, TypeError):
+                    continue
+            if len(fields) == len(_REQUIREMENT_KEYS):
+                break
+        return fields
+
     def _extract_date_value(self, soup: BS, html: str, key: str) -> str:
         candidates = [
             soup.find("input", id=key),
@@ -229,44 +494,35 @@ class Lotto645:
                 if value:
                     return value
 
-        pattern = re.compile(rf"{re.escape(key)}\\s*[:=]\\s*['\"]([^'\"]+)['\"]")
-        match = pattern.search(html)
+        match = _script_value_re(key).search(html)
         if match:
             return match.group(1)
 
         raise ValueError(f"{key} not found in HTML")
 
     def _get_round(self) -> str:
-        try:
-            res = self.http_client.get(
-                "https://dhlottery.co.kr/common.do?method=main",
-                headers=self._REQ_HEADERS
-            )
-            html = res.text
-            soup = BS(html, "html5lib")
-            found = soup.find("strong", id="lottoDrwNo")
-            if found:
-                last_drawn_round = int(found.text)
-                return str(last_drawn_round + 1)
-            else:
-                 raise ValueError("lottoDrwNo not found")
-        except Exception as e:
-            base_date = datetime.datetime(2024, 12, 28)
-            base_round = 1152
-            
-            today = datetime.datetime.today().replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            days_ahead = (5 - today.weekday()) % 7
-            next_saturday = today + datetime.timedelta(days=days_ahead)
-            
-            weeks = (next_saturday - base_date).days // 7
-            return str(base_round + weeks)
-
-
+        calendar = draw_calendar.get_calendar()
+        calendar.cross_check(draw_calendar.LOTTO645.name, self._fetch_round_from_main)
+        return str(calendar.current_round(draw_calendar.LOTTO645.name).round)
 
+    def _fetch_round_from_main(self) -> int:
+        res = self.http_client.get(
+            "https://dhlottery.co.kr/common.do?method=main",
+            headers=self._REQ_HEADERS
+        )
+        found = BS(res.text, "html5lib").find("strong", id="lottoDrwNo")
+        if not found:
+            raise ValueError("lottoDrwNo not found")
+        return int(found.text) + 1
 
-        
-    def _try_buying(self, headers: dict, data: dict) -> dict:
+    def _try_buying(
+        self,
+        headers: dict,
+        data: dict,
+        before_retry: Optional[Callable[[], None]] = None,
+        attempts: int = 5,
+    ) -> dict:
+        """POST ``execBuy.do``; with ``before_retry`` (journaled buys) resends are fast."""
         assert isinstance(headers, dict)
         assert isinstance(data, dict)
 
@@ -280,8 +536,11 @@ class Lotto645:
                 return True
             return "<html" in normalized or "<!doctype" in normalized
 
-        attempts = 5
+        journal_delay = float(os.getenv("PURCHASE_RETRY_DELAY", "0.3"))
         for attempt in range(1, attempts + 1):
+            wait_seconds = journal_delay if before_retry is not None else min(2, 2 ** (attempt - 1))
+            if attempt > 1 and before_retry is not None:
+                before_retry()
             try:
                 res = self.http_client.post(
                     "https://ol.dhlottery.co.kr/olotto/game/execBuy.do",
@@ -334,28 +593,29 @@ class Lotto645:
                         "[lotto645] Non-JSON response received "
                         f"(attempt {attempt}/{attempts}): status={res.status_code}, "
                         f"content_type={res.headers.get('Content-Type')}, "
-                        f"length={len(res.text)}. Retrying in {2 ** (attempt - 1)}s."
+                        f"length={len(res.text)}. Retrying in {wait_seconds}s."
                     )
             except requests.RequestException as exc:
                 if attempt == attempts:
                     raise
-                wait_seconds = 2 ** (attempt - 1)
                 logger.warning(
                     "[lotto645] Buy request failed "
                     f"(attempt {attempt}/{attempts}): {exc}. "
                     f"Retrying in {wait_seconds}s"
                 )
-            time.sleep(min(2, 2 ** (attempt - 1)))
-
-    def check_winning(self, auth_ctrl: auth.AuthController) -> dict:
-        assert isinstance(auth_ctrl, auth.AuthController)
+            time.sleep(wait_seconds)
 
+    def ledger_headers(self) -> dict:
         headers = self._REQ_HEADERS.copy()
         headers["Referer"] = "https://www.dhlottery.co.kr/mypage/mylotteryledger"
         headers.pop("Content-Type", None)
         headers.pop("Origin", None)
+        return headers
+
+    def check_winning(self, auth_ctrl: auth.AuthController) -> dict:
+        assert isinstance(auth_ctrl, auth.AuthController)
 
-        parameters = common.get_search_date_range()
+        headers = self.ledger_headers()
 
         try:
             self.http_client.get("https://www.dhlottery.co.kr/common.do?method=main", headers=headers)
@@ -367,60 +627,26 @@ class Lotto645:
         }
 
         try:
-            api_url = "https://www.dhlottery.co.kr/mypage/selectMyLotteryledger.do"
+            start, end = ledger.default_search_range()
             params = {
-                "srchStrDt": parameters["searchStartDate"],
-                "srchEndDt": parameters["searchEndDate"],
-                "ltGdsCd": "LO40",
-                "pageNum": 1,
-                "recordCountPerPage": 10
+                "srchStrDt": start.strftime("%Y%m%d"),
+                "srchEndDt": end.strftime("%Y%m%d"),
             }
+            reader = ledger.LedgerReader(self.http_client, headers)
+            latest_round, latest_entries = ledger.latest_round(
+                reader.iter_entries(start, end, product_codes=(ledger.LOTTO645_CODE,))
+            )
 
-            res = self.http_client.get(api_url, params=params, headers=headers)
-            
-            if res.status_code != 200:
-                logger.debug("DEBUG: API Status %s", res.status_code)
-                pass
-            
-            try:
-                data = res.json()
-                data = data.get("data", {})
-                if "list" not in data:
-                    logger.debug("DEBUG_DATA_LIST_MISSING_IN_DATA")
-            except (json.JSONDecodeError, AttributeError, KeyError) as e:
-                logger.error(f"[Error] API JSON Parse Failed: {e}")
-                data = {}
-
-            if not data.get("list"):
+            if not latest_entries:
                 return {"data": "no winning data (empty list or API fail)"}
 
-            latest_round = None
-            latest_round_items = []
-            for item in data["list"]:
-                try:
-                    round_value = int(item.get("ltEpsd"))
-                except (TypeError, ValueError):
-                    continue
-                if latest_round is None or round_value > latest_round:
-                    latest_round = round_value
-                    latest_round_items = [item]
-                elif round_value == latest_round:
-                    latest_round_items.append(item)
-
-            if not latest_round_items:
-                return {"data": "no winning data (latest round missing)"}
+            latest_round_items = [entry.raw for entry in latest_entries]
 
-            purchased_dates = [item.get("eltOrdrDt") for item in latest_round_items if item.get("eltOrdrDt")]
+            purchased_dates = [entry.order_date for entry in latest_entries if entry.order_date]
             purchased_date = max(purchased_dates) if purchased_dates else "-"
-            winning_date = latest_round_items[0].get("epsdRflDt", "-")
+            winning_date = latest_entries[0].draw_date or "-"
 
-            total_prize = 0
-            for item in latest_round_items:
-                amount = item.get("ltWnAmt", 0)
-                try:
-                    total_prize += int(amount)
-                except (TypeError, ValueError):
-                    continue
+            total_prize = sum(entry.prize for entry in latest_entries)
 
             money = "0 원" if total_prize == 0 else f"{total_prize:,} 원"
 
@@ -435,8 +661,8 @@ class Lotto645:
             detail_url = "https://www.dhlottery.co.kr/mypage/lotto645TicketDetail.do"
             lotto_details = []
 
-            for ticket_index, item in enumerate(latest_round_items, start=1):
-                detail_params = {
+            def _detail_params(item: dict) -> dict:
+                return {
                     "ltGdsCd": item.get("ltGdsCd"),
                     "ltEpsd": item.get("ltEpsd"),
                     "barcd": item.get("gmInfo"),
@@ -445,14 +671,24 @@ class Lotto645:
                     "srchEndDt": params["srchEndDt"]
                 }
 
+            def _fetch_detail(item: dict) -> dict:
+                res_detail = self.http_client.get(detail_url, params=_detail_params(item), headers=headers)
+                return res_detail.json()
+
+            # Details are fetched concurrently (bounded per host) and parsed in ticket order.
+            fetched = self.http_client.map_concurrent(_fetch_detail, latest_round_items)
+
+            for ticket_index, (item, (detail_data, fetch_error)) in enumerate(zip(latest_round_items, fetched), start=1):
+                detail_params = _detail_params(item)
+
                 try:
-                    res_detail = self.http_client.get(detail_url, params=detail_params, headers=headers)
-                    detail_data = res_detail.json()
+                    if fetch_error is not None:
+                        raise fetch_error
                     detail_data = detail_data.get("data", detail_data)
                     logger.info(
                         "[lotto645] Detail response (ticket=%s): %s",
                         ticket_index,
-                        json.dumps(detail_data, ensure_ascii=False),
+                        redaction.Redacted(detail_data),
                     )
 
                     ticket = detail_data.get("ticket", {})
@@ -460,8 +696,8 @@ class Lotto645:
                         ticket = detail_data["data"].get("ticket", {})
 
                     game_dtl = ticket.get("game_dtl", [])
-                    win_num = ticket.get("win_num", [])
-                    main_win_nums, bonus_num = self._split_lotto645_winning_numbers(win_num)
+                    main_win_nums, bonus_num = self._winning_numbers(latest_round, ticket)
+                    draw = rank_eval.encode_draw(main_win_nums, bonus_num)
 
                     for i, game in enumerate(game_dtl):
                         slot_label = common.SLOTS[i] if i < len(common.SLOTS) else "?"
@@ -470,16 +706,8 @@ class Lotto645:
                         method = self._determine_method(game, ticket, i)
 
                         nums = game.get("num", [])
-                        status = self._calculate_lotto645_status(nums, main_win_nums, bonus_num)
-                        formatted_nums = []
-                        for num in nums:
-                            normalized_num = self._normalize_lotto645_number(num)
-                            if normalized_num in main_win_nums:
-                                formatted_nums.append(f"✨{normalized_num}")
-                            elif bonus_num and normalized_num == bonus_num:
-                                formatted_nums.append(f"⭐{normalized_num}")
-                            else:
-                                formatted_nums.append(str(num))
+                        status = rank_eval.describe(rank_eval.rank(rank_eval.encode(nums), draw))
+                        formatted_nums = self._format_lotto645_numbers(nums, draw)
 
                         lotto_details.append({
                             "label": label,
@@ -494,6 +722,7 @@ class Lotto645:
                     logger.error(f"[Error] Detail parse error (url={detail_url}, params={detail_params}): {e}")
 
             result_data["lotto_details"] = lotto_details
+            logger.info("[lotto645] Method path cache %s", _METHOD_PATHS.stats())
 
                             
         except (requests.RequestException, json.JSONDecodeError, KeyError) as e:
@@ -510,6 +739,39 @@ class Lotto645:
         except (TypeError, ValueError):
             return str(value).strip()
 
+    def _format_lotto645_numbers(self, nums: list, draw: rank_eval.Draw) -> List[str]:
+        """Mark main matches with ✨ and the bonus match with ⭐ using mask bits."""
+        main_mask, bonus_mask = draw
+        formatted = []
+        for num in nums:
+            bit = lotto_ticket.number_bit(num)
+            if bit & main_mask:
+                formatted.append(f"✨{self._normalize_lotto645_number(num)}")
+            elif bit & bonus_mask:
+                formatted.append(f"⭐{self._normalize_lotto645_number(num)}")
+            else:
+                formatted.append(str(num))
+        return formatted
+
+    def _winning_numbers(self, round_no: int, ticket: dict) -> Tuple[List[str], Optional[str]]:
+        """Winning numbers for ``round_no``, from the store or else parsed from ``ticket``."""
+        store = winning_store.get_store()
+        known = store.get(WINNING_STORE_PRODUCT, round_no)
+        if known is not None:
+            return list(known.numbers), known.bonus
+
+        main_win_nums, bonus_num = self._split_lotto645_winning_numbers(ticket.get("win_num", []))
+        if len(main_win_nums) == 6:
+            store.put(WINNING_STORE_PRODUCT, round_no, main_win_nums, bonus_num)
+        return main_win_nums, bonus_num
+
+    def evaluate_offline(self, round_no: int, nums: list) -> Optional[str]:
+        """Rank ``nums`` against a stored draw without any request; ``None`` if unknown."""
+        known = winning_store.get_store().get(WINNING_STORE_PRODUCT, round_no)
+        if known is None:
+            return None
+        return self._calculate_lotto645_status(nums, list(known.numbers), known.bonus)
+
     def _split_lotto645_winning_numbers(self, win_num: list) -> Tuple[List[str], Optional[str]]:
         normalized = [self._normalize_lotto645_number(num) for num in win_num if str(num).strip()]
         main_numbers = normalized[:6]
@@ -517,71 +779,94 @@ class Lotto645:
         return main_numbers, bonus_number
 
     def _calculate_lotto645_status(self, nums: list, main_win_nums: List[str], bonus_num: Optional[str]) -> str:
-        selected_numbers = {self._normalize_lotto645_number(num) for num in nums}
-        main_match_count = len(selected_numbers.intersection(main_win_nums))
-        bonus_matched = bool(bonus_num and bonus_num in selected_numbers)
-
-        if main_match_count == 6:
-            rank = 1
-        elif main_match_count == 5 and bonus_matched:
-            rank = 2
-        elif main_match_count == 5:
-            rank = 3
-        elif main_match_count == 4:
-            rank = 4
-        elif main_match_count == 3:
-            rank = 5
-        else:
-            rank = 0
-
-        return "0등" if rank == 0 else f"{rank}등"
+        draw = rank_eval.encode_draw(main_win_nums, bonus_num)
+        return rank_eval.describe(rank_eval.rank(lotto_ticket.mask_of(nums), draw))
 
     def _determine_method(self, game: dict, ticket: dict, game_index: Optional[int] = None) -> str:
-        method = self._extract_method_from_mapping(game)
+        shape = _response_shape(game, ticket)
+        path = _METHOD_PATHS.lookup(shape)
+        if path is not None:
+            method = self._resolve_method_path(path, game, ticket, game_index)
+            if method:
+                _METHOD_PATHS.hits += 1
+                return method
+
+        _METHOD_PATHS.misses += 1
+        method, path = self._search_method(game, ticket, game_index)
+        if path is not None:
+            _METHOD_PATHS.store(shape, path)
+        return method or "알수없음"
+
+    def _search_method(self, game: dict, ticket: dict, game_index: Optional[int]) -> Tuple[Optional[str], Optional[tuple]]:
+        """Full search; also returns the path that found the method when it is exact for the shape.
+
+        A path is exact only when no key of the shape was tried before it:
+        another game of the same shape could have a value under such a key,
+        and the full search would then answer from there.
+        """
+        method, key, passed_over = self._find_method_in_mapping(game)
         if method:
-            return method
+            return method, None if passed_over else ("game", key)
 
-        method = self._extract_method_from_mapping(ticket)
+        method, key, ticket_passed_over = self._find_method_in_mapping(ticket)
+        passed_over = passed_over or ticket_passed_over
         if method:
-            return method
+            return method, None if passed_over else ("ticket", key)
 
-        method = self._extract_method_from_ticket_games(ticket, game_index)
-        if method:
-            return method
+        if isinstance(ticket, dict) and game_index is not None:
+            for source in _GAME_SOURCES:
+                if source not in ticket:
+                    continue
+                parsed_value = self._parsed_ticket_source(ticket, source)
+                if isinstance(parsed_value, list) and 0 <= game_index < len(parsed_value):
+                    entry = parsed_value[game_index]
+                    method = self._normalize_method_value(entry)
+                    if method:
+                        return method, None if passed_over else ("ticket_games", source, None)
+                    method = self._extract_method_from_mapping(entry)
+                    if method:
+                        # The entry's keys are not part of the shape, so this is not reused.
+                        return method, None
+                break
 
-        return "알수없음"
+        return self._extract_method_from_ticket_games(ticket, game_index), None
 
-    def _extract_method_from_mapping(self, source: dict) -> Optional[str]:
-        if not isinstance(source, dict):
+    def _resolve_method_path(self, path: tuple, game: dict, ticket: dict, game_index: Optional[int]) -> Optional[str]:
+        kind = path[0]
+        if kind == "game":
+            return self._normalize_method_value(game.get(path[1]))
+        if kind == "ticket":
+            return self._normalize_method_value(ticket.get(path[1]))
+
+        parsed_value = self._parsed_ticket_source(ticket, path[1])
+        if game_index is None or not isinstance(parsed_value, list) or not 0 <= game_index < len(parsed_value):
             return None
+        return self._normalize_method_value(parsed_value[game_index])
 
-        candidate_keys = (
-            "genType",
-            "gen_type",
-            "gen_type_cd",
-            "genTypeCd",
-            "genTypeCD",
-            "genTyCd",
-            "gnType",
-            "status",
-            "autoYn",
-            "auto_yn",
-            "auto",
-            "autoType",
-            "auto_type",
-            "buyType",
-            "buy_type",
-            "buyTypeCd",
-            "buy_type_cd",
-            "selType",
-            "sel_type",
-        )
+    def _parsed_ticket_source(self, ticket: dict, source: str) -> object:
+        # Every game of a ticket reads the same embedded JSON; parse it once.
+        cached_ticket, cached_source, parsed_value = getattr(self, "_last_parsed_source", (None, None, None))
+        if cached_ticket is ticket and cached_source == source:
+            return parsed_value
+        parsed_value = self._coerce_to_json(ticket.get(source))
+        self._last_parsed_source = (ticket, source, parsed_value)
+        return parsed_value
+
+    def _extract_method_from_mapping(self, source: dict) -> Optional[str]:
+        return self._find_method_in_mapping(source)[0]
+
+    def _find_method_in_mapping(self, source: dict) -> Tuple[Optional[str], Optional[str], bool]:
+        """Method, the key it came from, and whether a key was tried without result first."""
+        if not isinstance(source, dict):
+            return None, None, False
 
-        for key in candidate_keys:
+        passed_over = False
+        for key in _METHOD_CANDIDATE_KEYS:
             if key in source:
                 method = self._normalize_method_value(source.get(key))
                 if method:
-                    return method
+                    return method, key, passed_over
+                passed_over = True
 
         keyword_candidates = ("auto", "manual", "gen", "buy", "sel", "type", "yn", "status")
         for key, value in source.items():
@@ -589,25 +874,16 @@ class Lotto645:
             if any(keyword in lower_key for keyword in keyword_candidates):
                 method = self._normalize_method_value(value)
                 if method:
-                    return method
+                    return method, key, passed_over
+                passed_over = True
 
-        return None
+        return None, None, passed_over
 
     def _extract_method_from_ticket_games(self, ticket: dict, game_index: Optional[int]) -> Optional[str]:
         if not isinstance(ticket, dict):
             return None
 
-        game_sources = (
-            "game",
-            "games",
-            "gameList",
-            "game_list",
-            "gameParam",
-            "game_param",
-            "param",
-        )
-
-        for key in game_sources:
+        for key in _GAME_SOURCES:
             if key not in ticket:
                 continue
             raw_value = ticket.get(key)
@@ -0,0 +1,112 @@
+"""Immutable lotto 6/45 line backed by a 45-bit mask.
+
+Bit ``n - 1`` is set for every number ``n``, the same encoding ``rank_eval``
+uses, so a ticket is validated once when it is built and afterwards compares,
+hashes and ranks as a single integer. ``choice`` is the ``arrGameChoiceNum``
+string the purchase API expects ("01,05,09,23,29,41").
+"""
+from typing import Iterable, Iterator, Tuple
+
+import rank_eval
+
+NUMBERS = 6
+_FULL_MASK = (1 << rank_eval.MAX_NUMBER) - 1
+
+
+class LottoTicket:
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int):
+        mask = int(mask)
+        if mask & ~_FULL_MASK or bin(mask).count("1") != NUMBERS:
+            raise ValueError("A ticket mask must have exactly 6 of the lower 45 bits set.")
+        object.__setattr__(self, "mask", mask)
+
+    @classmethod
+    def from_numbers(cls, numbers: Iterable) -> "LottoTicket":
+        if isinstance(numbers, cls):
+            return numbers
+        parsed = [int(str(number).strip()) for number in numbers]
+        if len(parsed) != NUMBERS:
+            raise ValueError("Each manual entry must contain 6 numbers.")
+        if any(number < 1 or number > rank_eval.MAX_NUMBER for number in parsed):
+            raise ValueError("Each manual entry must be between 1 and 45.")
+        mask = 0
+        for number in parsed:
+            mask |= 1 << (number - 1)
+        if bin(mask).count("1") != NUMBERS:
+            raise ValueError("Each manual entry must be unique.")
+        return cls(mask)
+
+    @classmethod
+    def parse(cls, text: str) -> "LottoTicket":
+        """Ticket from an ``arrGameChoiceNum`` / ``MANUAL_NUMBERS_RAW`` line."""
+        return cls.from_numbers(part for part in text.split(",") if part.strip())
+
+    @property
+    def numbers(self) -> Tuple[int, ...]:
+        mask = self.mask
+        return tuple(number for number in range(1, rank_eval.MAX_NUMBER + 1) if mask >> (number - 1) & 1)
+
+    @property
+    def choice(self) -> str:
+        return ",".join(f"{number:02d}" for number in self.numbers)
+
+    def rank(self, draw: rank_eval.Draw) -> int:
+        return rank_eval.rank(self.mask, draw)
+
+    def shared(self, other: "LottoTicket") -> int:
+        return bin(self.mask & other.mask).count("1")
+
+    def __iter__(self) -> Iterator[str]:
+        # Same zero-padded strings the list representation used to hold.
+        return (f"{number:02d}" for number in self.numbers)
+
+    def __len__(self) -> int:
+        return NUMBERS
+
+    def __contains__(self, number) -> bool:
+        try:
+            value = int(str(number).strip())
+        except (TypeError, ValueError):
+            return False
+        return 1 <= value <= rank_eval.MAX_NUMBER and bool(self.mask >> (value - 1) & 1)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LottoTicket):
+            return self.mask == other.mask
+        return NotImplemented
+
+    def __lt__(self, other: "LottoTicket") -> bool:
+        return self.numbers < other.numbers
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("LottoTicket is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("LottoTicket is immutable")
+
+    def __reduce__(self):
+        return LottoTicket, (self.mask,)
+
+    def __str__(self) -> str:
+        return self.choice
+
+    def __repr__(self) -> str:
+        return f"LottoTicket({self.choice!r})"
+
+
+def number_bit(value) -> int:
+    """Mask bit for one number as found in responses ("7", "07", 7); 0 if invalid."""
+    try:
+        number = int(str(value).strip())
+    except (TypeError, ValueError):
+        return 0
+    return 1 << (number - 1) if 1 <= number <= rank_eval.MAX_NUMBER else 0
+
+
+def mask_of(numbers) -> int:
+    return numbers.mask if isinstance(numbers, LottoTicket) else rank_eval.encode(numbers)
@@ -19,10 +19,13 @@ class Notification:
 
         if result_msg.upper() != "SUCCESS":
             header = f"❌ {title} 실패 ({buy_round}회) :moneybag: 남은잔액 : {balance}"
-            return f"{html.escape(header)}\n{html.escape('사유: ' + result_msg)}"
+            message = f"{html.escape(header)}\n{html.escape('사유: ' + result_msg)}"
+            # A partly completed batch still lists the games that were bought.
+            bought = self.make_lotto_number_message(result.get("arrGameChoiceNum") or [])
+            return f"{message}\n<pre>{html.escape(bought)}</pre>" if bought else message
 
         lotto_number_str = self.make_lotto_number_message(result.get("arrGameChoiceNum", []))
-        header = f"✅ {title} 완료 ({buy_round}회) :moneybag: 남은잔액 : {balance}"
+        header = f"✅ {title} 완료 ({buy_round}회) :moneybag: 남은잔액 : {balance}{self._ledger_suffix(body)}"
         if not lotto_number_str:
             return html.escape(header)
         return f"{html.escape(header)}\n<pre>{html.escape(lotto_number_str)}</pre>"
@@ -41,10 +44,13 @@ class Notification:
 
         if result_code != '100':
             header = f"❌ {title} 실패 ({win720_round}회) :moneybag: 남은잔액 : {balance}"
-            return f"{html.escape(header)}\n{html.escape('사유: ' + result_msg_text)}"
+            message = f"{html.escape(header)}\n{html.escape('사유: ' + result_msg_text)}"
+            # A partly completed batch still lists the tickets that were bought.
+            bought = self.make_win720_number_message(body.get("saleTicket", "") if isinstance(body, dict) else "")
+            return f"{message}\n<pre>{html.escape(bought)}</pre>" if bought else message
 
         win720_number_str = self.make_win720_number_message(body.get("saleTicket", ""))
-        header = f"✅ {title} 완료 ({win720_round}회) :moneybag: 남은잔액 : {balance}"
+        header = f"✅ {title} 완료 ({win720_round}회) :moneybag: 남은잔액 : {balance}{self._ledger_suffix(body)}"
         if not win720_number_str:
             return html.escape(header)
         return f"{html.escape(header)}\n<pre>{html.escape(win720_number_str)}</pre>"
@@ -117,6 +123,9 @@ class Notification:
             formatted_numbers.append(formatted_number)
         return "\n".join(formatted_numbers)
 
+    def _ledger_suffix(self, body: dict) -> str:
+        return f" ({body['ledger']})" if body.get("ledger") else ""
+
     def _stringify_result_msg(self, result_msg) -> str:
         if isinstance(result_msg, str):
             return result_msg
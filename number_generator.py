@@ -0,0 +1,170 @@
+"""Constrained lotto 6/45 manual number generator.
+
+Candidates are 45-bit masks (see ``rank_eval``). Batches are drawn and
+filtered as arrays when NumPy is installed and one at a time otherwise;
+both paths are deterministic for a given seed, but they do not produce the
+same sequence as each other.
+"""
+import logging
+import os
+import random
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import common
+import lotto_ticket
+import rank_eval
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the generator falls back to random.Random.
+    np = None
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+NUMBERS = 6
+_ODD_MASK = sum(1 << (number - 1) for number in range(1, rank_eval.MAX_NUMBER + 1, 2))
+
+
+class GeneratorExhausted(RuntimeError):
+    pass
+
+
+class NumberGenerator:
+    """Produces manual sets under exclude/require, sum, odd-count and history rules.
+
+    ``past_draws`` masks are never repeated, and every issued set shares at
+    most ``max_shared`` numbers with any set issued before it, which keeps
+    the accounts of one run from buying overlapping lines.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        exclude: Iterable[int] = (),
+        require: Iterable[int] = (),
+        sum_range: Optional[Tuple[int, int]] = None,
+        odd_range: Optional[Tuple[int, int]] = None,
+        past_draws: Iterable[int] = (),
+        max_shared: int = NUMBERS - 1,
+        batch_size: int = 8192,
+    ):
+        self.exclude_mask = rank_eval.encode(exclude)
+        self.require_mask = rank_eval.encode(require)
+        if self.exclude_mask & self.require_mask:
+            raise ValueError("A number cannot be both excluded and required.")
+        self.required = sorted(int(number) for number in set(require))
+        if len(self.required) > NUMBERS:
+            raise ValueError("At most 6 numbers can be required.")
+        self.pool = [
+            number for number in range(1, rank_eval.MAX_NUMBER + 1)
+            if not (self.exclude_mask | self.require_mask) >> (number - 1) & 1
+        ]
+        if len(self.pool) < NUMBERS - len(self.required):
+            raise ValueError("Not enough numbers left after exclusions.")
+        self.sum_range = sum_range
+        self.odd_range = odd_range
+        self.past_draws = frozenset(past_draws)
+        # Never hand out the same set twice, whatever the overlap setting.
+        self.max_shared = min(max_shared, NUMBERS - 1)
+        self.batch_size = batch_size
+        self.issued: List[int] = []
+        self.candidates_checked = 0
+        self._random = random.Random(seed)
+        self._numpy_rng = np.random.default_rng(seed) if np is not None else None
+
+    def generate(self, count: int, max_candidates: int = 5_000_000) -> List[lotto_ticket.LottoTicket]:
+        """``count`` new tickets, ready for ``_generate_body_for_manual``."""
+        sets = []
+        checked = 0
+        while len(sets) < count:
+            if checked >= max_candidates:
+                raise GeneratorExhausted(f"No valid set found in {checked} candidates.")
+            candidates, tried = self._candidates()
+            checked += tried
+            for mask in candidates:
+                if len(sets) == count:
+                    break
+                # Candidates of one batch were only checked against earlier batches.
+                if all(bin(mask & other).count("1") <= self.max_shared for other in self.issued):
+                    self.issued.append(mask)
+                    sets.append(lotto_ticket.LottoTicket(mask))
+        self.candidates_checked += checked
+        return sets
+
+    def accepts(self, mask: int) -> bool:
+        if mask & self.exclude_mask or mask & self.require_mask != self.require_mask:
+            return False
+        if mask in self.past_draws:
+            return False
+        if self.sum_range is not None:
+            total = sum(number for number in range(1, rank_eval.MAX_NUMBER + 1) if mask >> (number - 1) & 1)
+            if not self.sum_range[0] <= total <= self.sum_range[1]:
+                return False
+        if self.odd_range is not None:
+            odd = bin(mask & _ODD_MASK).count("1")
+            if not self.odd_range[0] <= odd <= self.odd_range[1]:
+                return False
+        return all(bin(mask & other).count("1") <= self.max_shared for other in self.issued)
+
+    def _candidates(self) -> Tuple[List[int], int]:
+        if self._numpy_rng is not None:
+            return self._candidates_numpy()
+        for tried in range(1, self.batch_size + 1):
+            picked = self._random.sample(self.pool, NUMBERS - len(self.required))
+            mask = rank_eval.encode(picked) | self.require_mask
+            if self.accepts(mask):
+                return [mask], tried
+        return [], self.batch_size
+
+    def _candidates_numpy(self) -> Tuple[List[int], int]:
+        pool = np.asarray(self.pool, dtype=np.int64)
+        free = NUMBERS - len(self.required)
+        # Independent draws conditioned on being distinct are a uniform subset,
+        # so rows with a repeated number are simply dropped below.
+        picked = pool[self._numpy_rng.integers(0, len(pool), (self.batch_size, free))]
+        bits = np.left_shift(np.uint64(1), (picked - 1).astype(np.uint64))
+        masks = np.bitwise_or.reduce(bits, axis=1) if free else np.zeros(self.batch_size, np.uint64)
+        masks |= np.uint64(self.require_mask)
+
+        keep = rank_eval._popcount(masks) == NUMBERS
+        if self.sum_range is not None:
+            totals = picked.sum(axis=1) + sum(self.required)
+            keep &= (totals >= self.sum_range[0]) & (totals <= self.sum_range[1])
+        if self.odd_range is not None:
+            odd = rank_eval._popcount(masks & np.uint64(_ODD_MASK))
+            keep &= (odd >= self.odd_range[0]) & (odd <= self.odd_range[1])
+        if self.past_draws:
+            keep &= ~np.isin(masks, np.fromiter(self.past_draws, dtype=np.uint64, count=len(self.past_draws)))
+        if self.issued:
+            issued = np.asarray(self.issued, dtype=np.uint64)
+            shared = rank_eval._popcount(masks[:, None] & issued[None, :])
+            keep &= (shared <= self.max_shared).all(axis=1)
+
+        return [int(mask) for mask in masks[keep]], self.batch_size
+
+
+def from_env(past_draws: Iterable[int] = ()) -> NumberGenerator:
+    """Generator configured by ``MANUAL_*`` environment variables."""
+    seed = os.getenv("MANUAL_SEED")
+    return NumberGenerator(
+        seed=int(seed) if seed else None,
+        exclude=_parse_numbers(os.getenv("MANUAL_EXCLUDE", "")),
+        require=_parse_numbers(os.getenv("MANUAL_REQUIRE", "")),
+        sum_range=_parse_range(os.getenv("MANUAL_SUM_RANGE", "")),
+        odd_range=_parse_range(os.getenv("MANUAL_ODD_RANGE", "")),
+        past_draws=past_draws,
+        max_shared=int(os.getenv("MANUAL_MAX_SHARED", str(NUMBERS - 1))),
+    )
+
+
+def _parse_numbers(text: str) -> Sequence[int]:
+    return [int(part) for part in text.replace(" ", "").split(",") if part]
+
+
+def _parse_range(text: str) -> Optional[Tuple[int, int]]:
+    text = text.strip()
+    if not text:
+        return None
+    low, _, high = text.partition("-")
+    return int(low), int(high or low)
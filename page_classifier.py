@@ -0,0 +1,160 @@
+import re
+from enum import Enum
+from typing import FrozenSet, Iterable
+
+
+class PageClass(Enum):
+    AUTHENTICATED = "authenticated"
+    LOGIN_PAGE = "login_page"
+    ACTION_REQUIRED = "action_required"
+    FAILURE = "failure"
+
+
+class MarkerMatcher:
+    """Finds every marker occurring in a text with one compiled pattern.
+
+    The pattern lists markers longest first, so a match at a position is the
+    longest marker starting there; markers contained in it are implied. The
+    scan restarts one character after each match start, so markers that
+    overlap a previous match are still found.
+    """
+
+    def __init__(self, markers: Iterable[str]):
+        self.markers = tuple(dict.fromkeys(marker.lower() for marker in markers))
+        ordered = sorted(self.markers, key=len, reverse=True)
+        self._search = re.compile("|".join(re.escape(marker) for marker in ordered)).search
+        self._implied = {
+            marker: frozenset(other for other in self.markers if other in marker)
+            for marker in self.markers
+        }
+
+    def scan(self, lowered_text: str) -> FrozenSet[str]:
+        found = set()
+        pos = 0
+        while True:
+            match = self._search(lowered_text, pos)
+            if match is None:
+                return frozenset(found)
+            found.update(self._implied[match.group()])
+            pos = match.start() + 1
+
+
+LOGOUT_MARKERS = ("로그아웃", "logout")
+
+ACTION_REQUIRED_URL_MARKERS = (
+    "exprypswdnoti",
+    "agreement",
+    "certification",
+    "sleep",
+)
+
+# Keep these intentionally specific. Authenticated pages commonly contain
+# generic footer/menu words such as "약관" or "본인확인".
+ACTION_REQUIRED_TEXT_MARKERS = (
+    "exprypswdnoti",
+    "비밀번호 변경 안내",
+    "비밀번호를 변경해",
+    "비밀번호를 변경 하",
+    "다음에 변경",
+    "약관에 동의",
+    "약관 동의",
+    "본인확인이 필요",
+    "본인 확인이 필요",
+    "휴면계정",
+    "휴면 계정",
+)
+
+LOGIN_FAILURE_MARKERS = (
+    "로그인 실패",
+    "비밀번호",
+    "아이디",
+    "인증",
+    "본인확인",
+    "휴면",
+    "차단",
+    "captcha",
+    "login failed",
+    "unauthorized",
+    "error",
+)
+
+LOGIN_PAGE_MARKERS = ("로그인", "login")
+LOGIN_FORM_POST_MARKER = "securitylogincheck"
+
+_TEXT_MATCHER = MarkerMatcher(
+    LOGOUT_MARKERS
+    + ACTION_REQUIRED_TEXT_MARKERS
+    + LOGIN_FAILURE_MARKERS
+    + LOGIN_PAGE_MARKERS
+    + (LOGIN_FORM_POST_MARKER,)
+)
+
+
+class PageClassification:
+    __slots__ = ("found", "action_required_url")
+
+    def __init__(self, found: FrozenSet[str], action_required_url: bool):
+        self.found = found
+        self.action_required_url = action_required_url
+
+    @property
+    def has_logout(self) -> bool:
+        return any(marker in self.found for marker in LOGOUT_MARKERS)
+
+    @property
+    def action_required(self) -> bool:
+        if self.action_required_url:
+            return True
+        # A page exposing a logout affordance is an authenticated page.
+        if self.has_logout:
+            return False
+        return any(marker in self.found for marker in ACTION_REQUIRED_TEXT_MARKERS)
+
+    @property
+    def login_failure(self) -> bool:
+        return not self.has_logout and any(marker in self.found for marker in LOGIN_FAILURE_MARKERS)
+
+    @property
+    def login_page(self) -> bool:
+        if "로그인" in self.found and "로그아웃" not in self.found:
+            return True
+        return (
+            "login" in self.found
+            and "logout" not in self.found
+            and LOGIN_FORM_POST_MARKER not in self.found
+        )
+
+    @property
+    def kind(self) -> PageClass:
+        if self.action_required:
+            return PageClass.ACTION_REQUIRED
+        if self.login_page:
+            return PageClass.LOGIN_PAGE
+        if self.login_failure:
+            return PageClass.FAILURE
+        return PageClass.AUTHENTICATED
+
+
+_last_classification = (None, None, None)
+
+
+def classify_page(url: str, text: str) -> PageClassification:
+    """Classify a page from its final URL and body in a single scan.
+
+    The login and session checks look at the same response several times in
+    a row, so the most recent result is reused when url and text are equal.
+    """
+    global _last_classification
+    url = url or ""
+    text = text or ""
+    last_url, last_text, last_result = _last_classification
+    if last_result is not None and url == last_url and text == last_text:
+        return last_result
+
+    lowered_url = url.lower()
+    result = PageClassification(
+        _TEXT_MATCHER.scan(text.lower()),
+        any(marker in lowered_url for marker in ACTION_REQUIRED_URL_MARKERS),
+    )
+    _last_classification = (url, text, result)
+    return result
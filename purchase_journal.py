@@ -0,0 +1,404 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional
+
+import common
+import draw_calendar
+import ledger
+import redaction
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(".cache", "purchase_journal.json")
+
+PENDING = "pending"
+SENT = "sent"
+DONE = "done"
+FAILED = "failed"
+
+
+class PurchaseUnconfirmed(RuntimeError):
+    """The ledger could not tell whether a purchase went through, or could not be read before sending it."""
+
+
+class AlreadyCompleted(Exception):
+    """Raised by ``before_retry`` when the ledger shows the purchase went through."""
+
+    def __init__(self, response: dict):
+        super().__init__("purchase already completed")
+        self.response = response
+
+
+class JournalEntry:
+    __slots__ = ("key", "product", "round", "slots", "state", "attempts", "baseline", "updated_at", "response")
+
+    def __init__(self, key: str, product: str, round_no, slots: Iterable[str]):
+        self.key = key
+        self.product = product
+        self.round = int(round_no)
+        self.slots = tuple(slots)
+        self.state = PENDING
+        self.attempts = 0
+        # Ledger order ids for this round seen before the first send.
+        self.baseline: Optional[List[str]] = None
+        self.updated_at = 0.0
+        # Only responses received in this process; the saved copy is redacted.
+        self.response: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "product": self.product,
+            "round": self.round,
+            "slots": list(self.slots),
+            "state": self.state,
+            "attempts": self.attempts,
+            "baseline": self.baseline,
+            "updated_at": self.updated_at,
+            "response": redaction.redact_structure(self.response) if self.response is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, key: str, data: dict) -> "JournalEntry":
+        entry = cls(key, data["product"], data["round"], data.get("slots", ()))
+        entry.state = data.get("state", PENDING)
+        entry.attempts = int(data.get("attempts", 0))
+        entry.baseline = data.get("baseline")
+        entry.updated_at = float(data.get("updated_at", 0.0))
+        return entry
+
+    @property
+    def unsettled(self) -> bool:
+        """Sent without an answer, or done in an earlier process whose response is gone."""
+        return self.state == SENT or (self.state == DONE and self.response is None)
+
+    def __repr__(self) -> str:
+        return f"JournalEntry(product={self.product!r}, round={self.round}, state={self.state!r}, attempts={self.attempts})"
+
+
+def entry_key(account: str, product: str, round_no, slots: Iterable[str], run_id: str = "") -> str:
+    # The account is hashed so the journal file carries no user ids.
+    text = "\n".join([run_id, account, product, str(int(round_no)), *slots])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class PurchaseJournal:
+    """Write-ahead journal of purchase requests keyed by run, account, round and slot set.
+
+    An entry is marked ``sent`` and saved before every purchase POST. When a
+    send fails without a definite answer, the next attempt - a retry inside
+    the product class or a whole new ``_retry_purchase`` call - first reads
+    the ledger for this round and adopts any order that was not there before
+    the first send instead of buying again. Nothing is sent when that
+    baseline cannot be read, since no order could be told apart from one
+    bought earlier.
+
+    Entries belong to one run (``run_id``, new for every process unless
+    ``PURCHASE_RUN_ID`` is set to resume a crashed run), so a deliberate
+    second purchase is never mistaken for a replay. Entries older than
+    ``replay_window`` are pruned from the file.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        replay_window: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+        run_id: Optional[str] = None,
+    ):
+        self.path = path or os.getenv("PURCHASE_JOURNAL_PATH", DEFAULT_PATH)
+        self.run_id = run_id or os.getenv("PURCHASE_RUN_ID") or uuid.uuid4().hex
+        self.replay_window = replay_window if replay_window is not None else float(
+            os.getenv("PURCHASE_JOURNAL_REPLAY_WINDOW", "3600")
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, JournalEntry]] = None
+
+    def begin(self, account: str, product: str, round_no, slots: Iterable[str]) -> JournalEntry:
+        slots = tuple(slots)
+        key = entry_key(account, product, round_no, slots, self.run_id)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is None or entry.state == FAILED or self._clock() - entry.updated_at > self.replay_window:
+                entry = JournalEntry(key, product, round_no, slots)
+                entry.updated_at = self._clock()
+                entries[key] = entry
+            return entry
+
+    def resolve(self, entry: JournalEntry, find_orders: Callable[[], Iterable[str]], recovered: Callable[[List[str]], dict]) -> Optional[dict]:
+        """Response of a purchase that already went through, or ``None`` when sending is safe."""
+        if entry.state == DONE and entry.response is not None:
+            logger.info("[purchase_journal] %s round=%s already completed", entry.product, entry.round)
+            return entry.response
+        if not entry.unsettled:
+            return None
+        if entry.baseline is None:
+            raise PurchaseUnconfirmed(f"{entry.product} {entry.round}회 구매 전 원장 기준이 없어 완료 여부를 알 수 없습니다.")
+
+        try:
+            orders = set(find_orders())
+        except Exception as exc:
+            raise PurchaseUnconfirmed(f"{entry.product} {entry.round}회 구매 여부를 원장에서 확인하지 못했습니다: {exc}") from exc
+        new_orders = sorted(orders - set(entry.baseline))
+        if not new_orders:
+            if entry.state == DONE:
+                raise PurchaseUnconfirmed(f"{entry.product} {entry.round}회 구매가 완료로 기록됐지만 원장에 없습니다.")
+            logger.info("[purchase_journal] %s round=%s not in ledger; retry is safe", entry.product, entry.round)
+            return None
+
+        logger.warning(
+            "[purchase_journal] %s round=%s found in ledger after an unanswered send (orders=%s)",
+            entry.product,
+            entry.round,
+            len(new_orders),
+        )
+        self.complete(entry, recovered(new_orders))
+        return entry.response
+
+    def run(
+        self,
+        entry: JournalEntry,
+        send: Callable[[Callable[[], None]], dict],
+        find_orders: Callable[[], Iterable[str]],
+        recovered: Callable[[List[str]], dict],
+        succeeded: Callable[[dict], bool],
+    ) -> dict:
+        """Send one purchase through the journal.
+
+        ``send`` receives a ``before_retry`` callback to call before each of
+        its own resends; it raises ``AlreadyCompleted`` when the ledger shows
+        the purchase, which ends the send with the recovered response.
+        """
+        response = self.resolve(entry, find_orders, recovered)
+        if response is not None:
+            return response
+
+        if entry.baseline is None:
+            entry.baseline = _read_baseline(entry, find_orders)
+        self.mark_sent(entry)
+
+        def before_retry() -> None:
+            response = self.resolve(entry, find_orders, recovered)
+            if response is not None:
+                raise AlreadyCompleted(response)
+            self.mark_sent(entry)
+
+        try:
+            response = send(before_retry)
+        except AlreadyCompleted as done:
+            return done.response
+        if succeeded(response):
+            self.complete(entry, response)
+        else:
+            self.fail(entry, response)
+        return response
+
+    def run_batch(
+        self,
+        entries: List[JournalEntry],
+        send: Callable[[int], dict],
+        find_orders: Callable[[], Iterable[str]],
+        recovered: Callable[[List[str]], dict],
+        succeeded: Callable[[dict], bool],
+        unconfirmed: Callable[[BaseException], dict],
+        map_concurrent: Optional[Callable] = None,
+        attempts: int = 3,
+    ) -> List[dict]:
+        """Send several orders of one round, ``map_concurrent`` at a time.
+
+        With orders in flight together a new ledger row cannot be tied to one
+        of them, so ``send(index)`` must not resend on its own. Unanswered
+        orders are settled together instead: one ledger read shares a baseline
+        with the whole batch, and the new rows not explained by orders already
+        answered after that baseline either cover every unanswered order
+        (adopted), none of them (resent) or only some (unconfirmed).
+
+        Orders still unconfirmed at the end get ``unconfirmed(error)`` as
+        their response once any order of the batch has been bought; if none
+        was, the error is raised so the whole batch can be retried.
+        """
+        responses: List[Optional[dict]] = [
+            entry.response if entry.state == DONE and entry.response is not None else None for entry in entries
+        ]
+        last_error: Optional[BaseException] = None
+        for _ in range(attempts):
+            todo = [index for index, entry in enumerate(entries) if responses[index] is None]
+            if not todo:
+                break
+            unanswered = [index for index in todo if entries[index].unsettled]
+            if unanswered:
+                try:
+                    settled = self._settle(entries, unanswered, find_orders, recovered)
+                except PurchaseUnconfirmed as exc:
+                    last_error = exc
+                    break
+                if settled:
+                    for index in unanswered:
+                        responses[index] = entries[index].response
+                    continue
+
+            baseline = next((entry.baseline for entry in entries if entry.baseline is not None), None)
+            if baseline is None:
+                try:
+                    baseline = _read_baseline(entries[todo[0]], find_orders)
+                except PurchaseUnconfirmed as exc:
+                    last_error = exc
+                    break
+            for index in todo:
+                entries[index].baseline = baseline
+                self.mark_sent(entries[index])
+
+            results = (map_concurrent or _map_serial)(send, todo)
+            for index, (response, error) in zip(todo, results):
+                if error is not None:
+                    last_error = error
+                    logger.warning("[purchase_journal] %s order %s unanswered: %s", entries[index].product, index + 1, error)
+                    continue
+                responses[index] = response
+                if succeeded(response):
+                    self.complete(entries[index], response)
+                else:
+                    self.fail(entries[index], response)
+
+        missing = [index for index, response in enumerate(responses) if response is None]
+        if missing:
+            error = last_error or PurchaseUnconfirmed("일부 주문의 완료 여부를 확인하지 못했습니다.")
+            if not any(succeeded(response) for response in responses if response is not None):
+                raise error
+            # Orders that were bought must still be reported (and charged).
+            logger.warning("[purchase_journal] %s of %s orders unconfirmed: %s", len(missing), len(entries), error)
+            for index in missing:
+                responses[index] = unconfirmed(error)
+        return responses
+
+    def _settle(self, entries: List[JournalEntry], unanswered: List[int], find_orders, recovered) -> bool:
+        baseline = entries[unanswered[0]].baseline
+        if baseline is None:
+            raise PurchaseUnconfirmed("주문 전 원장 기준이 없어 응답 없는 주문의 완료 여부를 알 수 없습니다.")
+        try:
+            orders = set(find_orders())
+        except Exception as exc:
+            raise PurchaseUnconfirmed(f"구매 여부를 원장에서 확인하지 못했습니다: {exc}") from exc
+        new_orders = sorted(orders - set(baseline))
+        # Only orders sent against this baseline show up as new rows; ones
+        # completed before it (e.g. in an earlier attempt) are already in it.
+        answered = sum(
+            1 for index, entry in enumerate(entries)
+            if index not in unanswered and entry.state == DONE and entry.baseline == baseline
+        )
+        unexplained = len(new_orders) - answered
+        if unexplained <= 0:
+            if any(entries[index].state == DONE for index in unanswered):
+                raise PurchaseUnconfirmed("완료로 기록된 주문이 원장에 없습니다.")
+            logger.info("[purchase_journal] %s unanswered orders not in ledger; resending", len(unanswered))
+            return False
+        if unexplained < len(unanswered):
+            raise PurchaseUnconfirmed(
+                f"응답 없는 주문 {len(unanswered)}건 중 {unexplained}건만 원장에 있어 어느 주문이 완료됐는지 알 수 없습니다."
+            )
+        logger.warning("[purchase_journal] %s unanswered orders found in ledger", len(unanswered))
+        for index in unanswered:
+            self.complete(entries[index], recovered(new_orders))
+        return True
+
+    def mark_sent(self, entry: JournalEntry) -> None:
+        self._update(entry, SENT, attempts=entry.attempts + 1)
+
+    def complete(self, entry: JournalEntry, response: dict) -> None:
+        self._update(entry, DONE, response=response)
+
+    def fail(self, entry: JournalEntry, response: Optional[dict] = None) -> None:
+        self._update(entry, FAILED, response=response)
+
+    def _update(self, entry: JournalEntry, state: str, attempts: Optional[int] = None, response: Optional[dict] = None) -> None:
+        with self._lock:
+            entry.state = state
+            if attempts is not None:
+                entry.attempts = attempts
+            if response is not None:
+                entry.response = response
+            entry.updated_at = self._clock()
+            self._load()[entry.key] = entry
+            self._save()
+
+    def _load(self) -> Dict[str, JournalEntry]:
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    raw = json.load(handle)
+                self._entries = {key: JournalEntry.from_dict(key, value) for key, value in raw.items()}
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                logger.warning("[purchase_journal] ignoring unreadable %s: %s", self.path, exc)
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        now = self._clock()
+        entries = {
+            key: entry.to_dict()
+            for key, entry in self._entries.items()
+            if now - entry.updated_at <= self.replay_window
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".purchase_journal.", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(entries, handle, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            # The in-memory journal still guards this run.
+            logger.warning("[purchase_journal] could not write %s: %s", self.path, exc)
+
+
+def _read_baseline(entry: JournalEntry, find_orders: Callable[[], Iterable[str]]) -> List[str]:
+    try:
+        return sorted(find_orders())
+    except Exception as exc:
+        # Without a baseline an earlier order of this round would pass for ours.
+        logger.warning("[purchase_journal] ledger baseline failed: %s", exc)
+        raise PurchaseUnconfirmed(f"{entry.product} {entry.round}회 구매 전 원장을 읽지 못해 주문하지 않았습니다: {exc}") from exc
+
+
+def ledger_finder(http_client, headers: dict, product_code: str, round_no) -> Callable[[], List[str]]:
+    """Order ids of ``round_no`` bought today (KST), read from the ledger."""
+
+    def _find() -> List[str]:
+        today = datetime.datetime.now(draw_calendar.KST).date()
+        return ledger.order_ids(http_client, headers, product_code, round_no, today, today)
+
+    return _find
+
+
+_default_journal: Optional[PurchaseJournal] = None
+_default_lock = threading.Lock()
+
+
+def get_journal() -> PurchaseJournal:
+    global _default_journal
+    with _default_lock:
+        if _default_journal is None:
+            _default_journal = PurchaseJournal()
+            logger.info("[purchase_journal] run_id=%s path=%s", _default_journal.run_id, _default_journal.path)
+        return _default_journal
+
+
+def _map_serial(func, items) -> list:
+    results = []
+    for item in items:
+        try:
+            results.append((func(item), None))
+        except Exception as exc:
+            results.append((None, exc))
+    return results
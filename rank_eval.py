@@ -0,0 +1,101 @@
+"""Lotto 6/45 rank evaluation on 45-bit masks.
+
+A ticket or a draw is encoded with bit ``n - 1`` set for every number ``n``.
+The number of main matches is then ``popcount(ticket & draw)`` and the bonus
+check is a single AND. ``rank_matrix`` evaluates many tickets against many
+draws in NumPy batches when NumPy is installed and falls back to plain
+integers otherwise.
+"""
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; rank_matrix falls back to Python ints.
+    np = None
+
+MAX_NUMBER = 45
+# Pairs evaluated per NumPy batch; bounds the temporary arrays to a few MB.
+DEFAULT_BATCH_PAIRS = 1 << 18
+
+# _RANK_TABLE[main_matches * 2 + bonus_matched] -> rank (0 = no prize).
+_RANK_TABLE = (0, 0, 0, 0, 0, 0, 5, 5, 4, 4, 3, 2, 1, 1)
+
+Draw = Tuple[int, int]
+
+
+def encode(numbers: Iterable) -> int:
+    """Bitmask of the valid 1..45 numbers in ``numbers``; anything else is ignored."""
+    mask = 0
+    for value in numbers:
+        try:
+            number = int(str(value).strip())
+        except (TypeError, ValueError):
+            continue
+        if 1 <= number <= MAX_NUMBER:
+            mask |= 1 << (number - 1)
+    return mask
+
+
+def encode_draw(main_numbers: Iterable, bonus_number=None) -> Draw:
+    return encode(main_numbers), encode(() if bonus_number is None else (bonus_number,))
+
+
+def rank(ticket_mask: int, draw: Draw) -> int:
+    main_mask, bonus_mask = draw
+    matches = bin(ticket_mask & main_mask).count("1")
+    return _RANK_TABLE[matches * 2 + (1 if ticket_mask & bonus_mask else 0)]
+
+
+def rank_matrix(tickets: Sequence[int], draws: Sequence[Draw], batch_pairs: int = DEFAULT_BATCH_PAIRS):
+    """Ranks of every ticket against every draw, shaped ``(len(tickets), len(draws))``.
+
+    Returns an ``int8`` ndarray when NumPy is available, otherwise a list of
+    lists.
+    """
+    if np is None:
+        return [[rank(ticket, draw) for draw in draws] for ticket in tickets]
+
+    ticket_array = np.asarray(tickets, dtype=np.uint64)
+    main_array = np.fromiter((main for main, _ in draws), dtype=np.uint64, count=len(draws))
+    bonus_array = np.fromiter((bonus for _, bonus in draws), dtype=np.uint64, count=len(draws))
+    ranks = np.empty((len(ticket_array), len(main_array)), dtype=np.int8)
+    if ranks.size == 0:
+        return ranks
+
+    rank_table = np.asarray(_RANK_TABLE, dtype=np.int8)
+    rows_per_batch = max(1, batch_pairs // len(main_array))
+    for start in range(0, len(ticket_array), rows_per_batch):
+        block = ticket_array[start:start + rows_per_batch, None]
+        matches = _popcount(block & main_array)
+        bonus = (block & bonus_array) != 0
+        ranks[start:start + rows_per_batch] = rank_table[matches * 2 + bonus]
+    return ranks
+
+
+def rank_counts(tickets: Sequence[int], draws: Sequence[Draw]) -> List[List[int]]:
+    """Per draw, how many tickets won each rank: ``counts[draw][rank]`` for ranks 0..5."""
+    matrix = rank_matrix(tickets, draws)
+    if np is not None:
+        return [np.bincount(matrix[:, index], minlength=6).tolist() for index in range(matrix.shape[1])]
+    counts = [[0] * 6 for _ in draws]
+    for row in matrix:
+        for index, value in enumerate(row):
+            counts[index][value] += 1
+    return counts
+
+
+def _popcount(values):
+    bitwise_count = getattr(np, "bitwise_count", None)
+    if bitwise_count is not None:  # NumPy 2.0+
+        return bitwise_count(values).astype(np.int8)
+    as_bytes = values.view(np.uint8).reshape(values.shape + (8,))
+    return _BYTE_POPCOUNT[as_bytes].sum(axis=-1, dtype=np.int8)
+
+
+_BYTE_POPCOUNT = (
+    np.asarray([bin(value).count("1") for value in range(256)], dtype=np.int8) if np is not None else None
+)
+
+
+def describe(rank_value: Optional[int]) -> str:
+    return "0등" if not rank_value else f"{rank_value}등"
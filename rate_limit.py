@@ -0,0 +1,66 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class HostRateLimiter:
+    """Spaces request starts per host and caps in-flight requests per host.
+
+    Requests to one host start at least ``min_interval`` seconds apart, and no
+    more than ``max_concurrency`` of them run at once. A caller that already
+    waited longer than ``min_interval`` since the previous request does not
+    sleep at all.
+    """
+
+    def __init__(self, min_interval: float, max_concurrency: int = 4, clock: Callable[[], float] = time.monotonic):
+        self.min_interval = max(min_interval, 0.0)
+        self.max_concurrency = max(max_concurrency, 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next_start: Dict[str, float] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slots = self._slots.get(host)
+            if slots is None:
+                slots = self._slots[host] = threading.BoundedSemaphore(self.max_concurrency)
+
+        with slots:
+            with self._lock:
+                now = self._clock()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def map_ordered(
+    func: Callable,
+    items: Iterable,
+    max_workers: int = 4,
+) -> List[Tuple[object, Optional[BaseException]]]:
+    """Run ``func`` over ``items`` on a bounded thread pool.
+
+    Returns ``(result, error)`` pairs in input order; one failing item does not
+    affect the others.
+    """
+    items = list(items)
+
+    def _call(item):
+        try:
+            return func(item), None
+        except Exception as exc:
+            return None, exc
+
+    if len(items) <= 1 or max_workers <= 1:
+        return [_call(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(_call, items))
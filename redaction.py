@@ -0,0 +1,128 @@
+import re
+from typing import Iterator
+
+_HEX_RE = re.compile(r"[0-9a-fA-F]{64,}")
+_CREDENTIAL_PARAM_RE = re.compile(r"(?i)(password|passwd|pswd|userPswdEncn|userId|inpUserId)=[^&\s]+")
+_CREDENTIAL_FIELD_RE = re.compile(
+    r"(?i)(['\"]?(?:password|passwd|pswd|userPswdEncn|userId|inpUserId)['\"]?\s*:\s*)['\"]?[^,'\"}]+['\"]?"
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Keys whose values are masked wholesale in logged structures.
+SENSITIVE_KEYS = frozenset({
+    "oltInetUserId",
+    "saleTicket",
+    "failTicket",
+    "prchsLtNoInfoLstCn",
+    "userId",
+    "inpUserId",
+    "userPswdEncn",
+    "password",
+})
+SENSITIVE_KEY_PREFIXES = ("barCode",)
+# Keys whose list items keep their slot prefix ("A|") and lose the numbers.
+PARTIAL_KEYS = frozenset({"arrGameChoiceNum"})
+
+MASK = "***"
+
+
+def is_sensitive_key(key) -> bool:
+    return key in SENSITIVE_KEYS or (isinstance(key, str) and key.startswith(SENSITIVE_KEY_PREFIXES))
+
+
+def redact_text(value) -> str:
+    if value is None:
+        return ""
+    text = str(value)
+    text = _HEX_RE.sub("[REDACTED_HEX]", text)
+    text = _CREDENTIAL_PARAM_RE.sub(r"\1=[REDACTED]", text)
+    text = _CREDENTIAL_FIELD_RE.sub(r"\1[REDACTED]", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _mask_partial(value: list) -> list:
+    return [str(item)[:2] + MASK for item in value]
+
+
+def redact_structure(value, key=None):
+    """Return a redacted copy of ``value``; prefer ``Redacted`` for logging."""
+    if is_sensitive_key(key):
+        return MASK if value else value
+    if key in PARTIAL_KEYS and isinstance(value, list):
+        return _mask_partial(value)
+    if isinstance(value, dict):
+        return {child_key: redact_structure(child_value, child_key) for child_key, child_value in value.items()}
+    if isinstance(value, list):
+        return [redact_structure(item) for item in value]
+    return value
+
+
+def iter_redacted(value, key=None) -> Iterator[str]:
+    """Yield the repr of ``value`` piece by piece with sensitive values masked."""
+    if is_sensitive_key(key):
+        yield repr(MASK if value else value)
+    elif key in PARTIAL_KEYS and isinstance(value, list):
+        yield repr(_mask_partial(value))
+    elif isinstance(value, dict):
+        yield "{"
+        for index, (child_key, child_value) in enumerate(value.items()):
+            if index:
+                yield ", "
+            yield repr(child_key)
+            yield ": "
+            yield from iter_redacted(child_value, child_key)
+        yield "}"
+    elif isinstance(value, (list, tuple)):
+        yield "[" if isinstance(value, list) else "("
+        for index, item in enumerate(value):
+            if index:
+                yield ", "
+            yield from iter_redacted(item)
+        yield "]" if isinstance(value, list) else ")"
+    else:
+        yield repr(value)
+
+
+class Redacted:
+    """Log argument that redacts a structure only when the record is emitted."""
+
+    __slots__ = ("_value",)
+
+    def __init__(self, value):
+        self._value = value
+
+    def __str__(self) -> str:
+        return "".join(iter_redacted(self._value))
+
+    __repr__ = __str__
+
+
+class RedactedText:
+    """Log argument that applies ``redact_text`` only when the record is emitted."""
+
+    __slots__ = ("_value", "_limit")
+
+    def __init__(self, value, limit: int = None):
+        self._value = value
+        self._limit = limit
+
+    def __str__(self) -> str:
+        text = redact_text(self._value)
+        return text if self._limit is None else text[:self._limit]
+
+    __repr__ = __str__
+
+
+class Deferred:
+    """Log argument that calls ``func(*args)`` only when the record is emitted."""
+
+    __slots__ = ("_func", "_args")
+
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+
+    def __str__(self) -> str:
+        return str(self._func(*self._args))
+
+    __repr__ = __str__
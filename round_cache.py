@@ -0,0 +1,95 @@
+import datetime
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import common
+import draw_calendar
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class RoundMetadata:
+    __slots__ = ("round", "draw_date", "tlmt_date", "ready_ip", "expires_at")
+
+    def __init__(self, round_no: str, draw_date: str, tlmt_date: str, ready_ip: Optional[str], expires_at: float):
+        self.round = round_no
+        self.draw_date = draw_date
+        self.tlmt_date = tlmt_date
+        self.ready_ip = ready_ip
+        self.expires_at = expires_at
+
+
+class RoundMetadataCache:
+    """Run-scoped cache of the game645.do purchase requirements, keyed by round.
+
+    The draw date, payout deadline and round are the same for every purchase
+    and every account until the round closes, so only the first purchase in a
+    run fetches them. ``ready_ip`` is only reused when ``share_ready_ip`` is
+    set (``LOTTO_SHARE_READY_IP=1``); otherwise each purchase still asks the
+    ready socket for its own.
+    """
+
+    def __init__(
+        self,
+        share_ready_ip: Optional[bool] = None,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if share_ready_ip is None:
+            share_ready_ip = os.getenv("LOTTO_SHARE_READY_IP", "0") == "1"
+        self.share_ready_ip = share_ready_ip
+        self.ttl = ttl or float(os.getenv("ROUND_CACHE_TTL", "3600"))
+        self._clock = clock
+        self._entries: Dict[str, RoundMetadata] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def current(self) -> Optional[RoundMetadata]:
+        """Return the entry for the round still on sale, dropping closed ones."""
+        now = self._clock()
+        with self._lock:
+            for round_no in [key for key, entry in self._entries.items() if entry.expires_at <= now]:
+                logger.info("[round_cache] round %s closed; dropping cached metadata", round_no)
+                del self._entries[round_no]
+            entry = max(self._entries.values(), key=lambda item: int(item.round), default=None)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def store(self, round_no: str, draw_date: str, tlmt_date: str, ready_ip: Optional[str] = None) -> RoundMetadata:
+        entry = RoundMetadata(
+            str(round_no),
+            draw_date,
+            tlmt_date,
+            ready_ip if self.share_ready_ip else None,
+            self._expires_at(draw_date),
+        )
+        with self._lock:
+            self._entries[entry.round] = entry
+        logger.info("[round_cache] cached round=%s draw_date=%s", entry.round, draw_date)
+        return entry
+
+    def invalidate(self, round_no: Optional[str] = None) -> None:
+        with self._lock:
+            if round_no is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(round_no), None)
+
+    def _expires_at(self, draw_date: str) -> float:
+        expires_at = self._clock() + self.ttl
+        try:
+            draw_day = datetime.datetime.strptime(draw_date, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return expires_at
+        sales_close = datetime.datetime.combine(
+            draw_day, draw_calendar.LOTTO645.sales_close, tzinfo=draw_calendar.KST
+        ).timestamp()
+        return min(expires_at, sales_close)
@@ -0,0 +1,165 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+import auth
+import common
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class AccountSession:
+    """Login state of one account for the lifetime of a run.
+
+    Every re-login bumps ``generation``. Callers read the generation before a
+    request and hand it back to ``reauthenticate`` when that request is
+    rejected, so concurrent rejections of the same session coalesce into a
+    single login.
+    """
+
+    def __init__(self, username: str, password: str, auth_ctrl: auth.AuthController, authenticated: bool = False):
+        self.username = username
+        self._password = password
+        self.auth_ctrl = auth_ctrl
+        self.login_count = 0
+        self.generation = 0
+        self._authenticated = authenticated
+        self._lock = threading.Lock()
+
+    @property
+    def authenticated(self) -> bool:
+        return self._authenticated
+
+    def ensure_logged_in(self) -> auth.AuthController:
+        with self._lock:
+            if not self._authenticated:
+                self._login(clear_cookies=True)
+        return self.auth_ctrl
+
+    def reauthenticate(self, observed_generation: Optional[int] = None, verify: bool = True) -> bool:
+        """Log in again unless the session turns out to be usable.
+
+        Returns True only when a login request was actually made.
+        """
+        with self._lock:
+            if (
+                observed_generation is not None
+                and observed_generation != self.generation
+                and self._authenticated
+            ):
+                logger.info(
+                    "[session] user=%s already re-authenticated (generation %s -> %s); skipping login",
+                    self.username,
+                    observed_generation,
+                    self.generation,
+                )
+                return False
+
+            if verify and self._authenticated and self.auth_ctrl.validate_session():
+                logger.info(
+                    "[session] user=%s session still valid; skipping login",
+                    self.username,
+                )
+                return False
+
+            self._login()
+            return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._authenticated = False
+
+    def _login(self, clear_cookies: bool = False) -> None:
+        self._authenticated = False
+        session = getattr(self.auth_ctrl.http_client, "session", None)
+        # With the login fast path, re-logins keep the jar so the login page can be skipped.
+        keep_cookies = not clear_cookies and os.getenv("LOGIN_FAST_PATH", "0") == "1"
+        if not keep_cookies and session is not None:
+            try:
+                session.cookies.clear()
+            except Exception:
+                pass
+
+        self.login_count += 1
+        logger.info("[session] user=%s login #%s", self.username, self.login_count)
+        self.auth_ctrl.login(self.username, self._password)
+        self._authenticated = True
+        self.generation += 1
+
+
+class SessionManager:
+    """Owns one ``AccountSession`` per account.
+
+    With a ``session_pool.SessionPool`` every account gets its own pooled,
+    already logged-in controller; the active account's session stays checked
+    out of the pool until the next account (or ``close``) takes over.
+    """
+
+    def __init__(self, auth_factory: Optional[Callable[[], auth.AuthController]] = None, pool=None):
+        self._auth_factory = auth_factory or auth.AuthController
+        self._pool = pool
+        self._sessions: Dict[str, AccountSession] = {}
+        self._active: Optional[AccountSession] = None
+        self._lock = threading.Lock()
+
+    def session(self, username: str, password: str) -> AccountSession:
+        if self._pool is not None:
+            return self._pooled_session(username, password)
+
+        with self._lock:
+            session = self._sessions.get(username)
+            if session is None:
+                session = AccountSession(username, password, self._auth_factory())
+                self._sessions[username] = session
+
+            previous = self._active
+            if (
+                previous is not None
+                and previous is not session
+                and previous.auth_ctrl.http_client is session.auth_ctrl.http_client
+            ):
+                # Accounts sharing one cookie jar log each other out.
+                previous.invalidate()
+            self._active = session
+            return session
+
+    def _pooled_session(self, username: str, password: str) -> AccountSession:
+        previous = self._active
+        if previous is not None and previous.username == username:
+            return previous
+        self._active = None
+        if previous is not None:
+            self._pool.release(previous.username)
+
+        auth_ctrl = self._pool.acquire(username, password)
+        with self._lock:
+            session = self._sessions.get(username)
+            if session is None or session.auth_ctrl is not auth_ctrl:
+                # Pooled controllers come back logged in; an expired one is a new controller.
+                session = AccountSession(username, password, auth_ctrl, authenticated=True)
+                self._sessions[username] = session
+            self._active = session
+            return session
+
+    def close(self) -> None:
+        if self._pool is None:
+            return
+        active, self._active = self._active, None
+        if active is not None:
+            self._pool.release(active.username)
+        self._pool.close()
+
+    def login_counts(self) -> Dict[str, int]:
+        return {username: session.login_count for username, session in self._sessions.items()}
+
+    def log_summary(self) -> None:
+        counts = self.login_counts()
+        logger.info(
+            "[session] Login summary total=%s per_account=%s",
+            sum(counts.values()),
+            counts,
+        )
+        if self._pool is not None:
+            logger.info("[session] Pool summary %s", self._pool.stats())
@@ -0,0 +1,255 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import requests
+
+import auth
+import common
+from HttpClient import HttpClient
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+# Rough footprint of one logged-in session: requests.Session, its adapters and
+# a few pooled TLS connections. Cookies are added on top.
+SESSION_BASE_BYTES = 256 * 1024
+
+
+class PooledSession:
+    __slots__ = ("username", "auth_ctrl", "created_at", "last_used", "last_touched", "checkout")
+
+    def __init__(self, username: str, auth_ctrl: auth.AuthController):
+        now = time.monotonic()
+        self.username = username
+        self.auth_ctrl = auth_ctrl
+        self.created_at = now
+        self.last_used = now
+        self.last_touched = now
+        # Held while a caller or the heartbeat uses the session.
+        self.checkout = threading.Lock()
+
+    def estimated_bytes(self) -> int:
+        size = SESSION_BASE_BYTES
+        for cookie in self.auth_ctrl.http_client.session.cookies:
+            size += sys.getsizeof(cookie.name) + sys.getsizeof(cookie.value or "")
+        return size
+
+    def close(self) -> None:
+        try:
+            self.auth_ctrl.http_client.session.close()
+        except Exception:
+            pass
+
+
+class SessionPool:
+    """Bounded LRU pool of logged-in ``AuthController`` sessions.
+
+    Every session owns its own ``HttpClient`` so accounts do not share a
+    cookie jar. ``acquire`` checks a session out until ``release``; a
+    background heartbeat keeps the idle ones alive with
+    ``AuthController.keepalive`` and drops the ones the server has expired,
+    and eviction only ever closes idle sessions.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        memory_budget: Optional[int] = None,
+        keepalive_interval: Optional[float] = None,
+        auth_factory: Optional[Callable[[], auth.AuthController]] = None,
+    ):
+        self.capacity = capacity or int(os.getenv("SESSION_POOL_SIZE", "8"))
+        self.memory_budget = memory_budget or int(os.getenv("SESSION_POOL_MEMORY_BUDGET", str(16 * 1024 * 1024)))
+        self.keepalive_interval = keepalive_interval or float(os.getenv("SESSION_KEEPALIVE_INTERVAL", "600"))
+        self._auth_factory = auth_factory or (lambda: auth.AuthController(http_client=HttpClient()))
+        self._sessions: "OrderedDict[str, PooledSession]" = OrderedDict()
+        self._login_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def acquire(self, username: str, password: str) -> auth.AuthController:
+        """Check out the account's session, logging in on a miss."""
+        with self._lock:
+            login_lock = self._login_locks.setdefault(username, threading.Lock())
+
+        with login_lock:
+            pooled = self._check_out(username)
+            if pooled is not None:
+                return pooled.auth_ctrl
+            return self._login(username, password, check_out=True).auth_ctrl
+
+    def release(self, username: str) -> None:
+        with self._lock:
+            pooled = self._sessions.get(username)
+            if pooled is None or not pooled.checkout.locked():
+                return
+            # The caller's requests kept the session alive.
+            pooled.last_used = pooled.last_touched = time.monotonic()
+            pooled.checkout.release()
+
+    def warm(self, accounts) -> threading.Thread:
+        """Log ``(username, password)`` accounts in ahead of use, in a daemon thread."""
+        accounts = list(accounts)[: self.capacity]
+
+        def _run():
+            for username, password in accounts:
+                with self._lock:
+                    login_lock = self._login_locks.setdefault(username, threading.Lock())
+                # Never wait on an account the caller is logging in or buying with;
+                # later accounts would go unwarmed meanwhile.
+                if not login_lock.acquire(blocking=False):
+                    continue
+                try:
+                    with self._lock:
+                        if username in self._sessions:
+                            continue
+                    self._login(username, password, check_out=False)
+                except Exception as exc:
+                    # The caller's own acquire retries the login and reports it.
+                    logger.warning("[session_pool] warm-up login failed user=%s error=%s", username, exc)
+                finally:
+                    login_lock.release()
+
+        thread = threading.Thread(target=_run, name="session-pool-warm", daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self, username: str) -> None:
+        with self._lock:
+            pooled = self._sessions.pop(username, None)
+        if pooled is not None:
+            pooled.close()
+
+    def memory_usage(self) -> int:
+        with self._lock:
+            return sum(pooled.estimated_bytes() for pooled in self._sessions.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._sessions),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "memory_bytes": sum(pooled.estimated_bytes() for pooled in self._sessions.values()),
+                "memory_budget": self.memory_budget,
+            }
+
+    def heartbeat_once(self) -> None:
+        """Touch every session that has been idle for ``keepalive_interval``."""
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                pooled for pooled in self._sessions.values()
+                if now - pooled.last_touched >= self.keepalive_interval
+            ]
+
+        for pooled in due:
+            # A checked-out session is in use, which keeps it alive anyway.
+            if not pooled.checkout.acquire(blocking=False):
+                continue
+            try:
+                alive = pooled.auth_ctrl.keepalive()
+            except requests.RequestException as exc:
+                logger.warning("[session_pool] keepalive failed user=%s error=%s", pooled.username, exc)
+                pooled.checkout.release()
+                continue
+
+            if alive:
+                pooled.last_touched = time.monotonic()
+                pooled.checkout.release()
+                continue
+
+            logger.info("[session_pool] session expired user=%s", pooled.username)
+            with self._lock:
+                if self._sessions.get(pooled.username) is pooled:
+                    del self._sessions[pooled.username]
+                    self.expirations += 1
+            pooled.checkout.release()
+            pooled.close()
+
+    def start_heartbeat(self) -> None:
+        if self._heartbeat is not None and self._heartbeat.is_alive():
+            return
+        self._stop.clear()
+        # Wake up often enough that no session waits much longer than the interval.
+        tick = max(self.keepalive_interval / 4, 1.0)
+
+        def _run():
+            while not self._stop.wait(tick):
+                try:
+                    self.heartbeat_once()
+                except Exception as exc:
+                    logger.error("[session_pool] heartbeat error: %s", exc)
+
+        self._heartbeat = threading.Thread(target=_run, name="session-pool-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout=5)
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for pooled in sessions:
+            pooled.close()
+        logger.info("[session_pool] closed stats=%s", self.stats())
+
+    def _login(self, username: str, password: str, check_out: bool) -> PooledSession:
+        # Callers hold the account's login lock.
+        with self._lock:
+            self.misses += 1
+
+        auth_ctrl = self._auth_factory()
+        auth_ctrl.login(username, password)
+        pooled = PooledSession(username, auth_ctrl)
+        if check_out:
+            pooled.checkout.acquire()
+        with self._lock:
+            self._sessions[username] = pooled
+            self._evict_over_limits()
+        return pooled
+
+    def _check_out(self, username: str) -> Optional[PooledSession]:
+        with self._lock:
+            pooled = self._sessions.get(username)
+        if pooled is None:
+            return None
+        # Waits for a heartbeat touching this session, at most one keepalive request.
+        pooled.checkout.acquire()
+        with self._lock:
+            if self._sessions.get(username) is not pooled:
+                # Expired by the heartbeat meanwhile.
+                pooled.checkout.release()
+                return None
+            self._sessions.move_to_end(username)
+            pooled.last_used = time.monotonic()
+            self.hits += 1
+            return pooled
+
+    def _evict_over_limits(self) -> None:
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.capacity
+            or sum(pooled.estimated_bytes() for pooled in self._sessions.values()) > self.memory_budget
+        ):
+            idle = next((name for name, pooled in self._sessions.items() if not pooled.checkout.locked()), None)
+            if idle is None:
+                # Everything is checked out; stay over the limit until something is released.
+                return
+            pooled = self._sessions.pop(idle)
+            self.evictions += 1
+            logger.info("[session_pool] evicted user=%s", idle)
+            pooled.close()
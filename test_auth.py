@@ -67,3 +67,37 @@ def test_action_required_ignores_authenticated_page_with_specific_footer_terms()
     """)
 
     assert controller._is_action_required_response(response) is False
+
+
+def make_controller(cookie_names=()):
+    controller = AuthController.__new__(AuthController)
+    cookies = [SimpleNamespace(name=name, value="x") for name in cookie_names]
+    controller.http_client = SimpleNamespace(session=SimpleNamespace(cookies=cookies))
+    return controller
+
+
+def test_warm_cookies_need_a_session_cookie():
+    assert make_controller(["JSESSIONID"])._has_warm_cookies() is True
+    assert make_controller(["DHJSESSIONID", "WMONID"])._has_warm_cookies() is True
+    assert make_controller(["WMONID"])._has_warm_cookies() is False
+    assert make_controller()._has_warm_cookies() is False
+
+
+def make_login_response(url="https://www.dhlottery.co.kr/common.do?method=main", text="", status_code=200, content_type="text/html"):
+    return SimpleNamespace(url=url, text=text, status_code=status_code, headers={"Content-Type": content_type})
+
+
+def test_login_response_proves_session_only_for_an_authenticated_page():
+    controller = make_controller()
+    authenticated = '<html><body><a href="/userSsl.do?method=logout">로그아웃</a></body></html>'
+
+    assert controller._login_response_proves_session(make_login_response(text=authenticated)) is True
+
+    # A login page, an error status, a JSON body or a page without logout link prove nothing.
+    login_page = make_login_response(url="https://www.dhlottery.co.kr/user.do?method=login", text=authenticated)
+    assert controller._login_response_proves_session(login_page) is False
+    assert controller._login_response_proves_session(make_login_response(text=authenticated, status_code=500)) is False
+    json_body = make_login_response(text='{"result": "ok"}', content_type="application/json")
+    json_body.json = lambda: {"result": "ok"}
+    assert controller._login_response_proves_session(json_body) is False
+    assert controller._login_response_proves_session(make_login_response(text="<html>로그인</html>")) is False
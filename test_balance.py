@@ -0,0 +1,137 @@
+import sys
+from types import ModuleType, SimpleNamespace
+
+common_module = ModuleType("common")
+common_module.setup_logging = lambda: None
+sys.modules.setdefault("common", common_module)
+
+from balance import BalanceTracker, lotto645_purchase_cost, parse_won_amount, win720_purchase_cost
+
+
+def _row(product_code, round_no, order_no):
+    return SimpleNamespace(product_code=product_code, round=round_no, order_no=order_no, barcode=None, raw={})
+
+
+def test_win720_purchase_cost_from_sale_count():
+    assert win720_purchase_cost({"resultCode": "100", "saleCnt": "5"}) == 5000
+    assert win720_purchase_cost({"resultCode": "ERROR", "saleCnt": "5"}) == 0
+
+
+def test_lotto645_purchase_cost_counts_games_of_successful_purchase():
+    success = {"result": {"resultMsg": "SUCCESS", "arrGameChoiceNum": ["A|01|02|03|04|05|063", "B|07|08|09|10|11|123"]}}
+
+    assert lotto645_purchase_cost(success) == 2000
+    assert lotto645_purchase_cost({"result": {"resultMsg": "NETWORK_ERROR: timeout"}}) == 0
+
+
+def test_parse_won_amount_ignores_error_text_with_digits():
+    assert parse_won_amount("37,000원") == 37000
+    assert parse_won_amount("조회 실패: HTTP 500") is None
+
+
+def test_tracker_debits_locally_and_flags_mismatch_on_reconcile():
+    tracker = BalanceTracker("tester")
+    tracker.open("37,000원")
+    lotto = {"result": {"resultMsg": "SUCCESS", "nBuyAmount": "3000"}}
+    win720 = {"resultCode": "100", "saleCnt": "5"}
+    tracker.record(lotto, lotto645_purchase_cost(lotto))
+    tracker.record(win720, win720_purchase_cost(win720))
+
+    assert tracker.reconcile("29,000원") is None
+    assert lotto["balance"] == "34,000원"
+    assert win720["balance"] == "29,000원"
+
+    assert tracker.reconcile("34,000원") == 5000
+    assert win720["balance"] == "34,000원 (예상 29,000원, 불일치)"
+
+
+def test_tracker_estimates_when_closing_fetch_fails():
+    tracker = BalanceTracker("tester")
+    tracker.open("37,000원")
+    win720 = {"resultCode": "100", "saleCnt": "5"}
+    tracker.record(win720, win720_purchase_cost(win720))
+
+    tracker.reconcile("확인 불가")
+
+    assert win720["balance"] == "32,000원 (추정)"
+
+
+def test_plan_funds_manual_then_auto_then_win720_from_one_balance():
+    from balance import plan_purchases
+
+    full = plan_purchases(20000, auto_count=3, manual_count=2)
+    assert (full.auto_count, full.manual_count, full.win720_orders, full.skipped) == (3, 2, 1, [])
+    assert full.cost == 10000
+
+    short = plan_purchases(7000, auto_count=3, manual_count=2)
+    assert (short.auto_count, short.manual_count, short.win720_orders) == (3, 2, 0)
+    assert [lottery_type for lottery_type, _ in short.skipped] == ["win720"]
+
+    broke = plan_purchases(1500, auto_count=3, manual_count=2)
+    assert (broke.auto_count, broke.manual_count, broke.win720_orders) == (0, 1, 0)
+    assert plan_purchases(500, 3, 2).nothing
+
+    unknown = plan_purchases(None, auto_count=3, manual_count=2)
+    assert (unknown.lotto_count, unknown.win720_orders, unknown.skipped) == (5, 1, [])
+
+
+def test_ledger_confirms_purchases_so_no_closing_balance_is_needed():
+    from balance import confirm_with_ledger
+
+    lotto = {"result": {"resultMsg": "SUCCESS", "buyRound": "1152", "nBuyAmount": "5000"}}
+    win720 = {"resultCode": "100", "saleCnt": "5", "round": "300"}
+    skipped = {"result": {"resultMsg": "SKIPPED: 잔액 부족"}}
+    purchases = [
+        {"lottery_type": "lotto", "response": lotto},
+        {"lottery_type": "lotto", "response": skipped},
+        {"lottery_type": "win720", "response": win720},
+    ]
+    rows = [_row("LO40", 1152, "lo-1"), _row("LP72", 300, "lp-1")]
+
+    assert confirm_with_ledger(purchases, rows, []) is True
+    assert lotto["ledger"] == "원장 확인 1건" and "ledger" not in skipped
+
+    tracker = BalanceTracker("tester")
+    tracker.open("20,000원")
+    tracker.record(lotto, lotto645_purchase_cost(lotto))
+    tracker.record(win720, win720_purchase_cost(win720))
+    assert tracker.reconcile(None, confirmed=True) is None
+    assert (lotto["balance"], win720["balance"]) == ("15,000원", "10,000원")
+
+    assert confirm_with_ledger(purchases, rows[1:], []) is False
+    assert lotto["ledger"] == "원장 미확인 (0/1건)"
+    assert confirm_with_ledger(purchases, rows, None) is False
+
+
+def test_orders_already_in_the_opening_ledger_do_not_confirm_the_run():
+    from balance import confirm_with_ledger
+
+    lotto = {"result": {"resultMsg": "SUCCESS", "buyRound": "1152", "nBuyAmount": "5000"}}
+    earlier = _row("LO40", 1152, "bought-this-morning")
+
+    # Only the morning order is in the ledger: this run's order is still missing.
+    assert confirm_with_ledger([{"lottery_type": "lotto", "response": lotto}], [earlier], [earlier]) is False
+    assert lotto["ledger"] == "원장 미확인 (0/1건)"
+
+    rows = [earlier, _row("LO40", 1152, "this-run")]
+    assert confirm_with_ledger([{"lottery_type": "lotto", "response": lotto}], rows, [earlier]) is True
+
+
+def test_win720_batch_result_is_charged_and_confirmed_per_set():
+    from balance import confirm_with_ledger
+
+    batch = {
+        "resultCode": "ERROR",
+        "resultMsg": "2/3건 주문 완료, 실패 사유: timeout",
+        "round": "300",
+        "orders": [
+            {"resultCode": "100", "saleCnt": 5, "round": "300"},
+            {"resultCode": "100", "saleCnt": 5, "round": "300"},
+            {"resultCode": "ERROR", "resultMsg": "timeout"},
+        ],
+    }
+
+    assert win720_purchase_cost(batch) == 10000
+    rows = [_row("LP72", 300, "lp-1"), _row("LP72", 300, "lp-2")]
+    assert confirm_with_ledger([{"lottery_type": "win720", "response": batch}], rows, []) is True
+    assert batch["ledger"] == "원장 확인 2건"
@@ -26,20 +26,9 @@ sys.modules["notification"].Notification = lambda: SimpleNamespace()
 
 http_client_module = _stub_module("HttpClient")
 http_client_module.HttpClientSingleton = SimpleNamespace(get_instance=lambda: SimpleNamespace())
+http_client_module.HttpClient = lambda: SimpleNamespace()
 
-from controller import _estimate_win720_balance, _sanitize_purchase_results_for_log
-
-
-def test_estimate_win720_balance_from_previous_balance_and_sale_count():
-    response = {"resultCode": "100", "saleCnt": "5"}
-
-    assert _estimate_win720_balance(response, "37,000원") == "32,000원 (추정)"
-
-
-def test_estimate_win720_balance_skips_failed_purchase():
-    response = {"resultCode": "ERROR", "saleCnt": "5"}
-
-    assert _estimate_win720_balance(response, "37,000원") is None
+from controller import _sanitize_purchase_results_for_log
 
 
 def test_sanitize_purchase_results_masks_sensitive_values():
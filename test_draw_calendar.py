@@ -0,0 +1,54 @@
+import datetime
+import sys
+from types import ModuleType
+
+common_module = ModuleType("common")
+common_module.setup_logging = lambda: None
+sys.modules.setdefault("common", common_module)
+
+import draw_calendar
+
+
+def _kst(text: str) -> datetime.datetime:
+    return datetime.datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=draw_calendar.KST)
+
+
+def test_current_round_matches_known_draws_and_rolls_over_at_sales_close():
+    calendar = draw_calendar.DrawCalendar()
+
+    lotto = calendar.current_round("lotto645", _kst("2024-12-28 19:59"))
+    assert (lotto.round, lotto.draw_date, lotto.payout_deadline) == (
+        1152,
+        datetime.date(2024, 12, 28),
+        datetime.date(2025, 12, 29),
+    )
+    assert calendar.current_round("lotto645", _kst("2024-12-28 20:00")).round == 1153
+
+    assert calendar.current_round("win720", _kst("2024-12-26 12:00")).round == 243
+    assert calendar.current_round("win720", _kst("2024-12-27 09:00")).round == 244
+
+
+def test_overrides_shift_rounds_and_payout_deadlines():
+    calendar = draw_calendar.DrawCalendar(
+        holidays=[datetime.date(2025, 12, 29)],
+        skipped_draws={"win720": [datetime.date(2025, 1, 2)]},
+    )
+
+    assert calendar.current_round("lotto645", _kst("2024-12-28 10:00")).payout_deadline == datetime.date(2025, 12, 30)
+    info = calendar.current_round("win720", _kst("2024-12-30 10:00"))
+    assert (info.round, info.draw_date) == (244, datetime.date(2025, 1, 9))
+    assert calendar.round_info("win720", 244).draw_date == datetime.date(2025, 1, 9)
+
+
+def test_cross_check_runs_in_background_and_adopts_site_round():
+    calendar = draw_calendar.DrawCalendar(cross_check_interval=3600)
+    now = _kst("2024-12-28 10:00")
+
+    assert calendar.cross_check("lotto645", lambda: 1153, now) is True
+    for thread in list(draw_calendar.threading.enumerate()):
+        if thread.name == "draw-calendar-lotto645":
+            thread.join(timeout=5)
+
+    assert calendar.cross_check("lotto645", lambda: 1153, now) is False
+    info = calendar.current_round("lotto645", now)
+    assert (info.round, info.draw_date) == (1153, datetime.date(2024, 12, 28))
@@ -0,0 +1,65 @@
+import datetime
+import sys
+from types import ModuleType
+
+import pytest
+
+common_module = ModuleType("common")
+common_module.setup_logging = lambda: None
+sys.modules.setdefault("common", common_module)
+
+import draw_store
+
+
+def _lotto_draw(round_no):
+    return draw_store.LottoDraw(
+        round_no,
+        datetime.date(2002, 12, 7) + datetime.timedelta(weeks=round_no - 1),
+        tuple(range(round_no % 30 + 1, round_no % 30 + 7)),
+        45,
+        (2000000000, 0, 0, 0, 0),
+        (7, 0, 0, 0, 0),
+    )
+
+
+def test_records_are_indexed_by_round_and_survive_reopen(tmp_path):
+    path = str(tmp_path / "draws_lotto645.bin")
+    archive = draw_store.DrawArchive("lotto645", path)
+    archive.put(_lotto_draw(1152))
+    archive.close()
+
+    reopened = draw_store.DrawArchive("lotto645", path)
+    assert reopened.get(1152) == _lotto_draw(1152)
+    assert 1151 not in reopened and reopened.get(5000) is None
+    assert bytes(reopened.raw(1152))[0] == draw_store.PRESENT
+    with pytest.raises(IndexError):
+        reopened.raw(reopened.capacity + 1)
+    reopened.close()
+
+    win720 = draw_store.DrawArchive("win720", str(tmp_path / "draws_win720.bin"))
+    draw = draw_store.Win720Draw(243, datetime.date(2024, 12, 26), 3, "012345", "987654")
+    win720.put(draw)
+    assert win720.get(243) == draw
+    win720.close()
+
+
+def test_backfill_resumes_with_the_rounds_still_missing(tmp_path):
+    archive = draw_store.DrawArchive("lotto645", str(tmp_path / "draws.bin"))
+    calls = []
+    failures = [3]
+
+    def flaky(round_no):
+        calls.append(round_no)
+        if round_no in failures:
+            failures.remove(round_no)
+            raise OSError("timeout")
+        return _lotto_draw(round_no)
+
+    assert draw_store.backfill(archive, flaky, 5, batch_size=2) == 4
+    assert archive.missing_rounds(5) == [3]
+
+    calls.clear()
+    assert draw_store.backfill(archive, flaky, 6) == 2
+    assert calls == [3, 6]
+    assert [draw.round for draw in draw_store.iter_draws(archive)] == [1, 2, 3, 4, 5, 6]
+    archive.close()
@@ -0,0 +1,89 @@
+import datetime
+import sys
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+common_module = ModuleType("common")
+common_module.setup_logging = lambda: None
+sys.modules.setdefault("common", common_module)
+
+import ledger
+
+
+class FakeLedgerClient:
+    max_concurrency = 3
+
+    def __init__(self, rows, include_total=True):
+        self.rows = rows
+        self.include_total = include_total
+        self.calls = []
+
+    def get(self, url, params=None, headers=None):
+        self.calls.append(dict(params))
+        rows = [row for row in self.rows if not params["ltGdsCd"] or row["ltGdsCd"] == params["ltGdsCd"]]
+        size = params["recordCountPerPage"]
+        page = rows[(params["pageNum"] - 1) * size:params["pageNum"] * size]
+        data = {"list": page}
+        if self.include_total:
+            data["totalCnt"] = str(len(rows))
+        return SimpleNamespace(json=lambda: {"data": data})
+
+    def map_concurrent(self, func, items):
+        return [(func(item), None) for item in items]
+
+
+def _rows(count, code="LO40"):
+    return [
+        {"ltGdsCd": code, "ltEpsd": str(1150 + index % 3), "ltWnAmt": "5,000" if index == 4 else "0", "ntslOrdrNo": str(index)}
+        for index in range(count)
+    ]
+
+
+def test_reader_pages_until_total_and_yields_typed_entries_in_order():
+    client = FakeLedgerClient(_rows(23))
+    reader = ledger.LedgerReader(client, {}, page_size=5, window_days=30)
+
+    entries = list(reader.iter_entries(datetime.date(2024, 12, 1), datetime.date(2024, 12, 28), ("LO40",)))
+
+    assert [entry.order_no for entry in entries] == [str(index) for index in range(23)]
+    assert [call["pageNum"] for call in client.calls] == [1, 2, 3, 4, 5]
+    assert entries[4].prize == 5000 and entries[4].round == 1151
+
+    latest, items = ledger.latest_round(entries)
+    assert latest == 1152 and len(items) == 7
+
+
+def test_reader_without_total_stops_at_short_page_and_splits_windows():
+    client = FakeLedgerClient(_rows(7), include_total=False)
+    reader = ledger.LedgerReader(client, {}, page_size=5, window_days=10)
+
+    list(reader.iter_entries(datetime.date(2024, 12, 9), datetime.date(2024, 12, 28)))
+
+    windows = sorted({(call["srchStrDt"], call["srchEndDt"]) for call in client.calls})
+    assert windows == [("20241209", "20241218"), ("20241219", "20241228")]
+    # Page 1, then one batch of three pages; the short page 2 ends each window.
+    assert [call["pageNum"] for call in client.calls] == [1, 2, 3, 4, 1, 2, 3, 4]
+
+
+def test_several_product_codes_are_read_in_one_pass():
+    client = FakeLedgerClient(_rows(3, "LO40") + _rows(2, "LP72") + _rows(1, "SP01"))
+    reader = ledger.LedgerReader(client, {}, page_size=10)
+
+    entries = list(reader.iter_entries(datetime.date(2024, 12, 21), datetime.date(2024, 12, 28), ("LO40", "LP72")))
+
+    assert [entry.product_code for entry in entries] == ["LO40"] * 3 + ["LP72"] * 2
+    assert [call["ltGdsCd"] for call in client.calls] == [""]
+
+
+def test_reader_raises_on_a_page_that_is_not_json():
+    class LoginPageClient(FakeLedgerClient):
+        def get(self, url, params=None, headers=None):
+            if params["pageNum"] == 2:
+                return SimpleNamespace(json=lambda: (_ for _ in ()).throw(ValueError("Expecting value")))
+            return super().get(url, params, headers)
+
+    reader = ledger.LedgerReader(LoginPageClient(_rows(12)), {}, page_size=5, window_days=30)
+
+    with pytest.raises(ledger.LedgerUnreadable):
+        list(reader.iter_entries(datetime.date(2024, 12, 1), datetime.date(2024, 12, 28), ("LO40",)))
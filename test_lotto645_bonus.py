@@ -1,3 +1,4 @@
+import json
 import sys
 from types import ModuleType, SimpleNamespace
 
@@ -7,6 +8,7 @@ sys.modules.setdefault("requests", requests_module)
 
 bs4_module = ModuleType("bs4")
 bs4_module.BeautifulSoup = lambda *args, **kwargs: None
+bs4_module.SoupStrainer = lambda *args, **kwargs: None
 sys.modules.setdefault("bs4", bs4_module)
 
 auth_module = ModuleType("auth")
@@ -18,6 +20,8 @@ common_module = ModuleType("common")
 common_module.SLOTS = ["A", "B", "C", "D", "E"]
 common_module.setup_logging = lambda: None
 sys.modules.setdefault("common", common_module)
+if not hasattr(sys.modules["common"], "SLOTS"):
+    sys.modules["common"].SLOTS = common_module.SLOTS
 
 http_client_module = ModuleType("HttpClient")
 http_client_module.HttpClientSingleton = SimpleNamespace(get_instance=lambda: SimpleNamespace())
@@ -75,3 +79,102 @@ def test_lotto_winning_message_formats_bonus_separately_from_main_matches():
 
     assert "<b>[01]</b><b>[02]</b>[03]" in sent_messages[0]
     assert "보너스 <b>03</b>" not in sent_messages[0]
+
+
+def test_requirement_fields_are_extracted_without_building_a_soup():
+    lotto = Lotto645.__new__(Lotto645)
+    html = (
+        "<form><input type='hidden' data-id='curRound' value='0'>"
+        '<input type="hidden" id="curRound" value="1150">'
+        "<input name=ROUND_DRAW_DATE value=2024-12-28 type=hidden></form>"
+        "<script>var WAMT_PAY_TLMT_END_DT = '2025-12-29';</script>"
+    )
+
+    assert lotto._extract_requirement_fields(html) == {
+        "curRound": "1150",
+        "ROUND_DRAW_DATE": "2024-12-28",
+        "WAMT_PAY_TLMT_END_DT": "2025-12-29",
+    }
+
+
+def test_mixed_purchase_builds_one_payload_with_auto_then_manual_slots():
+    lotto = Lotto645.__new__(Lotto645)
+
+    body = lotto._generate_body_for_mixed(3, ["10.0.0.1", "2024-12-28", "2025-12-29", "1152"], [["7", "1", "2", "3", "4", "5"]])
+
+    assert (body["nBuyAmount"], body["gameCnt"], body["round"]) == ("3000", 3, "1152")
+    assert json.loads(body["param"]) == [
+        {"genType": "0", "arrGameChoiceNum": None, "alpabet": "A"},
+        {"genType": "0", "arrGameChoiceNum": None, "alpabet": "B"},
+        {"genType": "1", "arrGameChoiceNum": "01,02,03,04,05,07", "alpabet": "C"},
+    ]
+
+
+def test_method_path_is_detected_once_per_response_shape(monkeypatch):
+    lotto = Lotto645.__new__(Lotto645)
+    lotto645_module = sys.modules["lotto645"]
+    monkeypatch.setattr(lotto645_module, "_METHOD_PATHS", lotto645_module.MethodPathCache())
+    ticket = {"round": 1152, "param": json.dumps([{"genType": "0"}, {"genType": "1"}, {"genType": "2"}])}
+    games = [{"num": [1, 2, 3, 4, 5, 6]} for _ in range(3)]
+
+    methods = [lotto._determine_method(game, ticket, index) for index, game in enumerate(games)]
+
+    assert methods == ["자동", "수동", "반자동"]
+    assert lotto645_module._METHOD_PATHS.lookup(lotto645_module._response_shape(games[0], ticket)) == (
+        "ticket_games",
+        "param",
+        None,
+    )
+    assert (lotto645_module._METHOD_PATHS.hits, lotto645_module._METHOD_PATHS.misses) == (2, 1)
+
+
+def test_method_path_found_after_an_empty_key_is_not_reused(monkeypatch):
+    lotto = Lotto645.__new__(Lotto645)
+    lotto645_module = sys.modules["lotto645"]
+    monkeypatch.setattr(lotto645_module, "_METHOD_PATHS", lotto645_module.MethodPathCache())
+    games = [{"genType": "", "status": "AUTO"}, {"genType": "1", "status": "AUTO"}]
+
+    methods = [lotto._determine_method(game, {}, index) for index, game in enumerate(games)]
+
+    assert methods == ["자동", "수동"]
+    assert lotto645_module._METHOD_PATHS.lookup(lotto645_module._response_shape(games[0], {})) == ("game", "genType")
+
+
+def test_batch_purchase_splits_games_into_orders_and_aggregates(tmp_path, monkeypatch):
+    import lotto645
+    import lotto_ticket
+    import purchase_journal
+
+    class FakeAuth(lotto645.auth.AuthController):
+        def __init__(self):
+            pass
+
+        def ensure_session(self):
+            pass
+
+    lotto = Lotto645.__new__(Lotto645)
+    lotto.http_client = SimpleNamespace(map_concurrent=purchase_journal._map_serial)
+    lotto._generate_req_headers = lambda auth_ctrl: {}
+    lotto._getRequirements = lambda headers: ["10.0.0.1", "2024-12-28", "2025-12-29", "1152"]
+    sent = []
+
+    def fake_try_buying(headers, data, attempts=5):
+        sent.append(json.loads(data["param"]))
+        if len(sent) == 2:
+            raise ConnectionError("read timeout")
+        games = [f"{game['alpabet']}|{(game['arrGameChoiceNum'] or '01,02,03,04,05,06').replace(',', '|')}3" for game in sent[-1]]
+        return {"result": {"resultMsg": "SUCCESS", "arrGameChoiceNum": games}}
+
+    lotto._try_buying = fake_try_buying
+    monkeypatch.setattr(purchase_journal, "ledger_finder", lambda *args: lambda: [])
+
+    manual = [lotto_ticket.LottoTicket.parse(f"{start},{start + 1},{start + 2},{start + 3},{start + 4},{start + 5}") for start in (1, 11, 21, 31)]
+    body = lotto.buy_lotto645_batch(
+        FakeAuth(), [None] * 3 + manual, journal=purchase_journal.PurchaseJournal(str(tmp_path / "journal.json"))
+    )
+
+    # Second order timed out, was not in the ledger and was resent once.
+    assert [len(order) for order in sent] == [5, 2, 2]
+    assert [game["genType"] for game in sent[0]] == ["0", "0", "0", "1", "1"]
+    assert body["result"]["resultMsg"] == "SUCCESS" and body["result"]["nBuyAmount"] == "7000"
+    assert len(body["result"]["arrGameChoiceNum"]) == 7 and len(body["orders"]) == 2
@@ -0,0 +1,42 @@
+import pickle
+import sys
+from types import ModuleType
+
+import pytest
+
+common_module = ModuleType("common")
+common_module.setup_logging = lambda: None
+sys.modules.setdefault("common", common_module)
+
+import lotto_ticket
+import rank_eval
+
+
+def test_parse_validates_once_and_serializes_to_choice_format():
+    line = lotto_ticket.LottoTicket.parse(" 41, 5,1 ,29,23,9")
+
+    assert line.choice == "01,05,09,23,29,41"
+    assert line.mask == rank_eval.encode([1, 5, 9, 23, 29, 41])
+    assert lotto_ticket.LottoTicket.parse(line.choice) == line
+    assert list(line) == ["01", "05", "09", "23", "29", "41"] and "5" in line and 6 not in line
+    assert len({line, lotto_ticket.LottoTicket(line.mask)}) == 1
+    assert pickle.loads(pickle.dumps(line)) == line
+    with pytest.raises(AttributeError):
+        line.mask = 0
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["1,2,3,4,5", "1,2,3,4,5,46", "1,2,3,4,5,5", "1,2,3,4,5,x"],
+)
+def test_parse_rejects_invalid_lines(text):
+    with pytest.raises(ValueError):
+        lotto_ticket.LottoTicket.parse(text)
+
+
+def test_ticket_ranks_against_draw():
+    draw = rank_eval.encode_draw([1, 2, 3, 4, 5, 6], 7)
+
+    assert lotto_ticket.LottoTicket.parse("1,2,3,4,5,7").rank(draw) == 2
+    assert lotto_ticket.mask_of(["01", "02"]) == 0b11
+    assert lotto_ticket.number_bit("07") == 1 << 6 and lotto_ticket.number_bit("?") == 0
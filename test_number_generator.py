@@ -0,0 +1,56 @@
+import sys
+from types import ModuleType
+
+common_module = ModuleType("common")
+common_module.setup_logging = lambda: None
+sys.modules.setdefault("common", common_module)
+
+import number_generator
+import rank_eval
+
+
+def test_generated_sets_respect_constraints_and_are_reproducible():
+    options = dict(
+        seed=7,
+        exclude=[1, 2, 3],
+        require=[17],
+        sum_range=(100, 160),
+        odd_range=(2, 4),
+        max_shared=2,
+    )
+
+    sets = number_generator.NumberGenerator(**options).generate(5)
+
+    assert sets == number_generator.NumberGenerator(**options).generate(5)
+    masks = [rank_eval.encode(numbers) for numbers in sets]
+    for numbers in sets:
+        values = [int(number) for number in numbers]
+        assert len(values) == 6 and values == sorted(values) and "17" in numbers
+        assert not {1, 2, 3} & set(values)
+        assert 100 <= sum(values) <= 160
+        assert 2 <= sum(value % 2 for value in values) <= 4
+    for index, mask in enumerate(masks):
+        assert all(bin(mask & other).count("1") <= 2 for other in masks[:index])
+
+
+def test_past_winning_sets_are_never_repeated():
+    only_left = [1, 2, 3, 4, 5, 6, 7]
+    exclude = [number for number in range(1, 46) if number not in only_left]
+    past = {rank_eval.encode(combo) for combo in ([1, 2, 3, 4, 5, 6], [1, 2, 3, 4, 5, 7], [1, 2, 3, 4, 6, 7])}
+
+    generator = number_generator.NumberGenerator(seed=1, exclude=exclude, past_draws=past, max_shared=6)
+    generated = {rank_eval.encode(numbers) for numbers in generator.generate(4)}
+
+    assert len(generated) == 4 and not generated & past
+
+
+def test_from_env_parses_manual_settings(monkeypatch):
+    monkeypatch.setenv("MANUAL_SEED", "3")
+    monkeypatch.setenv("MANUAL_EXCLUDE", "1, 2")
+    monkeypatch.setenv("MANUAL_SUM_RANGE", "90-180")
+    monkeypatch.delenv("MANUAL_ODD_RANGE", raising=False)
+
+    generator = number_generator.from_env()
+
+    assert generator.exclude_mask == rank_eval.encode([1, 2])
+    assert generator.sum_range == (90, 180) and generator.odd_range is None
@@ -0,0 +1,33 @@
+from page_classifier import MarkerMatcher, PageClass, classify_page
+
+
+def test_marker_matcher_reports_contained_and_overlapping_markers():
+    matcher = MarkerMatcher(("로그인", "인증", "로그인 실패", "error"))
+
+    assert matcher.scan("로그인증 오류") == {"로그인", "인증"}
+    assert matcher.scan("로그인 실패: error") == {"로그인", "로그인 실패", "error"}
+    assert matcher.scan("nothing here") == frozenset()
+
+
+def test_classify_page_detects_login_page_and_authenticated_page():
+    login_page = classify_page("https://www.dhlottery.co.kr/mypage/home", "<button>로그인</button>")
+    authenticated = classify_page("https://www.dhlottery.co.kr/mypage/home", "<a>로그아웃</a> 이용약관 본인확인")
+
+    assert login_page.kind == PageClass.LOGIN_PAGE
+    assert authenticated.kind == PageClass.AUTHENTICATED
+    assert authenticated.has_logout is True
+
+
+def test_classify_page_action_required_url_overrides_logout_link():
+    classification = classify_page(
+        "https://www.dhlottery.co.kr/userSsl.do?method=ExpryPswdNoti",
+        "<a>로그아웃</a>",
+    )
+
+    assert classification.kind == PageClass.ACTION_REQUIRED
+
+
+def test_classify_page_flags_failure_keywords_without_logout():
+    assert classify_page("", "Login failed: unauthorized").kind == PageClass.LOGIN_PAGE
+    assert classify_page("", "아이디 또는 비밀번호 오류").kind == PageClass.FAILURE
+    assert classify_page("", "error <a>logout</a>").login_failure is False
@@ -0,0 +1,205 @@
+import sys
+from types import ModuleType
+
+import pytest
+
+common_module = ModuleType("common")
+common_module.setup_logging = lambda: None
+sys.modules.setdefault("common", common_module)
+
+import purchase_journal
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeLedger:
+    def __init__(self, orders=()):
+        self.orders = list(orders)
+        self.reads = 0
+
+    def __call__(self):
+        self.reads += 1
+        return list(self.orders)
+
+
+def _recovered(orders):
+    return {"resultMsg": "SUCCESS", "recovered": orders}
+
+
+def _succeeded(body):
+    return body.get("resultMsg") == "SUCCESS"
+
+
+def _unconfirmed(error):
+    return {"resultMsg": f"UNCONFIRMED: {error}"}
+
+
+def test_timed_out_send_that_reached_the_ledger_is_not_resent(tmp_path):
+    journal = purchase_journal.PurchaseJournal(str(tmp_path / "journal.json"), clock=FakeClock())
+    ledger = FakeLedger(["old-order"])
+    sends = []
+
+    def send(before_retry):
+        sends.append(1)
+        ledger.orders.append("new-order")  # the server completed it, the reply was lost
+        before_retry()
+        sends.append(2)
+        return {"resultMsg": "SUCCESS"}
+
+    entry = journal.begin("user", "LO40", 1152, ["A:auto", "B:auto"])
+    response = journal.run(entry, send, ledger, _recovered, _succeeded)
+
+    assert sends == [1]
+    assert response == {"resultMsg": "SUCCESS", "recovered": ["new-order"]}
+    assert entry.state == purchase_journal.DONE and entry.baseline == ["old-order"]
+
+
+def test_sent_entry_survives_restart_and_is_checked_before_sending(tmp_path):
+    path = str(tmp_path / "journal.json")
+    clock = FakeClock()
+    first = purchase_journal.PurchaseJournal(path, clock=clock, run_id="run-1")
+    ledger = FakeLedger()
+
+    def lost_reply(before_retry):
+        raise ConnectionError("read timeout")
+
+    with pytest.raises(ConnectionError):
+        first.run(first.begin("user", "LP72", 300, ["SA"] * 5), lost_reply, ledger, _recovered, _succeeded)
+
+    # Resuming the crashed run (same run id) finds the unanswered entry.
+    second = purchase_journal.PurchaseJournal(path, clock=clock, run_id="run-1")
+    entry = second.begin("user", "LP72", 300, ["SA"] * 5)
+    assert (entry.state, entry.attempts) == (purchase_journal.SENT, 1)
+
+    # Nothing reached the ledger, so resending is safe and completes the entry.
+    response = second.run(entry, lambda before_retry: {"resultMsg": "SUCCESS"}, ledger, _recovered, _succeeded)
+    assert response == {"resultMsg": "SUCCESS"} and entry.attempts == 2
+    assert second.resolve(second.begin("user", "LP72", 300, ["SA"] * 5), ledger, _recovered) == response
+
+    # A different slot set or account is a different purchase.
+    assert second.begin("user", "LP72", 300, ["SA"] * 4).state == purchase_journal.PENDING
+    assert second.begin("other", "LP72", 300, ["SA"] * 5).state == purchase_journal.PENDING
+
+
+def test_a_new_run_never_replays_and_saved_responses_are_not_returned(tmp_path):
+    path = str(tmp_path / "journal.json")
+    clock = FakeClock()
+    ledger = FakeLedger()
+    first = purchase_journal.PurchaseJournal(path, clock=clock, run_id="run-1")
+    bought = {"resultMsg": "SUCCESS", "arrGameChoiceNum": ["A|01|02|03|04|05|063"]}
+
+    def send(before_retry):
+        ledger.orders.append("order-1")
+        return bought
+
+    first.run(first.begin("user", "LO40", 1152, ["A:auto"]), send, ledger, _recovered, _succeeded)
+
+    # A deliberate second purchase in a new run is bought again.
+    second = purchase_journal.PurchaseJournal(path, clock=clock, run_id="run-2")
+    assert second.begin("user", "LO40", 1152, ["A:auto"]).state == purchase_journal.PENDING
+
+    # A resumed run confirms the saved (redacted) entry from the ledger instead of replaying it.
+    resumed = purchase_journal.PurchaseJournal(path, clock=clock, run_id="run-1")
+    entry = resumed.begin("user", "LO40", 1152, ["A:auto"])
+    assert entry.state == purchase_journal.DONE and entry.response is None
+    assert resumed.resolve(entry, ledger, _recovered) == {"resultMsg": "SUCCESS", "recovered": ["order-1"]}
+
+
+def test_no_baseline_means_nothing_is_sent_or_adopted(tmp_path):
+    journal = purchase_journal.PurchaseJournal(str(tmp_path / "journal.json"), clock=FakeClock())
+    sends = []
+
+    def broken_ledger():
+        raise ConnectionError("ledger down")
+
+    with pytest.raises(purchase_journal.PurchaseUnconfirmed):
+        journal.run(journal.begin("user", "LP72", 300, ["SA"] * 5), sends.append, broken_ledger, _recovered, _succeeded)
+    assert sends == []
+
+    # An earlier order of the round in the ledger is not taken for an unanswered send.
+    entry = journal.begin("user", "LP72", 301, ["SA"] * 5)
+    journal.mark_sent(entry)
+    with pytest.raises(purchase_journal.PurchaseUnconfirmed):
+        journal.resolve(entry, FakeLedger(["bought-on-the-website"]), _recovered)
+
+
+def test_unreadable_ledger_stops_retries_and_old_entries_expire(tmp_path):
+    clock = FakeClock()
+    journal = purchase_journal.PurchaseJournal(str(tmp_path / "journal.json"), replay_window=60, clock=clock)
+    entry = journal.begin("user", "LO40", 1152, ["A:auto"])
+    entry.baseline = []
+    journal.mark_sent(entry)
+
+    def broken_ledger():
+        raise ConnectionError("ledger down")
+
+    with pytest.raises(purchase_journal.PurchaseUnconfirmed):
+        journal.resolve(entry, broken_ledger, _recovered)
+
+    clock.now += 61
+    assert journal.begin("user", "LO40", 1152, ["A:auto"]).state == purchase_journal.PENDING
+
+
+def test_batch_settles_unanswered_orders_against_ledger_counts(tmp_path):
+    journal = purchase_journal.PurchaseJournal(str(tmp_path / "journal.json"), clock=FakeClock())
+    ledger = FakeLedger(["old"])
+    entries = [journal.begin("user", "LO40", 1152, [f"{index}/A:auto"]) for index in range(3)]
+
+    def send(index):
+        ledger.orders.append(f"order-{index}")
+        if index:
+            raise ConnectionError("read timeout")
+        return {"resultMsg": "SUCCESS"}
+
+    # Both unanswered orders show up in the ledger, so neither is resent.
+    responses = journal.run_batch(entries, send, ledger, _recovered, _succeeded, _unconfirmed)
+    assert responses[0] == {"resultMsg": "SUCCESS"}
+    assert responses[1]["recovered"] == responses[2]["recovered"] == ["order-0", "order-1", "order-2"]
+
+    partial = [journal.begin("user", "LO40", 1153, [f"{index}/A:auto"]) for index in range(2)]
+    for entry in partial:
+        entry.baseline = []
+        journal.mark_sent(entry)
+    with pytest.raises(purchase_journal.PurchaseUnconfirmed):
+        journal.run_batch(partial, send, FakeLedger(["only-one"]), _recovered, _succeeded, _unconfirmed)
+
+
+def test_batch_counts_only_orders_answered_after_the_shared_baseline(tmp_path):
+    journal = purchase_journal.PurchaseJournal(str(tmp_path / "journal.json"), clock=FakeClock())
+    entries = [journal.begin("user", "LO40", 1152, [f"{index}/A:auto"]) for index in range(2)]
+    # Order 0 completed in an earlier attempt, before order 1's baseline was taken.
+    entries[0].baseline = ["x"]
+    journal.complete(entries[0], {"resultMsg": "SUCCESS"})
+    entries[1].baseline = ["x", "order-0"]
+    journal.mark_sent(entries[1])
+    sends = []
+
+    responses = journal.run_batch(
+        entries, sends.append, FakeLedger(["x", "order-0", "order-1"]), _recovered, _succeeded, _unconfirmed
+    )
+
+    assert sends == [] and responses[1]["recovered"] == ["order-1"]
+
+
+def test_batch_reports_bought_orders_next_to_unconfirmed_ones(tmp_path):
+    journal = purchase_journal.PurchaseJournal(str(tmp_path / "journal.json"), clock=FakeClock())
+    entries = [journal.begin("user", "LO40", 1152, [f"{index}/A:auto"]) for index in range(2)]
+    ledger = FakeLedger(["old"])
+
+    def send(index):
+        if index:
+            ledger.orders = None  # the ledger goes down with the second order unanswered
+            raise ConnectionError("read timeout")
+        return {"resultMsg": "SUCCESS"}
+
+    responses = journal.run_batch(entries, send, ledger, _recovered, _succeeded, _unconfirmed)
+
+    assert responses[0] == {"resultMsg": "SUCCESS"}
+    assert responses[1]["resultMsg"].startswith("UNCONFIRMED")
+    assert entries[1].state == purchase_journal.SENT
@@ -0,0 +1,39 @@
+import random
+
+import rank_eval
+
+
+def _set_rank(ticket, main, bonus):
+    matches = len(set(ticket) & set(main))
+    if matches == 6:
+        return 1
+    if matches == 5:
+        return 2 if bonus in ticket else 3
+    return {4: 4, 3: 5}.get(matches, 0)
+
+
+def test_rank_matrix_matches_set_based_ranks():
+    rng = random.Random(645)
+    tickets = [rng.sample(range(1, 46), 6) for _ in range(300)]
+    draws = [rng.sample(range(1, 46), 7) for _ in range(20)]
+    # Make sure the rare ranks show up.
+    tickets += [draws[0][:6], draws[1][:5] + [draws[1][6]], draws[2][:5] + [45 if 45 not in draws[2] else 44]]
+
+    ranks = rank_eval.rank_matrix(
+        [rank_eval.encode(ticket) for ticket in tickets],
+        [rank_eval.encode_draw(draw[:6], draw[6]) for draw in draws],
+        batch_pairs=64,
+    )
+
+    for i, ticket in enumerate(tickets):
+        for j, draw in enumerate(draws):
+            assert ranks[i][j] == _set_rank(ticket, draw[:6], draw[6])
+    assert (ranks[-3][0], ranks[-2][1], ranks[-1][2]) == (1, 2, 3)
+
+
+def test_encode_ignores_invalid_values_and_counts_ranks_per_draw():
+    assert rank_eval.encode(["01", " 2", 45, "x", 0, 46, None]) == (1 << 0) | (1 << 1) | (1 << 44)
+
+    draw = rank_eval.encode_draw(["01", "02", "03", "04", "05", "06"], "07")
+    tickets = [rank_eval.encode(numbers) for numbers in ([1, 2, 3, 4, 5, 6], [1, 2, 3, 4, 5, 7], [1, 2, 3, 40, 41, 42])]
+    assert list(rank_eval.rank_counts(tickets, [draw])[0]) == [0, 1, 1, 0, 0, 1]
@@ -0,0 +1,40 @@
+import threading
+import time
+
+import rate_limit
+
+
+def test_map_ordered_keeps_input_order_and_isolates_errors():
+    def fetch(item):
+        time.sleep(0.01 * (5 - item))
+        if item == 2:
+            raise ValueError("bad ticket")
+        return item * 10
+
+    results = rate_limit.map_ordered(fetch, range(5), max_workers=4)
+
+    assert [result for result, _ in results] == [0, 10, None, 30, 40]
+    assert [type(error) for _, error in results] == [type(None)] * 2 + [ValueError] + [type(None)] * 2
+
+
+def test_host_limiter_caps_in_flight_requests_and_spaces_starts():
+    limiter = rate_limit.HostRateLimiter(min_interval=0.01, max_concurrency=2)
+    lock = threading.Lock()
+    in_flight = [0, 0]
+    starts = []
+
+    def fetch(_):
+        with limiter.limit("https://www.dhlottery.co.kr/mypage/lotto645TicketDetail.do"):
+            with lock:
+                starts.append(time.monotonic())
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+
+    rate_limit.map_ordered(fetch, range(6), max_workers=6)
+
+    assert in_flight[1] == 2
+    starts.sort()
+    assert all(later - earlier >= 0.009 for earlier, later in zip(starts, starts[1:]))
@@ -0,0 +1,41 @@
+import logging
+
+from redaction import Deferred, Redacted, redact_structure, redact_text
+
+
+def test_redacted_streams_the_same_text_as_the_redacted_copy():
+    purchases = [{
+        "response": {
+            "result": {
+                "barCode6": "65395",
+                "arrGameChoiceNum": ["A|01|05|09|23|29|413"],
+                "buyRound": "1150",
+            },
+            "saleTicket": "",
+            "items": (1, "two"),
+        }
+    }]
+
+    assert str(Redacted(purchases)) == str(redact_structure(purchases))
+    assert "65395" not in str(Redacted(purchases))
+
+
+def test_redact_text_masks_credentials_and_long_hex():
+    text = "userId=alice&userPswdEncn=" + "ab" * 40 + "  {'password': 'pw'}"
+
+    redacted = redact_text(text)
+
+    assert "alice" not in redacted
+    assert "abab" not in redacted
+    assert "'pw'" not in redacted
+    assert "  " not in redacted
+
+
+def test_deferred_arguments_are_not_rendered_when_level_is_disabled():
+    calls = []
+    logger = logging.getLogger("test_redaction.disabled")
+    logger.setLevel(logging.WARNING)
+
+    logger.info("summary=%s", Deferred(lambda: calls.append("rendered")))
+
+    assert calls == []
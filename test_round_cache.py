@@ -0,0 +1,37 @@
+import datetime
+import sys
+from types import ModuleType
+
+common_module = ModuleType("common")
+common_module.setup_logging = lambda: None
+sys.modules.setdefault("common", common_module)
+
+import draw_calendar
+import round_cache
+
+
+def _timestamp(text: str) -> float:
+    return datetime.datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=draw_calendar.KST).timestamp()
+
+
+def test_cached_round_expires_when_sales_close_on_draw_date():
+    now = [_timestamp("2024-12-28 10:00")]
+    cache = round_cache.RoundMetadataCache(share_ready_ip=False, ttl=86400, clock=lambda: now[0])
+    cache.store("1152", "2024-12-28", "2025-12-29", ready_ip="10.0.0.1")
+
+    entry = cache.current()
+    assert (entry.round, entry.draw_date, entry.tlmt_date) == ("1152", "2024-12-28", "2025-12-29")
+    assert entry.ready_ip is None
+
+    now[0] = _timestamp("2024-12-28 20:00")
+    assert cache.current() is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ready_ip_is_kept_only_when_sharing_is_enabled():
+    cache = round_cache.RoundMetadataCache(share_ready_ip=True, clock=lambda: _timestamp("2024-12-27 09:00"))
+    cache.store("1152", "2024-12-28", "2025-12-29", ready_ip="10.0.0.1")
+    cache.store("1151", "2024-12-21", "2025-12-22", ready_ip="10.0.0.2")
+
+    # 1151 closed a week earlier, so only the round on sale is served.
+    assert cache.current().ready_ip == "10.0.0.1"
@@ -0,0 +1,110 @@
+import sys
+from types import ModuleType, SimpleNamespace
+
+
+def _stub_module(name):
+    module = ModuleType(name)
+    sys.modules.setdefault(name, module)
+    return sys.modules[name]
+
+
+auth_module = _stub_module("auth")
+if not hasattr(auth_module, "AuthController"):
+    auth_module.AuthController = object
+common_module = _stub_module("common")
+if not hasattr(common_module, "setup_logging"):
+    common_module.setup_logging = lambda: None
+
+from session_manager import SessionManager
+
+
+class FakeAuthController:
+    def __init__(self, http_client=None, valid=True):
+        self.http_client = http_client or SimpleNamespace(session=SimpleNamespace(cookies=SimpleNamespace(clear=lambda: None)))
+        self.valid = valid
+        self.logins = []
+
+    def login(self, username, password):
+        self.logins.append(username)
+
+    def validate_session(self):
+        return self.valid
+
+
+def test_reauthenticate_skips_login_when_another_caller_already_logged_in():
+    manager = SessionManager(auth_factory=FakeAuthController)
+    session = manager.session("user", "pw")
+    session.ensure_logged_in()
+
+    observed = session.generation
+    assert session.reauthenticate(observed, verify=False) is True
+    assert session.reauthenticate(observed, verify=False) is False
+    assert manager.login_counts() == {"user": 2}
+
+
+def test_reauthenticate_keeps_session_that_still_validates():
+    manager = SessionManager(auth_factory=FakeAuthController)
+    session = manager.session("user", "pw")
+    session.ensure_logged_in()
+
+    assert session.reauthenticate(verify=True) is False
+    session.auth_ctrl.valid = False
+    assert session.reauthenticate(verify=True) is True
+    assert session.login_count == 2
+
+
+def test_switching_accounts_on_shared_client_invalidates_previous_login():
+    shared_client = SimpleNamespace(session=SimpleNamespace(cookies=SimpleNamespace(clear=lambda: None)))
+    manager = SessionManager(auth_factory=lambda: FakeAuthController(http_client=shared_client))
+
+    first = manager.session("first", "pw")
+    first.ensure_logged_in()
+    manager.session("second", "pw").ensure_logged_in()
+
+    assert first.authenticated is False
+    manager.session("first", "pw").ensure_logged_in()
+    assert manager.login_counts() == {"first": 2, "second": 1}
+
+
+def test_pooled_sessions_are_checked_out_per_account_and_released_on_switch():
+    class FakePool:
+        def __init__(self):
+            self.controllers = {}
+            self.released = []
+            self.closed = False
+
+        def acquire(self, username, password):
+            return self.controllers.setdefault(username, FakeAuthController())
+
+        def release(self, username):
+            self.released.append(username)
+
+        def close(self):
+            self.closed = True
+
+    pool = FakePool()
+    manager = SessionManager(pool=pool)
+
+    first = manager.session("first", "pw")
+    assert first.authenticated and first.ensure_logged_in() is pool.controllers["first"]
+    assert manager.session("first", "pw") is first
+    manager.session("second", "pw")
+    manager.close()
+
+    assert pool.released == ["first", "second"] and pool.closed
+    assert manager.login_counts() == {"first": 0, "second": 0}
+
+
+def test_relogin_clears_cookies_unless_login_fast_path_is_enabled(monkeypatch):
+    clears = []
+    client = SimpleNamespace(session=SimpleNamespace(cookies=SimpleNamespace(clear=lambda: clears.append(1))))
+    session = SessionManager(auth_factory=lambda: FakeAuthController(http_client=client)).session("user", "pw")
+    session.ensure_logged_in()
+
+    monkeypatch.delenv("LOGIN_FAST_PATH", raising=False)
+    session.reauthenticate(verify=False)
+    assert len(clears) == 2
+
+    monkeypatch.setenv("LOGIN_FAST_PATH", "1")
+    session.reauthenticate(verify=False)
+    assert len(clears) == 2
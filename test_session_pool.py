@@ -0,0 +1,112 @@
+import sys
+from types import ModuleType, SimpleNamespace
+
+
+def _stub_module(name):
+    module = ModuleType(name)
+    sys.modules.setdefault(name, module)
+    return sys.modules[name]
+
+
+requests_module = _stub_module("requests")
+if not hasattr(requests_module, "RequestException"):
+    requests_module.RequestException = Exception
+auth_module = _stub_module("auth")
+if not hasattr(auth_module, "AuthController"):
+    auth_module.AuthController = object
+common_module = _stub_module("common")
+if not hasattr(common_module, "setup_logging"):
+    common_module.setup_logging = lambda: None
+http_client_module = _stub_module("HttpClient")
+if not hasattr(http_client_module, "HttpClient"):
+    http_client_module.HttpClient = lambda: SimpleNamespace()
+
+from session_pool import SessionPool
+
+
+class FakeAuthController:
+    def __init__(self, cookie_value=""):
+        cookies = [SimpleNamespace(name="JSESSIONID", value=cookie_value)]
+        self.http_client = SimpleNamespace(session=SimpleNamespace(cookies=cookies, close=lambda: None))
+        self.alive = True
+        self.logins = 0
+
+    def login(self, username, password):
+        self.logins += 1
+
+    def keepalive(self):
+        return self.alive
+
+
+def test_pool_counts_hits_and_evicts_least_recently_used():
+    pool = SessionPool(capacity=2, memory_budget=10 ** 9, keepalive_interval=60, auth_factory=FakeAuthController)
+
+    first = pool.acquire("a", "pw")
+    pool.release("a")
+    pool.acquire("b", "pw")
+    pool.release("b")
+    assert pool.acquire("a", "pw") is first
+    pool.release("a")
+    pool.acquire("c", "pw")
+    pool.release("c")
+
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 3, 1, 2)
+    assert pool.acquire("a", "pw") is first
+    assert pool.stats()["misses"] == 3
+
+
+def test_pool_evicts_to_stay_within_memory_budget():
+    pool = SessionPool(
+        capacity=10,
+        memory_budget=1,
+        keepalive_interval=60,
+        auth_factory=lambda: FakeAuthController("x" * 100),
+    )
+
+    pool.acquire("a", "pw")
+    pool.acquire("b", "pw")
+    # A checked-out session is never evicted.
+    assert pool.stats()["size"] == 2
+
+    pool.release("a")
+    pool.release("b")
+    pool.acquire("c", "pw")
+    assert pool.stats()["size"] == 1
+    assert pool.stats()["evictions"] == 2
+
+
+def test_heartbeat_drops_sessions_the_server_expired():
+    pool = SessionPool(capacity=2, memory_budget=10 ** 9, keepalive_interval=1e-9, auth_factory=FakeAuthController)
+    expired = pool.acquire("a", "pw")
+    pool.release("a")
+    pool.acquire("b", "pw")
+    pool.release("b")
+    expired.alive = False
+
+    pool.heartbeat_once()
+
+    assert pool.stats()["expirations"] == 1
+    assert pool.acquire("a", "pw") is not expired
+
+
+def test_heartbeat_skips_checked_out_sessions():
+    pool = SessionPool(capacity=2, memory_budget=10 ** 9, keepalive_interval=1e-9, auth_factory=FakeAuthController)
+    in_use = pool.acquire("a", "pw")
+    in_use.keepalive = lambda: (_ for _ in ()).throw(AssertionError("touched while checked out"))
+
+    pool.heartbeat_once()
+    pool.release("a")
+
+    assert pool.acquire("a", "pw") is in_use
+
+
+def test_warm_skips_an_account_in_use_and_logs_in_the_rest():
+    pool = SessionPool(capacity=3, memory_budget=10 ** 9, keepalive_interval=60, auth_factory=FakeAuthController)
+    in_use = pool.acquire("a", "pw")
+
+    pool.warm([("a", "pw"), ("b", "pw"), ("c", "pw")]).join(timeout=5)
+
+    assert pool.stats()["size"] == 3 and in_use.logins == 1
+    warmed = pool.acquire("b", "pw")
+    assert warmed.logins == 1 and pool.stats()["hits"] == 1
@@ -0,0 +1,30 @@
+import sys
+from types import ModuleType
+
+common_module = ModuleType("common")
+common_module.setup_logging = lambda: None
+sys.modules.setdefault("common", common_module)
+
+import winning_store
+
+
+def test_round_is_stored_once_and_survives_a_new_store(tmp_path):
+    path = str(tmp_path / "cache" / "winning_numbers.json")
+    store = winning_store.WinningStore(path)
+
+    assert store.put("lotto645", "1152", ["01", "02", "03", "04", "05", "06"], "07") is True
+    assert store.put("lotto645", 1152, ["45", "44", "43", "42", "41", "40"], "39") is False
+
+    reloaded = winning_store.WinningStore(path).get("lotto645", 1152)
+    assert (reloaded.numbers, reloaded.bonus) == (("01", "02", "03", "04", "05", "06"), "07")
+    assert winning_store.WinningStore(path).get("win720", 1152) is None
+
+
+def test_unreadable_store_starts_empty(tmp_path):
+    path = tmp_path / "winning_numbers.json"
+    path.write_text("{not json", encoding="utf-8")
+    store = winning_store.WinningStore(str(path))
+
+    assert store.rounds("lotto645") == ()
+    store.put("lotto645", 1153, ["01", "02", "03", "04", "05", "06"])
+    assert winning_store.WinningStore(str(path)).rounds("lotto645") == (1153,)
@@ -1,14 +1,17 @@
 import json
-import datetime
 import base64
+import functools
 import os
 import time
 import requests
 import re
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import Enum
 from bs4 import BeautifulSoup as BS
 from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
 from Crypto.Cipher import AES
 from Crypto.Protocol.KDF import PBKDF2
 from Crypto.Hash import SHA256
@@ -18,12 +21,65 @@ from HttpClient import HttpClientSingleton
 
 import auth
 import common
+import draw_calendar
+import ledger
+import purchase_journal
 import re
 import logging
 
 common.setup_logging()
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=64)
+def _derive_key(pass_phrase: str, salt: bytes, key_size: int, count: int) -> bytes:
+    """PBKDF2-SHA256 key per (passphrase, salt); responses that echo our salt reuse it."""
+    return PBKDF2(pass_phrase, salt, key_size, count=count, hmac_hash_module=SHA256)
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], step: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Steps repeated by a batch add up.
+        timings[step] = timings.get(step, 0.0) + time.perf_counter() - started
+
+
+def _order_slots(index: int, batch: bool) -> tuple:
+    # connPro.do always buys five auto tickets; every set of a batch has its own journal entry.
+    slots = ("SA",) * 5
+    return slots + (f"batch#{index + 1}",) if batch else slots
+
+
+def _aggregate_results(win720_round: str, bodies: List[dict]) -> dict:
+    """One connPro.do-shaped result for several sets; ``orders`` keeps each response."""
+    succeeded = [body for body in bodies if body.get("resultCode") == "100"]
+    tickets = [str(body.get("saleTicket") or "") for body in succeeded]
+    sale_count = 0
+    for body in succeeded:
+        try:
+            sale_count += int(body.get("saleCnt") or 0)
+        except (TypeError, ValueError):
+            pass
+
+    failed = next((body for body in bodies if body.get("resultCode") != "100"), None)
+    if failed is None:
+        result_code, result_msg = "100", "SUCCESS"
+    else:
+        result_code = str(failed.get("resultCode", "ERROR"))
+        result_msg = f"{len(succeeded)}/{len(bodies)}건 주문 완료, 실패 사유: {failed.get('resultMsg', 'FAILURE')}"
+    return {
+        "resultCode": result_code,
+        "resultMsg": result_msg,
+        "saleCnt": sale_count,
+        "saleTicket": ",".join(ticket for ticket in tickets if ticket),
+        "round": win720_round,
+        "orders": bodies,
+    }
+
+
 class Win720:
 
     keySize = 128
@@ -53,23 +109,125 @@ class Win720:
         "X-Requested-With": "XMLHttpRequest"
     }
 
-    def __init__(self):
-        self.http_client = HttpClientSingleton.get_instance()
+    def __init__(self, http_client=None):
+        self.http_client = http_client or HttpClientSingleton.get_instance()
+        self._salt_key_code = None
+        self._salt = b""
+        self._prepared = {}
+        self.last_timings: Dict[str, float] = {}
 
     def buy_Win720(
         self,
         auth_ctrl: auth.AuthController,
-        username: str
+        username: str,
+        journal: Optional[purchase_journal.PurchaseJournal] = None,
     ) -> dict:
         assert isinstance(auth_ctrl, auth.AuthController)
+        _, bodies = self._buy(auth_ctrl, username, 1, journal, batch=False)
+        return bodies[0]
 
-        jsessionid = auth_ctrl.get_current_session_id()
+    def buy_Win720_batch(
+        self,
+        auth_ctrl: auth.AuthController,
+        username: str,
+        orders: int,
+        journal: Optional[purchase_journal.PurchaseJournal] = None,
+    ) -> dict:
+        """Buy ``orders`` sets of five auto tickets in one flow.
+
+        The preflight, the round lookup and the key derivation happen once;
+        each set still needs its own makeAutoNo/makeOrderNo/connPro chain,
+        sent one set after another on the same session. Orders stop at the
+        first failure and the result is one ``connPro``-shaped response with
+        every set's response under ``orders``; a failure after the first set
+        is reported there next to the sets already bought.
+        """
+        assert isinstance(auth_ctrl, auth.AuthController)
+        win720_round, bodies = self._buy(auth_ctrl, username, orders, journal, batch=True)
+        return _aggregate_results(win720_round, bodies)
 
-        self.keyCode = jsessionid
-        self._preflight_game(auth_ctrl)
-        win720_round = self._get_round()
+    def _buy(
+        self,
+        auth_ctrl: auth.AuthController,
+        username: str,
+        orders: int,
+        journal: Optional[purchase_journal.PurchaseJournal],
+        batch: bool,
+    ) -> Tuple[str, List[dict]]:
+        timings: Dict[str, float] = {}
+        self.last_timings = timings
+        started = time.perf_counter()
+        try:
+            # The session id is read from the cookie jar before the preflight GETs
+            # can write to it. The GETs then overlap the round lookup and the key
+            # derivation; only the encrypted POSTs are sequential.
+            with _timed(timings, "session"):
+                jsessionid = auth_ctrl.get_current_session_id()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                preflight = executor.submit(self._timed_preflight, auth_ctrl, timings)
+                with _timed(timings, "round"):
+                    win720_round = self._get_round()
+                with _timed(timings, "prepare"):
+                    self.prepare(jsessionid, win720_round, orders)
+                preflight.result()
+
+            bodies: List[dict] = []
+            for index in range(orders):
+                try:
+                    body = self._buy_order(
+                        auth_ctrl, username, win720_round, journal, timings, _order_slots(index, batch)
+                    )
+                except Exception as exc:
+                    # Before any set is bought the caller can simply retry; after
+                    # that the sets already paid for must be reported.
+                    if not bodies:
+                        raise
+                    logger.error("[win720] order %s/%s failed: %s", index + 1, orders, exc)
+                    body = {"resultCode": "ERROR", "resultMsg": f"ERROR: {exc}"}
+                bodies.append(body)
+                if body.get("resultCode") != "100":
+                    break
+            return win720_round, bodies
+        finally:
+            timings["total"] = time.perf_counter() - started
+            logger.info(
+                "[win720] timings orders=%s %s",
+                orders,
+                " ".join(f"{step}={seconds * 1000:.0f}ms" for step, seconds in timings.items()),
+            )
+
+    def _buy_order(
+        self,
+        auth_ctrl: auth.AuthController,
+        username: str,
+        win720_round: str,
+        journal: Optional[purchase_journal.PurchaseJournal],
+        timings: Dict[str, float],
+        slots: tuple,
+    ) -> dict:
+        entry = None
+        if journal is not None:
+            entry = journal.begin(username, ledger.WIN720_CODE, win720_round, slots)
+            find_orders = purchase_journal.ledger_finder(
+                self.http_client, self._generate_req_headers(auth_ctrl), ledger.WIN720_CODE, win720_round
+            )
 
-        makeAutoNum_ret = self._makeAutoNumbers(auth_ctrl, win720_round)
+            def recovered(orders: list) -> dict:
+                return {
+                    "resultCode": "100",
+                    "resultMsg": "SUCCESS",
+                    "saleCnt": 5,
+                    "saleTicket": "",
+                    "round": win720_round,
+                    "recoveredOrders": len(orders),
+                }
+
+            done = journal.resolve(entry, find_orders, recovered)
+            if done is not None:
+                return done
+
+        with _timed(timings, "makeAutoNo"):
+            makeAutoNum_ret = self._makeAutoNumbers(auth_ctrl, win720_round)
 
         try:
             q_val = json.loads(makeAutoNum_ret)['q']
@@ -89,18 +247,47 @@ class Win720:
         if not extracted_num:
             return json.loads(parsed_ret)
 
-        orderNo, orderDate = self._doOrderRequest(auth_ctrl, win720_round, extracted_num)
+        with _timed(timings, "makeOrderNo"):
+            orderNo, orderDate = self._doOrderRequest(auth_ctrl, win720_round, extracted_num)
 
-        body = json.loads(self._doConnPro(auth_ctrl, win720_round, extracted_num, username, orderNo, orderDate))
+        with _timed(timings, "connPro"):
+            if entry is None:
+                body = json.loads(self._doConnPro(auth_ctrl, win720_round, extracted_num, username, orderNo, orderDate))
+            else:
+                body = journal.run(
+                    entry,
+                    lambda before_retry: json.loads(
+                        self._doConnPro(auth_ctrl, win720_round, extracted_num, username, orderNo, orderDate, before_retry)
+                    ),
+                    find_orders,
+                    recovered,
+                    lambda body: body.get("resultCode") == "100",
+                )
 
         self._show_result(body)
         body['round'] = win720_round
         return body
 
+    def prepare(self, key_code: str, win720_round: str, orders: int = 1) -> None:
+        """Derive the session key and encrypt ``orders`` makeAutoNo payloads before the purchase chain.
+
+        Safe to call early (e.g. while waiting between purchases); a later
+        session id simply invalidates the prepared payloads.
+        """
+        self.keyCode = key_code
+        payload = self._make_auto_payload(win720_round)
+        self._prepared = {
+            ("makeAutoNo", key_code, win720_round): [self._encText(payload) for _ in range(orders)],
+        }
+
     def _generate_req_headers(self, auth_ctrl: auth.AuthController) -> dict:
         assert isinstance(auth_ctrl, auth.AuthController)
         return auth_ctrl.add_auth_cred_to_headers(self._REQ_HEADERS)
 
+    def _timed_preflight(self, auth_ctrl: auth.AuthController, timings: Dict[str, float]) -> None:
+        with _timed(timings, "preflight"):
+            self._preflight_game(auth_ctrl)
+
     def _preflight_game(self, auth_ctrl: auth.AuthController) -> None:
         """Warm up el.dhlottery.co.kr before the Win720 purchase POST chain."""
         headers = self._generate_req_headers(auth_ctrl)
@@ -116,12 +303,24 @@ class Win720:
                 if hasattr(self.http_client, "reset_connection_pool"):
                     self.http_client.reset_connection_pool()
 
-    def _post_purchase_step(self, step: str, url: str, headers: dict, data: dict) -> requests.Response:
+    def _post_purchase_step(
+        self,
+        step: str,
+        url: str,
+        headers: dict,
+        data: dict,
+        before_retry: Optional[Callable[[], None]] = None,
+    ) -> requests.Response:
         max_attempts = int(os.getenv("WIN720_STEP_MAX_ATTEMPTS", "5"))
         base_delay = float(os.getenv("WIN720_STEP_RETRY_DELAY", "1.5"))
+        if before_retry is not None:
+            # Journaled steps check the ledger before resending, so they can retry quickly.
+            base_delay = float(os.getenv("PURCHASE_RETRY_DELAY", "0.3"))
         last_exc = None
 
         for attempt in range(1, max_attempts + 1):
+            if attempt > 1 and before_retry is not None:
+                before_retry()
             try:
                 logger.info("[win720] %s attempt=%s/%s", step, attempt, max_attempts)
                 return self.http_client.post(url=url, headers=headers, data=data)
@@ -153,37 +352,30 @@ class Win720:
         raise ValueError("JSESSIONID 쿠키를 찾을 수 없습니다.")
 
     def _get_round(self) -> str:
-        try:
-            res = self.http_client.get(
-                "https://dhlottery.co.kr/common.do?method=main",
-                headers=self._REQ_HEADERS
-            )
-            html = res.text
-            soup = BS(html, "html5lib")
-            found = soup.find("strong", id="drwNo720")
-            if found:
-                return str(int(found.text) - 1)
-            else:
-                raise ValueError("drwNo720 not found")
-        except (requests.RequestException, AttributeError, ValueError):
-            base_date = datetime.datetime(2024, 12, 26)
-            base_round = 244
-
-            today = datetime.datetime.today().replace(hour=0, minute=0, second=0, microsecond=0)
-
-            days_ahead = (3 - today.weekday()) % 7
-            next_thursday = today + datetime.timedelta(days=days_ahead)
-
-            weeks = (next_thursday - base_date).days // 7
+        calendar = draw_calendar.get_calendar()
+        calendar.cross_check(draw_calendar.WIN720.name, self._fetch_round_from_main)
+        return str(calendar.current_round(draw_calendar.WIN720.name).round)
+
+    def _fetch_round_from_main(self) -> int:
+        res = self.http_client.get(
+            "https://dhlottery.co.kr/common.do?method=main",
+            headers=self._REQ_HEADERS
+        )
+        found = BS(res.text, "html5lib").find("strong", id="drwNo720")
+        if not found:
+            raise ValueError("drwNo720 not found")
+        return int(found.text) - 1
 
-            return str(base_round + weeks - 1)
+    def _make_auto_payload(self, win720_round: str) -> str:
+        return "ROUND={}&round={}&LT_EPSD={}&SEL_NO=&BUY_CNT=&AUTO_SEL_SET=SA&SEL_CLASS=&BUY_TYPE=A&ACCS_TYPE=01".format(win720_round, win720_round, win720_round)
 
     def _makeAutoNumbers(self, auth_ctrl: auth.AuthController, win720_round: str) -> str:
-        payload = "ROUND={}&round={}&LT_EPSD={}&SEL_NO=&BUY_CNT=&AUTO_SEL_SET=SA&SEL_CLASS=&BUY_TYPE=A&ACCS_TYPE=01".format(win720_round, win720_round, win720_round)
         headers = self._generate_req_headers(auth_ctrl)
+        prepared = self._prepared.get(("makeAutoNo", self.keyCode, win720_round))
+        encrypted = prepared.pop() if prepared else self._encText(self._make_auto_payload(win720_round))
 
         data = {
-            "q": requests.utils.quote(self._encText(payload))
+            "q": requests.utils.quote(encrypted)
         }
 
         res = self._post_purchase_step(
@@ -216,7 +408,16 @@ class Win720:
         except (json.JSONDecodeError, KeyError) as err:
             raise ValueError(f"Failed to parse doOrderRequest/decText: {res.text[:100]}...") from err
 
-    def _doConnPro(self, auth_ctrl: auth.AuthController, win720_round: str, extracted_num: str, username: str, orderNo: str, orderDate: str) -> str:
+    def _doConnPro(
+        self,
+        auth_ctrl: auth.AuthController,
+        win720_round: str,
+        extracted_num: str,
+        username: str,
+        orderNo: str,
+        orderDate: str,
+        before_retry: Optional[Callable[[], None]] = None,
+    ) -> str:
         payload = "ROUND={}&FLAG=&BUY_KIND=01&BUY_NO={}&BUY_CNT=5&BUY_SET_TYPE=SA%2CSA%2CSA%2CSA%2CSA&BUY_TYPE=A%2CA%2CA%2CA%2CA%2C&CS_TYPE=01&orderNo={}&orderDate={}&TRANSACTION_ID=&WIN_DATE=&USER_ID={}&PAY_TYPE=&resultErrorCode=&resultErrorMsg=&resultOrderNo=&WORKING_FLAG=true&NUM_CHANGE_TYPE=&auto_process=N&set_type=SA&classnum=&selnum=&buytype=M&num1=&num2=&num3=&num4=&num5=&num6=&DSEC=34&CLOSE_DATE=&verifyYN=N&curdeposit=&curpay=5000&DROUND={}&DSEC=0&CLOSE_DATE=&verifyYN=N&lotto720_radio_group=on".format(win720_round, "".join([ "{}{}%2C".format(i, extracted_num) for i in range(1, 6)])[:-3], orderNo, orderDate, username, win720_round)
         headers = self._generate_req_headers(auth_ctrl)
 
@@ -228,7 +429,8 @@ class Win720:
             "connPro",
             url="https://el.dhlottery.co.kr/connPro.do",
             headers=headers,
-            data=data
+            data=data,
+            before_retry=before_retry,
         )
 
         try:
@@ -238,11 +440,19 @@ class Win720:
         else:
             return ret
 
+    def _session_salt(self) -> bytes:
+        # One salt per session id, so every payload of a session shares one derived key;
+        # the IV stays random per payload.
+        if self._salt_key_code != self.keyCode:
+            self._salt_key_code = self.keyCode
+            self._salt = get_random_bytes(32)
+        return self._salt
+
     def _encText(self, plainText: str) -> str:
-        encSalt = get_random_bytes(32)
+        encSalt = self._session_salt()
         encIV = get_random_bytes(16)
         passPhrase = self.keyCode[:32]
-        encKey = PBKDF2(passPhrase, encSalt, self.BlockSize, count=self.iterationCount, hmac_hash_module=SHA256)
+        encKey = _derive_key(passPhrase, encSalt, self.BlockSize, self.iterationCount)
         aes = AES.new(encKey, AES.MODE_CBC, encIV)
 
         plainText = self._pad(plainText).encode('utf-8')
@@ -255,7 +465,7 @@ class Win720:
         decIv = bytes.fromhex(encText[64:96])
         cryptText = encText[96:]
         passPhrase = self.keyCode[:32]
-        decKey = PBKDF2(passPhrase, decSalt, self.BlockSize, count=self.iterationCount, hmac_hash_module=SHA256)
+        decKey = _derive_key(passPhrase, decSalt, self.BlockSize, self.iterationCount)
 
         aes = AES.new(decKey, AES.MODE_CBC, decIv)
 
@@ -273,182 +483,161 @@ class Win720:
 
         headers = self._generate_req_headers(auth_ctrl)
 
-        parameters = common.get_search_date_range()
-        data = {
-            "nowPage": 1,
-            "searchStartDate": parameters["searchStartDate"],
-            "searchEndDate": parameters["searchEndDate"],
-            "winGrade": 1,
-            "lottoId": "LP72",
-            "sortOrder": "DESC"
-        }
-
         result_data = {
             "data": "no winning data"
         }
 
         try:
-            api_url = "https://www.dhlottery.co.kr/mypage/selectMyLotteryledger.do"
-            params = {
-                "srchStrDt": parameters["searchStartDate"],
-                "srchEndDt": parameters["searchEndDate"],
-                "ltGdsCd": "LP72",
-                "pageNum": 1,
-                "recordCountPerPage": 10
+            start, end = ledger.default_search_range()
+            reader = ledger.LedgerReader(self.http_client, headers)
+            _, round_entries = ledger.latest_round(
+                reader.iter_entries(start, end, product_codes=(ledger.WIN720_CODE,))
+            )
+            if not round_entries:
+                return result_data
+
+            purchased_dates = [entry.order_date for entry in round_entries if entry.order_date]
+            total_prize = sum(entry.prize for entry in round_entries)
+
+            round_no = round_entries[0].raw.get("ltEpsdView") or str(round_entries[0].round)
+            if "회" in round_no:
+                round_no = round_no.replace("회", "")
+
+            money = "0 원" if total_prize == 0 else f"{total_prize:,} 원"
+
+            result_data = {
+                "round": round_no,
+                "money": money,
+                "purchased_date": max(purchased_dates) if purchased_dates else "-",
+                "winning_date": round_entries[0].draw_date or "-",
+                "win720_details": []
             }
 
-            res = self.http_client.get(api_url, params=params, headers=headers)
+            detail_url = "https://www.dhlottery.co.kr/mypage/lottery720select.do"
 
-            if res.status_code == 200:
-                try:
-                    data = res.json()
-                    data = data.get("data", {})
-
-                    if data.get("list"):
-                        item = data["list"][0]
-
-                        purchased_date = item.get("eltOrdrDt", "-")
-                        round_no = item.get("ltEpsdView", "")
-                        money = item.get("ltWnAmt", "-")
-
-                        if "회" in round_no:
-                            round_no = round_no.replace("회", "")
-
-                        if money == "0" or money == 0:
-                            money = "0 원"
-                        else:
-                            money = f"{int(money):,} 원"
-
-                        result_data = {
-                            "round": round_no,
-                            "money": money,
-                            "purchased_date": purchased_date,
-                            "winning_date": item.get("epsdRflDt", "-"),
-                            "win720_details": []
-                        }
-
-                        try:
-                            detail_url = "https://www.dhlottery.co.kr/mypage/lottery720select.do"
-                            detail_params = {
-                                "ntslOrdrNo": item.get("ntslOrdrNo")
-                            }
-
-                            res_detail = self.http_client.get(detail_url, params=detail_params, headers=headers)
-                            detail_data = res_detail.json()
-
-                            detail_data = detail_data.get("data", detail_data)
-
-                            win720_details = []
-
-                            if "list" in detail_data:
-                                for i, d_item in enumerate(detail_data["list"]):
-                                    label = common.SLOTS[i] if i < len(common.SLOTS) else "?"
-
-                                    info_cn = d_item.get("ltGmInfoCn", "")
-                                    if isinstance(info_cn, dict):
-                                        group = (
-                                            info_cn.get("group")
-                                            or info_cn.get("grp")
-                                            or info_cn.get("jo")
-                                            or info_cn.get("groupNo")
-                                            or info_cn.get("joNo")
-                                        )
-                                        number = (
-                                            info_cn.get("number")
-                                            or info_cn.get("num")
-                                            or info_cn.get("no")
-                                            or info_cn.get("digits")
-                                        )
-                                        if group is not None and number is not None:
-                                            info_cn = f"{group}:{number}"
-                                        elif len(info_cn) == 1:
-                                            key, value = next(iter(info_cn.items()))
-                                            info_cn = f"{key}:{value}"
-                                        else:
-                                            info_cn = str(info_cn)
-                                    elif isinstance(info_cn, (list, tuple)):
-                                        if len(info_cn) >= 2:
-                                            info_cn = f"{info_cn[0]}:{info_cn[1]}"
-                                        else:
-                                            info_cn = ",".join(str(value) for value in info_cn)
-                                    elif info_cn is None:
-                                        info_cn = ""
-                                    else:
-                                        info_cn = str(info_cn)
-
-                                    rank = d_item.get("wnRnk")
-                                    if rank is None:
-                                        rank = 0
-                                    else:
-                                        try:
-                                            rank = int(rank)
-                                        except (ValueError, TypeError):
-                                            rank = 0
-
-                                    status = "0등" if rank == 0 else f"{rank}등"
-
-                                    if ":" in info_cn:
-                                        parts = info_cn.split(":")
-                                        group = parts[0]
-                                        number_str = parts[1]
-
-                                        hl_count = 0
-                                        hl_group = False
-
-                                        if rank == 1:
-                                            hl_count = 6
-                                            hl_group = True
-                                        elif rank == 2:
-                                            hl_count = 6
-                                        elif rank == 3:
-                                            hl_count = 5
-                                        elif rank == 4:
-                                            hl_count = 4
-                                        elif rank == 5:
-                                            hl_count = 3
-                                        elif rank == 6:
-                                            hl_count = 2
-                                        elif rank == 7:
-                                            hl_count = 1
-
-                                        formatted_chars = []
-                                        digits = list(number_str)
-                                        L = len(digits)
-
-                                        for idx, digit in enumerate(digits):
-                                            if idx >= (L - hl_count):
-                                                formatted_chars.append(f"[{digit}]")
-                                            else:
-                                                formatted_chars.append(f" {digit} ")
-
-                                        formatted_num = " ".join(formatted_chars)
-
-                                        label = f"{group}조"
-
-                                        result_str = formatted_num
-                                    else:
-                                        label = "?"
-                                        result_str = info_cn
-
-                                    win720_details.append({
-                                        "label": label,
-                                        "result": result_str,
-                                        "status": status
-                                    })
-
-                            result_data["win720_details"] = win720_details
-
-                        except Exception as e:
-                            logger.error(f"[Error] Win720 detail error: {e}")
+            def _fetch_detail(entry: ledger.LedgerEntry) -> dict:
+                detail_params = {
+                    "ntslOrdrNo": entry.order_no
+                }
+                res_detail = self.http_client.get(detail_url, params=detail_params, headers=headers)
+                detail_data = res_detail.json()
+                return detail_data.get("data", detail_data)
 
+            # Details are fetched concurrently (bounded per host) and kept in ledger order.
+            win720_details = []
+            for detail_data, fetch_error in self.http_client.map_concurrent(_fetch_detail, round_entries):
+                try:
+                    if fetch_error is not None:
+                        raise fetch_error
+                    win720_details.extend(self._build_win720_details(detail_data))
                 except Exception as e:
-                    logger.error(f"[Error] Win720 list process error: {e}")
+                    logger.error(f"[Error] Win720 detail error: {e}")
+
+            result_data["win720_details"] = win720_details
 
         except Exception as e:
             logger.error(f"[Error] Win720 check error: {e}")
 
         return result_data
 
+    def _build_win720_details(self, detail_data: dict) -> list:
+        win720_details = []
+        for i, d_item in enumerate(detail_data.get("list") or []):
+            label = common.SLOTS[i] if i < len(common.SLOTS) else "?"
+
+            info_cn = d_item.get("ltGmInfoCn", "")
+            if isinstance(info_cn, dict):
+                group = (
+                    info_cn.get("group")
+                    or info_cn.get("grp")
+                    or info_cn.get("jo")
+                    or info_cn.get("groupNo")
+                    or info_cn.get("joNo")
+                )
+                number = (
+                    info_cn.get("number")
+                    or info_cn.get("num")
+                    or info_cn.get("no")
+                    or info_cn.get("digits")
+                )
+                if group is not None and number is not None:
+                    info_cn = f"{group}:{number}"
+                elif len(info_cn) == 1:
+                    key, value = next(iter(info_cn.items()))
+                    info_cn = f"{key}:{value}"
+                else:
+                    info_cn = str(info_cn)
+            elif isinstance(info_cn, (list, tuple)):
+                if len(info_cn) >= 2:
+                    info_cn = f"{info_cn[0]}:{info_cn[1]}"
+                else:
+                    info_cn = ",".join(str(value) for value in info_cn)
+            elif info_cn is None:
+                info_cn = ""
+            else:
+                info_cn = str(info_cn)
+
+            rank = d_item.get("wnRnk")
+            if rank is None:
+                rank = 0
+            else:
+                try:
+                    rank = int(rank)
+                except (ValueError, TypeError):
+                    rank = 0
+
+            status = "0등" if rank == 0 else f"{rank}등"
+
+            if ":" in info_cn:
+                parts = info_cn.split(":")
+                group = parts[0]
+                number_str = parts[1]
+
+                hl_count = 0
+                hl_group = False
+
+                if rank == 1:
+                    hl_count = 6
+                    hl_group = True
+                elif rank == 2:
+                    hl_count = 6
+                elif rank == 3:
+                    hl_count = 5
+                elif rank == 4:
+                    hl_count = 4
+                elif rank == 5:
+                    hl_count = 3
+                elif rank == 6:
+                    hl_count = 2
+                elif rank == 7:
+                    hl_count = 1
+
+                formatted_chars = []
+                digits = list(number_str)
+                L = len(digits)
+
+                for idx, digit in enumerate(digits):
+                    if idx >= (L - hl_count):
+                        formatted_chars.append(f"[{digit}]")
+                    else:
+                        formatted_chars.append(f" {digit} ")
+
+                formatted_num = " ".join(formatted_chars)
+
+                label = f"{group}조"
+
+                result_str = formatted_num
+            else:
+                label = "?"
+                result_str = info_cn
+
+            win720_details.append({
+                "label": label,
+                "result": result_str,
+                "status": status
+            })
+        return win720_details
+
     def _show_result(self, body: dict) -> None:
         assert isinstance(body, dict)
 
@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import common
+
+common.setup_logging()
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(".cache", "winning_numbers.json")
+
+
+class WinningNumbers:
+    __slots__ = ("product", "round", "numbers", "bonus")
+
+    def __init__(self, product: str, round_no: int, numbers: Iterable[str], bonus: Optional[str] = None):
+        self.product = product
+        self.round = int(round_no)
+        self.numbers = tuple(numbers)
+        self.bonus = bonus
+
+    def __repr__(self) -> str:
+        return f"WinningNumbers(product={self.product!r}, round={self.round}, numbers={self.numbers}, bonus={self.bonus!r})"
+
+
+class WinningStore:
+    """Per-round winning numbers kept in a small JSON file.
+
+    The numbers of a drawn round never change, so each round is written once
+    and then served to every ticket, user and later run. Writes go through a
+    temporary file and ``os.replace`` so a crash never leaves half a file.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("WINNING_STORE_PATH", DEFAULT_PATH)
+        self._lock = threading.Lock()
+        self._rounds: Optional[Dict[str, Dict[str, dict]]] = None
+
+    def get(self, product: str, round_no) -> Optional[WinningNumbers]:
+        with self._lock:
+            entry = self._load().get(product, {}).get(str(int(round_no)))
+        if entry is None:
+            return None
+        return WinningNumbers(product, round_no, entry.get("numbers", ()), entry.get("bonus"))
+
+    def put(self, product: str, round_no, numbers: Iterable[str], bonus: Optional[str] = None) -> bool:
+        """Store a round once; returns ``False`` if it was already known."""
+        numbers = [str(number) for number in numbers]
+        if not numbers:
+            return False
+        key = str(int(round_no))
+        with self._lock:
+            rounds = self._load().setdefault(product, {})
+            if key in rounds:
+                return False
+            rounds[key] = {"numbers": numbers, "bonus": bonus}
+            self._save()
+        logger.info("[winning_store] stored %s round=%s", product, key)
+        return True
+
+    def rounds(self, product: str) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(sorted(int(key) for key in self._load().get(product, {})))
+
+    def _load(self) -> Dict[str, Dict[str, dict]]:
+        if self._rounds is None:
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    self._rounds = json.load(handle)
+            except FileNotFoundError:
+                self._rounds = {}
+            except (OSError, ValueError) as exc:
+                logger.warning("[winning_store] ignoring unreadable %s: %s", self.path, exc)
+                self._rounds = {}
+        return self._rounds
+
+    def _save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".winning_numbers.", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(self._rounds, handle, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            # The in-memory copy still serves this run.
+            logger.warning("[winning_store] could not write %s: %s", self.path, exc)
+
+
+_default_store: Optional[WinningStore] = None
+_default_lock = threading.Lock()
+
+
+def get_store() -> WinningStore:
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = WinningStore()
+        return _default_store